@@ -0,0 +1,136 @@
+"""
+Measures the AniList search cache's hit rates on near-duplicate searches.
+
+Makes N titles (with sequels, which shouldn't match each other), then runs
+a stream of searches for them, by popularity, each written as
+    exact   - a title as is
+    case    - in another case, with extra spaces and punctuation
+    typo    - with a letter dropped or swapped
+    prefix  - the first word of a title
+    other   - its other title (English for romaji)
+Misses are "searched" and cached, like the client does; AniList is taken to
+answer a title with that title, and other searches with the title they were
+written for, the first time, and the same way after that. Reports hits by kind, wrong hits (another media than
+AniList would answer with), and the cache's latency.
+
+Usage (from the repository root):
+    python -m benchmarks.anilist_cache [--titles 5000] [--searches 200000]
+"""
+import argparse
+import random
+import string
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from bot.backend.anilist_cache import AniListCache, normalize
+
+SCOPE = ("Media", "ANIME")
+SUFFIXES = ["", " 2", " season 2", " the movie", " ii"]
+
+
+def make_word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+
+
+def make_titles(n: int, rng: random.Random) -> List[dict]:
+    titles = []
+    while len(titles) < n:
+        romaji = " ".join(make_word(rng) for _ in range(rng.randint(1, 4)))
+        english = " ".join(make_word(rng) for _ in range(rng.randint(1, 4)))
+        for suffix in rng.sample(SUFFIXES, rng.randint(1, 3)):
+            titles.append(
+                {
+                    "id": len(titles),
+                    "title": {
+                        "romaji": (romaji + suffix).title(),
+                        "english": (english + suffix).title(),
+                        "native": None,
+                    },
+                    "siteUrl": f"https://anilist.co/anime/{len(titles)}",
+                }
+            )
+    return titles[:n]
+
+
+def vary(title: dict, kind: str, rng: random.Random) -> str:
+    romaji = title["title"]["romaji"]
+    if kind == "case":
+        return f"  {romaji.upper()}!! "
+    if kind == "typo":
+        i = rng.randrange(len(romaji) - 1)
+        if rng.random() < 0.5:
+            return romaji[:i] + romaji[i + 1 :]
+        return romaji[:i] + romaji[i + 1] + romaji[i] + romaji[i + 2 :]
+    if kind == "prefix":
+        return romaji.split()[0]
+    if kind == "other":
+        return title["title"]["english"]
+    return romaji
+
+
+def make_searches(
+    titles: List[dict], n: int, rng: random.Random
+) -> List[Tuple[str, dict, str]]:
+    weights = [1 / (rank + 1) for rank in range(len(titles))]  # zipf-ish
+    kinds = ["exact", "case", "typo", "prefix", "other"]
+    searches = []
+    for title in rng.choices(titles, weights=weights, k=n):
+        kind = rng.choices(kinds, weights=[4, 2, 1, 1, 2])[0]
+        searches.append((kind, title, vary(title, kind, rng)))
+    return searches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--titles", type=int, default=5000)
+    parser.add_argument("--searches", type=int, default=200000)
+    parser.add_argument("--size", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    titles = make_titles(args.titles, rng)
+    searches = make_searches(titles, args.searches, rng)
+
+    cache = AniListCache(args.size)
+    hits: "Counter[str]" = Counter()
+    wrong: "Counter[str]" = Counter()
+    totals = Counter(kind for kind, _, _ in searches)
+    answers: Dict[str, int] = {}  # what AniList would find, by search
+    for title in reversed(titles):  # the first title wins, if some are the same
+        for name in title["title"].values():
+            if name:
+                answers[normalize(name)] = title["id"]
+    latencies = []
+    for kind, title, search in searches:
+        answer = answers.setdefault(normalize(search), title["id"])
+        start = time.perf_counter()
+        cached = cache.get(SCOPE, search)
+        latencies.append(time.perf_counter() - start)
+        if cached is None:
+            cache.put(SCOPE, search, titles[answer])
+        elif cached["id"] == answer:
+            hits[kind] += 1
+        else:
+            wrong[kind] += 1
+
+    for kind, total in totals.items():
+        print(
+            f"{kind:<7} {total:>7} searches, {hits[kind] / total:>6.1%} hits, "
+            f"{wrong[kind] / total:>6.2%} wrong"
+        )
+    stats = cache.stats
+    print(
+        f"overall {stats.lookups:>7} searches, {stats.hit_ratio:>6.1%} hits "
+        f"(exact {stats.exact_hits}, near-duplicate {stats.fuzzy_hits}), "
+        f"{sum(wrong.values()) / stats.lookups:.2%} wrong"
+    )
+    latencies.sort()
+    print(
+        f"latency p50 {latencies[len(latencies) // 2] * 1e6:.1f}us, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:.1f}us"
+    )
+
+
+if __name__ == "__main__":
+    main()
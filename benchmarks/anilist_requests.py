@@ -0,0 +1,144 @@
+"""
+Measures AniList requests per command, with and without batching.
+
+Runs the searches behind N `anime`, `manga` and `character` commands, started
+at random over a period (so, at a given rate), against a fake AniList that
+answers after a fixed round trip, and compares:
+    before - one request per search, what the bot sent before batching
+             (AniListClient with MAX_BATCH = 1 sends each search at once)
+    after  - the current AniListClient
+on requests per command and latency, which includes the batching window.
+
+Usage (from the repository root):
+    python -m benchmarks.anilist_requests [--commands 1000]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import types
+from typing import Any, Dict, List, Tuple
+
+from loguru import logger
+
+from bot.backend import anime
+from bot.backend.apis.anilist import AniListClient
+from bot.utils.constants import ContentType
+from bot.utils.ratelimit import TokenBucket
+
+ROUND_TRIP = 0.1  # seconds
+
+
+class FakeResponse:
+    def __init__(self, data: dict) -> None:
+        self.status = 200
+        self.headers: Dict[str, str] = {}
+        self.data = data
+
+    async def __aenter__(self) -> "FakeResponse":
+        await asyncio.sleep(ROUND_TRIP)
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+
+    async def json(self) -> dict:
+        return self.data
+
+
+class FakeSession:
+    """Answers every field, except searches for titles starting with "missing"."""
+
+    def __init__(self) -> None:
+        self.posts = 0
+
+    def post(self, url: str, *, json: Dict[str, Any]) -> FakeResponse:
+        self.posts += 1
+        data = {}
+        for name, search in json["variables"].items():
+            alias = "q" + name[1:]
+            if search.startswith("missing"):
+                data[alias] = None
+            elif f"{alias}: Character" in json["query"]:
+                data[alias] = {
+                    "name": {"first": search, "last": None},
+                    "siteUrl": f"https://anilist.co/character/{search}",
+                }
+            else:
+                data[alias] = {
+                    "title": {"romaji": search, "english": None, "native": None},
+                    "siteUrl": f"https://anilist.co/anime/{search}",
+                }
+        return FakeResponse({"data": data})
+
+
+def make_commands(n: int, rng: random.Random) -> List[Tuple[str, str]]:
+    # a few popular titles, then a long tail, and some typos
+    titles = [f"title{int(rng.paretovariate(1.2))}" for _ in range(n)]
+    kinds = rng.choices(["anime", "manga", "character"], weights=[6, 2, 2], k=n)
+    return [
+        (kind, f"missing{i}" if rng.random() < 0.05 else title)
+        for i, (kind, title) in enumerate(zip(kinds, titles))
+    ]
+
+
+async def command(
+    bot: Any, kind: str, search: str, delay: float, latencies: List[float]
+) -> None:
+    await asyncio.sleep(delay)
+    start = time.perf_counter()
+    try:
+        if kind == "character":
+            await anime.get_character(bot, name=search)
+        else:
+            await anime.get_anime_manga(bot, query=search, _type=ContentType(kind))
+    except Exception:
+        pass  # not found
+    latencies.append(time.perf_counter() - start)
+
+
+async def run(commands: List[Tuple[str, str]], period: float, batch: bool) -> str:
+    bot: Any = types.SimpleNamespace(http_session=FakeSession())
+    bot.anilist_client = AniListClient(bot)
+    # only measuring batching, AniList's rate limit would make the busy runs queue
+    bot.anilist_client.limiter.bucket = TokenBucket(10**6, 60)
+    if not batch:
+        bot.anilist_client.MAX_BATCH = 1
+
+    rng = random.Random(1)
+    latencies: List[float] = []
+    await asyncio.gather(
+        *(
+            command(bot, kind, search, rng.uniform(0, period), latencies)
+            for kind, search in commands
+        )
+    )
+    latencies.sort()
+    return (
+        f"{bot.http_session.posts / len(commands):>5.2f} requests/command, "
+        f"latency p50 {statistics.median(latencies) * 1e3:>4.0f}ms "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1e3:>4.0f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--commands", type=int, default=1000)
+    args = parser.parse_args()
+    logger.remove()
+
+    commands = make_commands(args.commands, random.Random(0))
+    for rate in (1, 10, 100):
+        period = args.commands / rate
+        if period > 60:  # keep the quiet run short
+            period, n = 60.0, rate * 60
+        else:
+            n = args.commands
+        for name, batch in (("before", False), ("after", True)):
+            result = asyncio.run(run(commands[:n], period, batch))
+            print(f"{rate:>3} commands/s {name:<6} {result}")
+
+
+if __name__ == "__main__":
+    main()
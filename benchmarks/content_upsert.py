@@ -0,0 +1,173 @@
+"""
+Measures `ContentRecord.save` throughput on a large user_content table.
+
+Fills a scratch schema's user_content with N rows (100 per user), then runs
+saves, half of them for content the user already has (in another case),
+from several connections at once, with:
+    before - `by_name` (LIKE '%name%'), then an INSERT if nothing matched
+    after  - the single INSERT ... ON CONFLICT upsert, once migration 0007
+             has deduplicated the table and added its unique index
+Reports saves per second, latency, and the duplicates each left behind.
+Needs a Postgres database; the scratch schema is dropped afterwards.
+
+Usage (from the repository root):
+    python -m benchmarks.content_upsert [--dsn DB_URI] [--rows 1000000]
+"""
+import argparse
+import asyncio
+import random
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import asyncpg
+from decouple import config
+
+from bot.backend import db
+from bot.backend import models
+
+SCHEMA = "benchmark_content_upsert"
+ROWS_PER_USER = 100
+MIGRATION = Path("bot/migrations/0007_user_content_unique.sql")
+
+# as in 0001_init.sql and 0002_alter_user_content.sql, without the users table
+TABLE = """
+CREATE TABLE user_content (
+    user_id BIGINT NOT NULL,
+    content_name TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    content_url TEXT,
+    recommended_by BIGINT,
+    id INTEGER PRIMARY KEY GENERATED ALWAYS AS IDENTITY
+);
+
+CREATE INDEX id_content ON user_content(user_id);
+
+CREATE INDEX content_name_index ON user_content (LOWER(content_name));
+"""
+
+FILL = """
+INSERT INTO user_content (user_id, content_name, content_type)
+SELECT i / $2, 'title ' || i, 'anime' FROM generate_series(0, $1 - 1) AS i
+"""
+
+BEFORE_INSERT = (
+    "INSERT INTO user_content"
+    "(user_id, content_name, content_type, recommended_by, content_url)"
+    "VALUES ($1, $2, $3, $4, $5)"
+)
+
+DUPLICATES = """
+SELECT COUNT(*) - COUNT(DISTINCT (user_id, LOWER(content_name), content_type))
+FROM user_content
+"""
+
+Save = Tuple[int, str]  # user, name
+
+
+def make_saves(rows: int, n: int, phase: str, rng: random.Random) -> List[Save]:
+    users = rows // ROWS_PER_USER
+    saves = []
+    for _ in range(n):
+        user = rng.randrange(users)
+        if rng.random() < 0.5:  # already on the user's list
+            i = user * ROWS_PER_USER + rng.randrange(ROWS_PER_USER)
+            saves.append((user, f"Title {i}"))
+        else:
+            saves.append((user, f"{phase} {len(saves)}"))
+            if rng.random() < 0.1:  # sent twice at once, e.g. by two members
+                saves.append(saves[-1])
+    return saves
+
+
+async def save_before(conn: asyncpg.Connection, user: int, name: str) -> None:
+    existing = await conn.fetchrow(
+        db.STATEMENTS[models.CONTENT_BY_NAME], f"%{name.lower()}%", user
+    )
+    if not existing:
+        await conn.execute(BEFORE_INSERT, user, name, "anime", None, None)
+
+
+async def save_after(conn: asyncpg.Connection, user: int, name: str) -> None:
+    await conn.fetchrow(
+        db.STATEMENTS[models.UPSERT_CONTENT], user, name, "anime", None, None
+    )
+
+
+async def run(
+    pool: asyncpg.Pool, saves: List[Save], concurrency: int, save
+) -> Tuple[float, List[float]]:
+    queue = list(reversed(saves))
+    latencies = []
+
+    async def worker() -> None:
+        async with pool.acquire() as conn:
+            while queue:
+                user, name = queue.pop()
+                start = time.perf_counter()
+                await save(conn, user, name)
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def report(phase: str, elapsed: float, latencies: List[float], dupes: int) -> None:
+    print(
+        f"{phase:<6} {len(latencies) / elapsed:>8.0f} saves/s, "
+        f"p50 {latencies[len(latencies) // 2] * 1e3:.2f}ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1e3:.2f}ms, "
+        f"{dupes} duplicates"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dsn", default=config("DB_URI", default=None))
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--saves", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("no --dsn given, and DB_URI is not set")
+
+    admin = await asyncpg.connect(args.dsn)
+    await admin.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await admin.execute(f"CREATE SCHEMA {SCHEMA}")
+    pool = await asyncpg.create_pool(
+        args.dsn,
+        min_size=args.concurrency,
+        max_size=args.concurrency,
+        server_settings={"search_path": SCHEMA},
+    )
+    try:
+        async with pool.acquire() as conn:
+            await conn.execute(TABLE)
+            start = time.perf_counter()
+            await conn.execute(FILL, args.rows, ROWS_PER_USER)
+            await conn.execute("ANALYZE user_content")
+            print(f"filled {args.rows} rows in {time.perf_counter() - start:.1f}s")
+
+        rng = random.Random(0)
+        saves = make_saves(args.rows, args.saves, "before", rng)
+        elapsed, latencies = await run(pool, saves, args.concurrency, save_before)
+        report("before", elapsed, latencies, await pool.fetchval(DUPLICATES))
+
+        async with pool.acquire() as conn:
+            start = time.perf_counter()
+            await conn.execute(MIGRATION.read_text())
+            await conn.execute("ANALYZE user_content")
+            print(f"migration 0007 took {time.perf_counter() - start:.1f}s")
+
+        saves = make_saves(args.rows, args.saves, "after", rng)
+        elapsed, latencies = await run(pool, saves, args.concurrency, save_after)
+        report("after", elapsed, latencies, await pool.fetchval(DUPLICATES))
+    finally:
+        await pool.close()
+        await admin.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await admin.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+"""
+Measures lookups in the crypto directory.
+
+Builds a directory the size of CoinMarketCap's (~10k active coins, with
+generated names) and times exact lookups by symbol, name and slug, prefix
+completions, fuzzy matches of misspelled names, and rebuilding the indexes.
+
+Usage (from the repository root):
+    python -m benchmarks.crypto_directory [--coins 10000]
+"""
+import argparse
+import random
+import string
+import time
+from typing import Callable, List
+
+from bot.backend.crypto_directory import CoinInfo, CryptoDirectory
+
+SYLLABLES = [c + v for c in "bcdfghjklmnprstvwxz" for v in "aeiou"]
+# plenty of real names share these
+SUFFIXES = ["", "", "", " Coin", " Token", "Swap", " Finance", " Protocol"]
+
+
+def make_coins(n: int) -> List[CoinInfo]:
+    rng = random.Random(0)
+    coins = []
+    for rank in range(1, n + 1):
+        name = "".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))).title()
+        name += rng.choice(SUFFIXES)
+        symbol = "".join(rng.choices(string.ascii_uppercase, k=rng.randint(3, 5)))
+        slug = name.lower().replace(" ", "-")
+        coins.append(CoinInfo(symbol, name, slug, rank))
+    return coins
+
+
+def typo(rng: random.Random, word: str) -> str:
+    i = rng.randrange(len(word))
+    return word[:i] + word[i + 1 :]
+
+
+def measure(func: Callable[[str], object], queries: List[str]) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        func(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--coins", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=10000)
+    args = parser.parse_args()
+
+    coins = make_coins(args.coins)
+    start = time.perf_counter()
+    directory = CryptoDirectory(coins, time.time())
+    print(f"build: {(time.perf_counter() - start) * 1e3:.0f}ms")
+
+    rng = random.Random(1)
+    sample = rng.choices(coins, k=args.queries)
+    cases = {
+        "symbol": (directory.get, [c.symbol for c in sample]),
+        "name": (directory.get, [c.name for c in sample]),
+        "slug": (directory.get, [c.slug for c in sample]),
+        "prefix": (directory.complete, [c.name[:4] for c in sample]),
+        "fuzzy": (directory.fuzzy, [typo(rng, c.name) for c in sample[:1000]]),
+        "suggest": (directory.suggest, [typo(rng, c.name) for c in sample[:1000]]),
+    }
+    for name, (func, queries) in cases.items():
+        print(f"{name:<8} {measure(func, queries) * 1e6:>8.2f}us")
+
+
+if __name__ == "__main__":
+    main()
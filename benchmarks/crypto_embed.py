@@ -0,0 +1,128 @@
+"""
+Measures the latency of the `crypto` command handler under load.
+
+Runs N concurrent invocations of the real Crypto cog handler, for symbols
+that are already cached, against:
+    before - the handler as it was, rendering the embed on every call
+    after  - the current handler, sending the embed rendered at refresh time
+
+The handler's `ctx.send` is replaced by a stub that serializes the embed
+(which is what discord.py does before sending) and yields to the loop;
+latency is measured from invocation to that send.
+
+Usage (from the repository root):
+    python -m benchmarks.crypto_embed [--invocations 1000]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import types
+from datetime import datetime
+from typing import Any, List
+
+from loguru import logger
+
+from bot.backend.apis.crypto import CryptoClient
+from bot.commands.crypto import Crypto
+
+SYMBOLS = ["BTC", "ETH", "ADA", "XLM", "XRP", "XNO", "VET", "DOGE", "SOL", "DOT"]
+
+
+class FakeContext:
+    def __init__(self, latencies: List[float]) -> None:
+        self.author = "user#0001"
+        self.latencies = latencies
+        self.started = 0.0
+
+    async def send(self, *, embed: Any) -> None:
+        embed.to_dict()
+        self.latencies.append(time.perf_counter() - self.started)
+        await asyncio.sleep(0)
+
+
+def make_cog() -> Crypto:
+    bot: Any = types.SimpleNamespace(
+        _crypto_list=[],
+        api_caches={"crypto": {"data": {}, "last_updated": None}},
+        task_loops={},
+        dispatch=lambda event, *args: None,
+        user=types.SimpleNamespace(avatar_url="https://cdn.discordapp.com/a.png"),
+    )
+    bot.crypto_client = CryptoClient(bot)
+    now = datetime.utcnow()
+    bot.crypto_client._update_cache(
+        {
+            symbol: {
+                "name": symbol.lower(),
+                "symbol": symbol,
+                "percent_change_1h": 0.123456,
+                "percent_change_24h": -1.23456,
+                "percent_change_7d": 12.3456,
+                "percent_change_30d": -23.4567,
+                "price": 12345.6789,
+                "fiat_prices": {"USD": 12345.6789},
+                "last_updated": now,
+            }
+            for symbol in SYMBOLS
+        }
+    )
+    return Crypto(bot)
+
+
+async def legacy_handler(cog: Crypto, ctx: Any, crypto: str) -> None:
+    """The handler as it was before, reading the same cache."""
+    cached_data = cog.bot.api_caches["crypto"]
+    crypto_data = cached_data["data"][crypto.upper()]
+
+    embed = cog.api.prepare_output(crypto_data)
+    embed.timestamp = cached_data["last_updated"]
+    embed.set_footer(text="Data last updated", icon_url=cog.bot.user.avatar_url)
+
+    logger.debug(f"Crypto command called by {ctx.author} for crypto {crypto}")
+
+    await ctx.send(embed=embed)
+
+
+async def run(handler: Any, cog: Crypto, invocations: int) -> List[float]:
+    latencies: List[float] = []
+
+    async def invoke(i: int) -> None:
+        ctx = FakeContext(latencies)
+        ctx.started = time.perf_counter()
+        await handler(cog, ctx, SYMBOLS[i % len(SYMBOLS)].lower())
+
+    await asyncio.gather(*(invoke(i) for i in range(invocations)))
+    return latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--invocations", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    logger.remove()  # measure the handler, not stderr
+    cog = make_cog()
+    current: Any = Crypto.crypto_group.callback  # type: ignore
+
+    print(f"{'handler':<8} {'mean':>10} {'p50':>10} {'p99':>10} {'total':>10}")
+    for name, handler in (("before", legacy_handler), ("after", current)):
+        latencies: List[float] = []
+        totals: List[float] = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            latencies += await run(handler, cog, args.invocations)
+            totals.append(time.perf_counter() - start)
+
+        latencies.sort()
+        print(
+            f"{name:<8} {statistics.mean(latencies) * 1e6:>8.0f}us"
+            f" {latencies[len(latencies) // 2] * 1e6:>8.0f}us"
+            f" {latencies[int(len(latencies) * 0.99)] * 1e6:>8.0f}us"
+            f" {statistics.mean(totals) * 1e3:>8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""
+Measures the offline dictionary index.
+
+Generates a Wiktionary-style JSONL dump of N words, imports it, then compares
+    dict  - loading every entry into a dict, which each process would pay for
+    index - opening the memory-mapped index
+on load time, and lookup latency of words that are and aren't in it.
+
+Usage (from the repository root):
+    python -m benchmarks.dictionary_index [--words 500000]
+"""
+import argparse
+import json
+import random
+import string
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from bot.backend.dictionary_index import DictionaryIndex, parse_wiktionary, write_index
+
+
+def make_dump(path: Path, n: int) -> List[str]:
+    rng = random.Random(0)
+    words = set()
+    while len(words) < n:
+        words.add("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 12))))
+
+    ordered = sorted(words)  # sets iterate in a different order every run
+    vocabulary = ordered[:1000]
+    with open(path, "w") as f:
+        for word in ordered:
+            record = {
+                "word": word,
+                "pos": rng.choice(["noun", "verb", "adj"]),
+                "sounds": [{"ipa": f"/{word}/"}],
+                "senses": [
+                    {
+                        "glosses": [" ".join(rng.choices(vocabulary, k=12))],
+                        "examples": [{"text": f"An example using {word}."}],
+                    }
+                ],
+            }
+            f.write(json.dumps(record) + "\n")
+    return ordered
+
+
+def percentiles(func: Callable[[str], Optional[dict]], queries: List[str]) -> str:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        func(query)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    return f"p50 {p50:>6.1f}us  p99 {p99:>6.1f}us"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--words", type=int, default=500000)
+    parser.add_argument("--queries", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dump = Path(tmp) / "dump.jsonl"
+        index_path = Path(tmp) / "dictionary.idx"
+        words = make_dump(dump, args.words)
+
+        start = time.perf_counter()
+        with open(dump) as f:
+            entries = parse_wiktionary(f)
+        write_index(index_path, entries, "en_GB")
+        print(
+            f"import: {time.perf_counter() - start:.1f}s, "
+            f"{index_path.stat().st_size / 2**20:.0f}MB"
+        )
+
+        # what loading the same entries would cost, without the index
+        entries_json = json.dumps(entries)
+        del entries
+        start = time.perf_counter()
+        entries = json.loads(entries_json)
+        print(f"load   dict  {(time.perf_counter() - start) * 1e3:>10.1f}ms")
+
+        start = time.perf_counter()
+        index = DictionaryIndex(index_path)
+        print(f"load   index {(time.perf_counter() - start) * 1e3:>10.3f}ms")
+
+        rng = random.Random(1)
+        hits = rng.choices(words, k=args.queries)
+        misses = [word + "zz" for word in hits]
+        print(f"hit    dict  {percentiles(entries.get, hits)}")
+        print(f"hit    index {percentiles(index.get, hits)}")
+        print(f"miss   index {percentiles(index.get, misses)}")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
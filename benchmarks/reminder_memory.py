@@ -0,0 +1,205 @@
+"""
+Measures the memory retained per pending reminder.
+
+"before" is the old Reminder, which held on to the whole invocation context;
+"after" is the current slotted Reminder record. Contexts are built from
+gateway-style payloads with the real discord.py / discord_slash classes, for
+both the prefix command (commands/reminders.py) and the slash command
+(slash_commands/reminders.py), and dropped once the reminder is created, the
+same way the command handlers drop them.
+
+Usage (from the repository root):
+    python -m benchmarks.reminder_memory [--items 10000]
+"""
+import argparse
+import asyncio
+import gc
+import logging
+import tracemalloc
+import warnings
+from datetime import timedelta
+from typing import Any, Callable, List
+
+import discord
+from discord.ext import commands
+from discord.ext.commands.view import StringView
+from discord_slash import SlashContext
+
+from bot.backend.reminders import Reminder
+
+GUILD_ID = 298871492924669954
+CHANNEL_ID = 849987442089787442
+DELAY = timedelta(hours=3, minutes=4)
+
+
+class LegacyReminder:
+    """The Reminder as it was before, holding the invocation context until it fired."""
+
+    def __init__(
+        self, ctx: Any, *, delay: timedelta, content: str, title: str = "Reminder!"
+    ) -> None:
+        self.ctx = ctx
+        self.bot = ctx.bot
+        self.target = ctx.author
+        self._delay = delay
+        self.content = content
+        self.title = title
+
+
+def user_payload(i: int) -> dict:
+    return {
+        "id": str(10**17 + i),
+        "username": f"user{i}",
+        "discriminator": "0001",
+        "avatar": "a" * 32,
+    }
+
+
+def member_payload(i: int) -> dict:
+    return {
+        "user": user_payload(i),
+        "roles": [],
+        "joined_at": "2021-06-01T00:00:00+00:00",
+        "deaf": False,
+        "mute": False,
+        "permissions": "0",
+    }
+
+
+class Harness:
+    def __init__(self) -> None:
+        self.bot = commands.Bot(command_prefix="u!")
+        state = self.bot._connection
+        guild = discord.Guild(
+            data={
+                "id": GUILD_ID,
+                "name": "guild",
+                "member_count": 1,
+                "roles": [
+                    {
+                        "id": GUILD_ID,
+                        "name": "@everyone",
+                        "permissions": "0",
+                        "position": 0,
+                        "color": 0,
+                        "hoist": False,
+                        "managed": False,
+                        "mentionable": False,
+                    }
+                ],
+                "channels": [
+                    {
+                        "id": CHANNEL_ID,
+                        "type": 0,
+                        "name": "general",
+                        "position": 0,
+                        "permission_overwrites": [],
+                    }
+                ],
+            },
+            state=state,
+        )
+        state._add_guild(guild)
+        self.channel = guild.get_channel(CHANNEL_ID)
+        self.logger = logging.getLogger("benchmark")
+
+    def prefix_context(self, i: int) -> commands.Context:
+        content = f"u!remind 3h4m water the plants #{i}"
+        data = {
+            "id": str(10**18 + i),
+            "channel_id": str(CHANNEL_ID),
+            "guild_id": str(GUILD_ID),
+            "author": user_payload(i),
+            "member": member_payload(i),
+            "content": content,
+            "timestamp": "2021-06-01T00:00:00+00:00",
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": [],
+            "pinned": False,
+            "type": 0,
+        }
+        message = discord.Message(
+            state=self.bot._connection, channel=self.channel, data=data
+        )
+        return commands.Context(
+            message=message,
+            bot=self.bot,
+            prefix="u!",
+            view=StringView(content),
+            args=[None, DELAY],  # the cog and converted delay
+            kwargs={"content": f"water the plants #{i}"},
+            invoked_with="remind",
+        )
+
+    def slash_context(self, i: int) -> SlashContext:
+        data = {
+            "id": str(10**18 + i),
+            "token": "t" * 180,  # interaction tokens are ~180 characters
+            "type": 2,
+            "guild_id": str(GUILD_ID),
+            "channel_id": str(CHANNEL_ID),
+            "member": member_payload(i),
+            "data": {
+                "id": "1",
+                "name": "remind",
+                "options": [
+                    {"name": "delay", "type": 3, "value": "3h4m"},
+                    {"name": "content", "type": 3, "value": f"water the plants #{i}"},
+                ],
+            },
+        }
+        return SlashContext(None, data, self.bot, self.logger)
+
+
+def measure(
+    items: int, make_ctx: Callable[[int], Any], make_reminder: Callable
+) -> float:
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+
+    pending: List[Any] = []
+    for i in range(items):
+        ctx = make_ctx(i)
+        pending.append(make_reminder(ctx, i))
+        del ctx
+
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del pending
+    return used / items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bytes per pending reminder.")
+    parser.add_argument("--items", type=int, default=10_000)
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore", DeprecationWarning)
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    harness = Harness()
+
+    def legacy(ctx: Any, i: int) -> LegacyReminder:
+        return LegacyReminder(ctx, delay=DELAY, content=f"water the plants #{i}")
+
+    def compact(ctx: Any, i: int) -> Reminder:
+        return Reminder.from_context(ctx, delay=DELAY, content=f"water the plants #{i}")
+
+    print(f"{'command':<8} {'before':>10} {'after':>10}")
+    for name, make_ctx in (
+        ("prefix", harness.prefix_context),
+        ("slash", harness.slash_context),
+    ):
+        before = measure(args.items, make_ctx, legacy)
+        after = measure(args.items, make_ctx, compact)
+        print(f"{name:<8} {before:>8,.0f} B {after:>8,.0f} B")
+
+
+if __name__ == "__main__":
+    main()
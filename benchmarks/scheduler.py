@@ -0,0 +1,126 @@
+"""
+Compares the in-tree TimingWheel against the aioscheduler Manager it replaced.
+
+Each scenario runs in a fresh subprocess so that RSS numbers are not polluted:
+    insert - schedule N jobs spread over the next day; report inserts/s and RSS growth
+    fire   - schedule N jobs due two seconds from now; report how long it takes to run them all
+
+Usage (from the repository root; aioscheduler is a dev dependency and only
+runs on Python < 3.11):
+    python -m benchmarks.scheduler [--items 1000000]
+"""
+import argparse
+import asyncio
+import random
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+
+def rss_mb() -> float:
+    # current resident set size, from /proc (linux only)
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * resource.getpagesize() / 1024**2
+
+
+class Runner:
+    def __init__(self, items: int) -> None:
+        self.items = items
+        self.fired = 0
+        self.first_fired_at = 0.0
+        self.done = asyncio.Event()
+
+    def callback(self) -> None:
+        if self.fired == 0:
+            self.first_fired_at = time.perf_counter()
+        self.fired += 1
+        if self.fired == self.items:
+            self.done.set()
+
+    async def job(self) -> None:
+        # aioscheduler only accepts coroutine objects
+        self.callback()
+
+    def make_scheduler(self, kind: str):
+        if kind == "wheel":
+            from bot.utils.timing_wheel import TimingWheel
+
+            wheel = TimingWheel()
+            wheel.start()
+            return lambda when: wheel.schedule(when, self.callback)
+
+        from aioscheduler import Manager
+
+        manager = Manager(5)  # what UtilityBot used to run
+        manager.start()
+        return lambda when: manager.schedule(self.job(), when)
+
+    async def insert(self, kind: str) -> None:
+        rng = random.Random(0)
+        now = datetime.utcnow()
+        whens = [
+            now + timedelta(seconds=rng.uniform(60, 86400)) for _ in range(self.items)
+        ]
+
+        base = rss_mb()
+        schedule = self.make_scheduler(kind)
+        start = time.perf_counter()
+        for when in whens:
+            schedule(when)
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"{kind:>12} insert: {self.items / elapsed:>12,.0f} items/s"
+            f"  ({elapsed:.2f}s), RSS +{rss_mb() - base:.1f} MB"
+        )
+
+    async def fire(self, kind: str) -> None:
+        due = datetime.utcnow() + timedelta(seconds=2)
+        schedule = self.make_scheduler(kind)
+        for _ in range(self.items):
+            schedule(due)
+
+        await asyncio.wait_for(self.done.wait(), timeout=600)
+        # measured from the first job run, the wheel rounds due times up to a whole tick
+        elapsed = time.perf_counter() - self.first_fired_at
+
+        print(
+            f"{kind:>12} fire:   {self.items / elapsed:>12,.0f} items/s"
+            f"  ({elapsed:.2f}s from first to last)"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=1_000_000)
+    parser.add_argument("--run", nargs=2, metavar=("KIND", "SCENARIO"))
+    args = parser.parse_args()
+
+    if args.run:
+        kind, scenario = args.run
+        runner = Runner(args.items)
+        asyncio.run(getattr(runner, scenario)(kind))
+        return
+
+    for scenario in ("insert", "fire"):
+        for kind in ("wheel", "aioscheduler"):
+            subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.scheduler",
+                    "--items",
+                    str(args.items),
+                    "--run",
+                    kind,
+                    scenario,
+                ],
+                check=False,
+            )
+
+
+if __name__ == "__main__":
+    main()
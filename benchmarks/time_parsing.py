@@ -0,0 +1,74 @@
+"""
+Compares the time string parser against the itertools.groupby implementation it replaced.
+
+    legacy  - the old get_timedelta, copied below
+    uncached - the single pass tokenizer, bypassing its LRU cache
+    cached  - parse_interval as the commands call it
+
+Usage (from the repository root):
+    python -m benchmarks.time_parsing [--number 200000]
+"""
+import argparse
+import itertools
+import timeit
+from datetime import timedelta
+
+from bot.utils.converters import parse_interval
+
+# what users actually type, roughly
+INPUTS = ["10m", "1h", "3h4m", "1d12h", "2d3h4m5s", "45s", "1d", "30m"]
+
+
+def legacy_get_timedelta(arg: str) -> timedelta:
+    """The parser as it was before, minus the error wrapping."""
+    arg = arg.lower()
+    amts, units = [], []
+
+    unit_mapping = {
+        "h": "hours",
+        "hour": "hours",
+        "m": "minutes",
+        "minute": "minutes",
+        "s": "seconds",
+        "second": "seconds",
+        "d": "days",
+        "day": "days",
+        "month": "months",
+        "year": "years",
+    }
+
+    grouped = itertools.groupby(arg, key=str.isdigit)
+
+    for key, group in grouped:
+        if key:
+            amts.append(int("".join(group)))
+        else:
+            units.append(unit_mapping["".join(group)])
+
+    return timedelta(**dict(zip(units, amts)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=200_000)
+    args = parser.parse_args()
+
+    for text in INPUTS:
+        assert legacy_get_timedelta(text) == parse_interval(text).delta, text
+
+    uncached = parse_interval.__wrapped__  # type: ignore ; lru_cache
+    for name, func in (
+        ("legacy", legacy_get_timedelta),
+        ("uncached", uncached),
+        ("cached", parse_interval),
+    ):
+        inputs = itertools.cycle(INPUTS)
+        elapsed = timeit.timeit(lambda: func(next(inputs)), number=args.number)
+        print(
+            f"{name:>9}: {elapsed / args.number * 1e9:>8,.0f} ns/parse"
+            f"  ({args.number / elapsed:>12,.0f} parses/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Measures `u!music-similar`'s ranking of recommended tracks.
+
+Fills a TrackStore's features with N random tracks, then ranks them all
+against one track with:
+    loop   - cosine similarity computed per track in Python
+    matrix - TrackStore.similar, one product over the feature matrix
+
+Usage (from the repository root):
+    python -m benchmarks.track_similarity [--tracks 1000 10000 100000]
+"""
+import argparse
+import math
+import random
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+from bot.backend.track_store import FEATURES, TrackStore
+
+
+def loop_similar(
+    store: TrackStore, track_id: str, candidates: List[str], limit: int
+) -> List[Tuple[str, float]]:
+    rows = store._features[: len(store)].tolist()
+    mean = [sum(column) / len(rows) for column in zip(*rows)]
+    query = [v - m for v, m in zip(rows[store._rows[track_id]], mean)]
+    query_norm = math.sqrt(sum(v * v for v in query))
+    scored = []
+    for candidate in candidates:
+        vector = [v - m for v, m in zip(rows[store._rows[candidate]], mean)]
+        dot = sum(a * b for a, b in zip(vector, query))
+        norm = math.sqrt(sum(v * v for v in vector)) * query_norm
+        scored.append((candidate, dot / max(norm, 1e-9)))
+    scored.sort(key=lambda pair: -pair[1])
+    return scored[:limit]
+
+
+def best_of(func, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tracks", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for n in args.tracks:
+        store = TrackStore(Path("unused.sqlite3"), search_ttl=0)
+        ids = [f"track{i}" for i in range(n)]
+        for track_id, vector in zip(ids, rng.random((n, len(FEATURES)), np.float32)):
+            store._set_row(track_id, vector)
+        track_id = random.Random(0).choice(ids)
+
+        loop = best_of(lambda: loop_similar(store, track_id, ids, 10), repeat=2)
+        matrix = best_of(lambda: store.similar(track_id, ids, 10))
+        print(
+            f"{n:>7} tracks: loop {loop * 1e3:>8.1f}ms, "
+            f"matrix {matrix * 1e3:>7.2f}ms ({loop / matrix:.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
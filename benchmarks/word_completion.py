@@ -0,0 +1,88 @@
+"""
+Measures the dictionary's autocomplete with a large vocabulary.
+
+Compares the memory taken by N words (measured with tracemalloc) as
+    packed - PackedWords, what the completer uses
+    list   - a sorted list of str
+    trie   - a trie of nested dicts
+and times completions of 1 to 4 letter prefixes through WordCompleter,
+with its recently looked up words full.
+
+Usage (from the repository root):
+    python -m benchmarks.word_completion [--words 500000]
+"""
+import argparse
+import random
+import string
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from bot.backend.word_completer import PackedWords, WordCompleter
+
+
+def make_words(n: int) -> List[str]:
+    rng = random.Random(0)
+    words = set()
+    while len(words) < n:
+        words.add("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 12))))
+    return sorted(words)
+
+
+def build_trie(words: List[str]) -> Dict[str, Any]:
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+    return trie
+
+
+def measure_memory(build: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    built = build()  # noqa: F841 ; kept alive while measuring
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--words", type=int, default=500000)
+    parser.add_argument("--queries", type=int, default=100000)
+    args = parser.parse_args()
+
+    words = make_words(args.words)
+    for name, build in (
+        ("packed", lambda: PackedWords(words)),
+        ("list", lambda: sorted(w.encode().decode() for w in words)),
+        ("trie", lambda: build_trie(words)),
+    ):
+        print(f"memory {name:<7} {measure_memory(build):>8.1f}MB")
+
+    completer = WordCompleter(max_words=args.words, recent_size=10000)
+    start = time.perf_counter()
+    completer.words = PackedWords(words)
+    print(f"build  packed  {(time.perf_counter() - start) * 1e3:>8.0f}ms")
+    rng = random.Random(1)
+    for word in rng.sample(words, 10000):
+        completer.add(word)
+
+    for length in range(1, 5):
+        prefixes = [w[:length] for w in rng.choices(words, k=args.queries)]
+        latencies = []
+        for prefix in prefixes:
+            start = time.perf_counter()
+            completer.complete(prefix)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        print(
+            f"complete {length} letters: "
+            f"p50 {latencies[len(latencies) // 2] * 1e6:>6.1f}us, "
+            f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:>6.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
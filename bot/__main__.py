@@ -21,6 +21,7 @@ CMD_EXTENSIONS = {
     "bot.commands.recommend",
     "bot.commands.music",
     "bot.commands.rolename",
+    "bot.commands.admin",
 }
 SLASH_EXTENSIONS = {"bot.slash_commands.dictionary", "bot.slash_commands.reminders"}
 
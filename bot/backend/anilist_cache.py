@@ -0,0 +1,170 @@
+"""Cache of AniList search results, shared by near-duplicate searches."""
+import re
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from bot.utils.text import trigrams
+
+# what a search is for: (field, media type or None)
+Scope = Tuple[str, Optional[str]]
+EntryKey = Tuple[Scope, int]  # scope, AniList id
+
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(search: str) -> str:
+    """Casefolded, with punctuation and extra whitespace removed."""
+    return _SPACES.sub(" ", _PUNCTUATION.sub(" ", search.casefold())).strip()
+
+
+@dataclass
+class CacheStats:
+    """Counters since the bot started."""
+
+    exact_hits: int = 0  # the same search, or a title, once normalized
+    fuzzy_hits: int = 0  # near-duplicates of those
+    misses: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.exact_hits + self.fuzzy_hits
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+class _Entry:
+    __slots__ = ("data", "names")
+
+    def __init__(self, data: dict) -> None:
+        self.data = data
+        self.names: Set[str] = set()  # normalized searches and titles
+
+
+class AniListCache:
+    """
+    The results of AniList searches (its fields, with the media's id and
+    titles) for the `size` most recently used media and characters.
+
+    A result is found by the normalized search that got it, or by one of its
+    titles, and through a trigram index by near-duplicates of those:
+    - a name with the same words and numbers, give or take typos, sharing
+      `SIMILARITY` of its trigrams ("atack on titan");
+    - the only result with a name starting with the search, if it's a word
+      of at least `MIN_PREFIX` characters ("shingeki" -> "shingeki no kyojin").
+    Sequels differ in a word or number, so they don't match each other; a
+    longer search for a first season isn't taken as a prefix of its sequel.
+    Searches with no result aren't cached, AniList may add them later.
+    """
+
+    SIMILARITY = 0.7
+    MIN_PREFIX = 5
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[EntryKey, _Entry]" = OrderedDict()
+        self._names: Dict[Tuple[Scope, str], EntryKey] = {}
+        self._grams: Dict[Tuple[Scope, str], Set[str]] = {}  # trigram -> names
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, scope: Scope, search: str) -> Optional[dict]:
+        """The cached result of a search, or None."""
+        name = normalize(search)
+        key = self._names.get((scope, name))
+        if key is not None:
+            self.stats.exact_hits += 1
+        elif (key := self._match(scope, name)) is not None:
+            self.stats.fuzzy_hits += 1
+        else:
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key].data
+
+    def put(self, scope: Scope, search: str, data: dict) -> None:
+        """Caches a result (with an "id"), evicting the least recently used."""
+        key = (scope, data["id"])
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry(data)
+            if len(self._entries) > self.size:
+                self._evict(next(iter(self._entries)))
+        else:
+            entry.data = data
+            self._entries.move_to_end(key)
+
+        for name in {normalize(search), *map(normalize, _titles(data))} - {""}:
+            owner = self._names.get((scope, name))
+            if owner == key:
+                continue
+            # a title shared by several media goes to the latest
+            self._names[(scope, name)] = key
+            entry.names.add(name)
+            if owner is not None:
+                self._entries[owner].names.discard(name)
+            else:
+                for gram in trigrams(name):
+                    self._grams.setdefault((scope, gram), set()).add(name)
+
+    def _evict(self, key: EntryKey) -> None:
+        scope, _ = key
+        for name in self._entries.pop(key).names:
+            del self._names[(scope, name)]
+            for gram in trigrams(name):
+                names = self._grams[(scope, gram)]
+                names.discard(name)
+                if not names:
+                    del self._grams[(scope, gram)]
+
+    def _match(self, scope: Scope, name: str) -> Optional[EntryKey]:
+        if not name:
+            return None
+        grams = trigrams(name)
+        shared: "Counter[str]" = Counter()
+        for gram in grams:
+            shared.update(self._grams.get((scope, gram), ()))
+
+        words = name.split()
+        is_prefix = len(words) == 1 and len(name) >= self.MIN_PREFIX
+        numbers = {w for w in words if any(c.isdigit() for c in w)}
+        best: Optional[str] = None
+        best_similarity = 0.0
+        prefixed: Set[EntryKey] = set()
+        for candidate, count in shared.items():
+            # a whole word prefix has all its trigrams in the candidate
+            if is_prefix and count == len(grams) and candidate.startswith(name + " "):
+                prefixed.add(self._names[(scope, candidate)])
+            if count < self.SIMILARITY * len(grams):
+                continue  # can't be similar enough
+            similarity = count / (len(grams) + len(trigrams(candidate)) - count)
+            candidate_words = candidate.split()
+            if (
+                similarity >= max(self.SIMILARITY, best_similarity)
+                and len(candidate_words) == len(words)
+                and {w for w in candidate_words if any(c.isdigit() for c in w)}
+                == numbers
+            ):
+                best, best_similarity = candidate, similarity
+
+        if best is not None:
+            return self._names[(scope, best)]
+        if len(prefixed) == 1:
+            return prefixed.pop()
+        return None
+
+
+def _titles(data: dict) -> Iterator[str]:
+    if "title" in data:
+        yield from filter(None, data["title"].values())
+    else:
+        yield " ".join(filter(None, data["name"].values()))
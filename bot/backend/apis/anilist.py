@@ -0,0 +1,251 @@
+"""Interacting with the AniList GraphQL API."""
+import asyncio
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from decouple import config
+from loguru import logger
+
+from bot.backend.anilist_cache import AniListCache, normalize
+from bot.backend.apis.abc import AbstractAPIClient
+from bot.backend.exceptions import ContentNotFoundError
+from bot.utils.background import BackgroundTasks
+from bot.utils.constants import ContentType
+from bot.utils.ratelimit import PriorityRateLimiter, TokenBucket
+
+# (field, media type or None, search)
+SearchKey = Tuple[str, Optional[str], str]
+# by the normalized search: the search as first written, and its result
+Batch = Dict[SearchKey, Tuple[str, "asyncio.Future[Optional[dict]]"]]
+
+MEDIA_FIELDS = "id title { romaji english native } siteUrl"
+CHARACTER_FIELDS = "id name { first last } siteUrl"
+
+
+class Throttled(Exception):
+    """Raised when AniList rejects a request for going over the rate limit."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Rate limited by AniList, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class AniListClient(AbstractAPIClient):
+    """
+    Searches AniList for anime, manga and characters.
+
+    Searches made within `BATCH_WINDOW` of each other are sent together, as
+    the aliased fields of a single GraphQL query (up to `MAX_BATCH` per
+    query), and each caller gets its own field's result. Identical searches
+    in a batch share a field.
+
+    Queries are paced by a token bucket, kept in line with AniList's
+    `X-RateLimit-*` headers. When tokens run out, queries wait their turn by
+    priority, so commands (`INTERACTIVE`) go before `BACKGROUND` work; when
+    AniList throttles one anyway, it's queued again after `Retry-After`.
+
+    Results are cached, and near-duplicate searches share them, see
+    `AniListCache`; searches are batched by their normalized form, and sent
+    to AniList as the first caller wrote them.
+    """
+
+    API_URL = "https://graphql.anilist.co"
+    BATCH_WINDOW = 0.05  # seconds
+    MAX_BATCH = 10  # fields per query, well within AniList's complexity limit
+    MAX_ATTEMPTS = 3  # per query, when throttled
+
+    # priorities, lowest first
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+    def __init__(self, bot: "UtilityBot") -> None:  # type: ignore
+        super().__init__(bot)
+        # per minute; corrected by the headers of the first response
+        rate = config("ANILIST_RATE_LIMIT", default=90, cast=int)
+        self.limiter = PriorityRateLimiter(TokenBucket(rate, 60))
+        self.cache = AniListCache(config("ANILIST_CACHE_SIZE", default=5000, cast=int))
+        self._batches: Dict[int, Batch] = {}
+        self._batch_handles: Dict[int, asyncio.TimerHandle] = {}
+        self._tasks = BackgroundTasks()
+        self.requests = 0  # sent since the bot started
+        self.throttled = 0  # of those, rejected by AniList
+
+    async def search_media(
+        self, query: str, content_type: ContentType, *, priority: int = INTERACTIVE
+    ) -> dict:
+        """
+        Gets the URL and title of an anime or manga.
+
+        Raises:
+            ContentNotFoundError
+        """
+        media = await self._search(
+            ("Media", content_type.value.upper(), query), priority
+        )
+        if media is None:
+            raise ContentNotFoundError(
+                f"Could not find {content_type.value} with name {query}"
+            )
+        return {
+            "id": media["id"],
+            "siteUrl": media["siteUrl"],
+            "title": media["title"]["romaji"],
+        }
+
+    async def search_character(self, name: str, *, priority: int = INTERACTIVE) -> dict:
+        """
+        Gets the URL and name of a character.
+
+        Raises:
+            ContentNotFoundError
+        """
+        character = await self._search(("Character", None, name), priority)
+        if character is None:
+            raise ContentNotFoundError(f"Could not find character with name {name}")
+        return {
+            "id": character["id"],
+            # characters with a single name have no last name
+            "name": " ".join(filter(None, character["name"].values())),
+            "siteUrl": character["siteUrl"],
+        }
+
+    async def _search(self, key: SearchKey, priority: int) -> Optional[dict]:
+        """
+        Gets a search from the cache, or adds it to the next batch of its
+        priority, or joins the same search in it.
+
+        Returns:
+            The searched field's data, or None if AniList found nothing.
+        """
+        field, media_type, search = key
+        cached = self.cache.get((field, media_type), search)
+        if cached is not None:
+            return cached
+
+        key = (field, media_type, normalize(search))
+        loop = asyncio.get_event_loop()
+        batch = self._batches.setdefault(priority, {})
+        if key in batch:
+            future = batch[key][1]
+        else:
+            future = loop.create_future()
+            batch[key] = (search, future)
+            if len(batch) >= self.MAX_BATCH:
+                self._flush(priority)
+            elif priority not in self._batch_handles:
+                self._batch_handles[priority] = loop.call_later(
+                    self.BATCH_WINDOW, self._flush, priority
+                )
+        return await asyncio.shield(future)
+
+    def _flush(self, priority: int) -> None:
+        handle = self._batch_handles.pop(priority, None)
+        if handle is not None:
+            handle.cancel()
+        batch = self._batches.pop(priority)
+        self._tasks.spawn(self._send_batch(batch, priority))
+
+    async def _send_batch(self, batch: Batch, priority: int) -> None:
+        searches = [
+            (field, media_type, search)
+            for (field, media_type, _), (search, _) in batch.items()
+        ]
+        query, variables = self.build_query(searches)
+        try:
+            for attempt in range(1, self.MAX_ATTEMPTS + 1):
+                await self.limiter.acquire(priority)
+                logger.info(
+                    f"Searching AniList for {', '.join(s[2] for s in searches)}"
+                )
+                try:
+                    results = self.parse_data(await self.fetch_data(query, variables))
+                    break
+                except Throttled as e:
+                    if attempt == self.MAX_ATTEMPTS:
+                        raise ContentNotFoundError(
+                            "AniList is getting too many searches right now, "
+                            "try again in a minute"
+                        ) from e
+                    logger.warning(f"{e}, {self.limiter.waiting} queries waiting")
+        except Exception as e:
+            logger.error(f"AniList search failed: {e}")
+            for _, future in batch.values():
+                future.set_exception(e)
+                future.exception()  # retrieved by the callers, if still waiting
+            return
+
+        for i, (search, future) in enumerate(batch.values()):
+            result = results.get(f"q{i}")
+            if result is not None:
+                self.cache.put(searches[i][:2], search, result)
+            future.set_result(result)
+
+    @staticmethod
+    def build_query(searches: List[SearchKey]) -> Tuple[str, Dict[str, str]]:
+        """
+        Builds a query with a field per search, aliased q0, q1...
+
+        Returns:
+            The query, and its variables.
+        """
+        params = []
+        fields = []
+        variables = {}
+        for i, (field, media_type, search) in enumerate(searches):
+            params.append(f"$s{i}: String")
+            variables[f"s{i}"] = search
+            if field == "Media":
+                fields.append(
+                    f"q{i}: Media(search: $s{i}, type: {media_type}) {{ {MEDIA_FIELDS} }}"
+                )
+            else:
+                fields.append(
+                    f"q{i}: Character(search: $s{i}) {{ {CHARACTER_FIELDS} }}"
+                )
+
+        query = f"query ({', '.join(params)}) {{\n  " + "\n  ".join(fields) + "\n}"
+        return query, variables
+
+    async def fetch_data(self, query: str, variables: Dict[str, str]) -> dict:
+        """
+        Raises:
+            Throttled: AniList rejected the query, the limiter is paused meanwhile.
+        """
+        self.requests += 1
+        async with self.bot.http_session.post(
+            self.API_URL, json={"query": query, "variables": variables}
+        ) as resp:
+            self._update_limit(resp.headers)
+            if resp.status == 429:
+                self.throttled += 1
+                retry_after = float(resp.headers.get("Retry-After", 60))
+                self.limiter.bucket.empty(retry_after)
+                raise Throttled(retry_after)
+            if resp.status != 200:
+                # also when only some of the fields weren't found
+                logger.debug(f"AniList returned status code {resp.status}")
+            return await resp.json()
+
+    def _update_limit(self, headers: Mapping[str, str]) -> None:
+        try:
+            remaining = int(headers["X-RateLimit-Remaining"])
+            limit = int(headers["X-RateLimit-Limit"])
+        except (KeyError, ValueError):
+            return
+        self.limiter.bucket.sync(remaining, limit)
+
+    def parse_data(self, data: dict) -> Dict[str, Optional[dict]]:
+        """
+        Returns:
+            The data of each field by alias; None for searches with no result.
+
+        Raises:
+            ContentNotFoundError: AniList answered with no data at all.
+        """
+        if not isinstance(data, dict) or data.get("data") is None:
+            errors = data.get("errors") if isinstance(data, dict) else data
+            logger.debug(f"AniList returned no data: {errors}")
+            raise ContentNotFoundError("Could not search AniList, try again later")
+        return data["data"]
+
+    def prepare_output(self, data: dict, mode: str = "string") -> str:
+        return data["siteUrl"]
@@ -1,41 +1,103 @@
 """Interacting with the crypto API"""
-from typing import Any
-from decouple import config
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from loguru import logger
-from decouple import config
+from decouple import Csv, config
 from discord import Embed
 
 from bot.backend.apis.abc import AbstractAPIClient
-from bot.utils.constants import EmbedColour
+from bot.backend.exceptions import ContentNotFoundError
+from bot.backend.crypto_directory import CoinInfo, CryptoDirectory
+from bot.backend.crypto_history import CryptoHistory
+from bot.backend.crypto_rates import CrossRates
+from bot.utils.background import BackgroundTasks
+from bot.utils.constants import DATA_DIR, EmbedColour
 
 
 class CryptoClient(AbstractAPIClient):
     """
     Gets Cryptocurrency data from the CoinMarketCap API.
+
+    Quotes are fetched on demand and cached per symbol for `QUOTE_TTL`.
+    Misses that come in within `BATCH_WINDOW` of each other are fetched with
+    a single `quotes/latest` call, and concurrent requests for the same symbol
+    share one in-flight request. Expired quotes are still served while they
+    are refreshed in the background.
+
+    Every symbol that has been looked up successfully is tracked, and
+    refreshed together by `refresh`, which also adds them to their price
+    history. Each fetch renders the symbol's embed once for every command
+    call until the next fetch, and rebuilds the cross-rate matrix.
+
+    Quotes are requested in USD and every currency in `FIAT_CURRENCIES`, which
+    is only USD by default: CoinMarketCap's free plan allows one `convert`
+    currency per call, and paid plans charge a credit for each extra one.
+
+    What users type is resolved to a symbol through `directory`, a daily
+    refreshed map of every listed cryptocurrency.
     """
 
     API_URL = "https://pro-api.coinmarketcap.com"
+    QUOTE_TTL = timedelta(seconds=config("CRYPTO_QUOTE_TTL", default=600, cast=int))
+    BATCH_WINDOW = 0.05  # seconds
+    DIRECTORY_PATH = DATA_DIR / "crypto_directory.json"
+    DIRECTORY_PAGE_SIZE = 5000  # the most `cryptocurrency/map` returns at once
+    # samples kept per symbol; a year of hourly refreshes, ~140KB
+    HISTORY_SIZE = config("CRYPTO_HISTORY_SIZE", default=8760, cast=int)
+    # USD always comes first, the rest of the bot works in USD
+    FIAT_CURRENCIES = ["USD"] + [
+        c
+        for c in config("CRYPTO_FIAT_CURRENCIES", default="", cast=Csv(str.upper))
+        if c != "USD"
+    ]
+
+    def __init__(self, bot: "UtilityBot") -> None:  # type: ignore
+        super().__init__(bot)
+        # symbols to keep refreshed; starts from the defaults and grows with usage
+        self.tracked: Set[str] = set(bot._crypto_list)
+        self._inflight: Dict[str, "asyncio.Future[Optional[dict]]"] = {}
+        self._batch: Set[str] = set()
+        self._batch_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks = BackgroundTasks()
+        self.history = CryptoHistory(DATA_DIR / "crypto_history", self.HISTORY_SIZE)
+        # symbol -> (last_updated of the quote it was rendered from, embed)
+        self._embeds: Dict[str, Tuple[datetime, Embed]] = {}
+        self.history.load()
+        self.rates = CrossRates()
+        # USD value of one unit of each fiat currency
+        self.fiat_values: Dict[str, float] = {"USD": 1.0}
+        self.directory = CryptoDirectory.load(self.DIRECTORY_PATH)
 
-    async def fetch_data(self) -> dict:
-        headers = {
+    @property
+    def cache(self) -> Dict[str, Any]:
+        return self.bot.api_caches["crypto"]
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
             "Accepts": "application/json",
             "Accept-Encoding": "deflate, gzip",
             "X-CMC_PRO_API_KEY": config("COINMARKETCAP_API_KEY"),
         }
-        # request data only for the necessary cryptos
-        # maintain this as a list on a bot variable
-        cryptos = ",".join(self.bot._crypto_list)
 
+    async def fetch_data(self, symbols: Iterable[str]) -> dict:
         url = CryptoClient.API_URL + "/v1/cryptocurrency/quotes/latest"
 
-        params = {"symbol": cryptos}
+        # unknown symbols are left out of the response, instead of failing the request
+        params = {
+            "symbol": ",".join(sorted(symbols)),
+            "convert": ",".join(self.FIAT_CURRENCIES),
+            "skip_invalid": "true",
+        }
 
         async with self.bot.http_session.get(
-            url, headers=headers, params=params
+            url, headers=self.headers, params=params
         ) as resp:
             if resp.status == 200:
-                logger.info(f"Fetched Crypto data")
+                logger.info(f"Fetched Crypto data for {params['symbol']}")
             else:
                 logger.warning(
                     f"Crypto API returned non-200 status code: {resp.status}"
@@ -51,14 +113,19 @@ class CryptoClient(AbstractAPIClient):
         #   percentage_change_24h: ...,
         #   ...
         #   value: ... (USD),
+        #   last_updated: utc datetime of the fetch,
+        #   quoted_at: utc datetime of the USD quote, per CoinMarketCap,
         #  }
         out = {}
 
         # refer https://coinmarketcap.com/api/documentation/v1/#operation/getV1CryptocurrencyQuotesLatest
         # for format
 
-        all_data = data["data"]
+        all_data = data.get("data")
+        if all_data is None:
+            raise ValueError(f"Crypto API returned no data: {data.get('status')}")
 
+        now = datetime.utcnow()
         for coin in all_data.values():
             coin_data = {}
             coin_data["name"] = coin["name"]
@@ -69,11 +136,248 @@ class CryptoClient(AbstractAPIClient):
             coin_data["percent_change_7d"] = coin["quote"]["USD"]["percent_change_7d"]
             coin_data["percent_change_30d"] = coin["quote"]["USD"]["percent_change_30d"]
             coin_data["price"] = coin["quote"]["USD"]["price"]
+            coin_data["fiat_prices"] = {
+                currency: quote["price"] for currency, quote in coin["quote"].items()
+            }
+            coin_data["last_updated"] = now
+            coin_data["quoted_at"] = _parse_timestamp(
+                coin["quote"]["USD"].get("last_updated"), default=now
+            )
 
             out[coin["symbol"]] = coin_data
 
         return out
 
+    async def fetch_directory(self) -> List[CoinInfo]:
+        """
+        Gets every active cryptocurrency from the `cryptocurrency/map` endpoint.
+        """
+        url = CryptoClient.API_URL + "/v1/cryptocurrency/map"
+        coins: List[CoinInfo] = []
+        while True:
+            params = {
+                "start": str(len(coins) + 1),
+                "limit": str(self.DIRECTORY_PAGE_SIZE),
+                "sort": "cmc_rank",
+            }
+            async with self.bot.http_session.get(
+                url, headers=self.headers, params=params
+            ) as resp:
+                data = await resp.json()
+            if data.get("data") is None:
+                raise ValueError(f"Crypto API returned no data: {data.get('status')}")
+
+            coins += [CoinInfo.from_map(coin) for coin in data["data"]]
+            if len(data["data"]) < self.DIRECTORY_PAGE_SIZE:
+                return coins
+
+    async def refresh_directory(self) -> None:
+        """
+        Refreshes the directory, and persists it. Failures are logged, and the
+        previous directory is kept.
+        """
+        try:
+            coins = await self.fetch_directory()
+        except Exception as e:
+            logger.error(f"Failed to fetch the crypto directory: {e}")
+            return
+        # lookups keep using the old directory until the new one is built
+        self.directory = await asyncio.get_event_loop().run_in_executor(
+            None, CryptoDirectory, coins, time.time()
+        )
+        logger.info(f"Fetched {len(coins)} cryptocurrencies into the directory")
+        await self.directory.save(self.DIRECTORY_PATH)
+
+    def resolve(self, query: str) -> Optional[str]:
+        """
+        Resolves a symbol, name or slug to a symbol.
+
+        Returns:
+            The symbol, or None if the directory doesn't know `query`. Until the
+            directory has been fetched once, `query` is assumed to be a symbol.
+        """
+        if not self.directory:
+            return query.upper()
+        coin = self.directory.get(query)
+        return coin.symbol if coin is not None else None
+
+    async def get_quotes(self, symbols: Iterable[str]) -> Dict[str, dict]:
+        """
+        Gets the latest quotes for the given symbols.
+
+        Fresh quotes come straight from the cache; stale ones are returned as they
+        are and refreshed in the background; missing ones are fetched.
+
+        Returns:
+            Parsed quotes by symbol. Symbols unknown to the API are left out.
+
+        Raises:
+            ContentNotFoundError: a missing quote couldn't be fetched.
+        """
+        now = datetime.utcnow()
+        out: Dict[str, dict] = {}
+        stale: List[str] = []
+        missing: List[str] = []
+
+        for symbol in {s.upper() for s in symbols}:
+            quote = self.cache["data"].get(symbol)
+            if quote is None:
+                missing.append(symbol)
+                continue
+            out[symbol] = quote
+            if now - quote["last_updated"] >= self.QUOTE_TTL:
+                stale.append(symbol)
+
+        if stale:
+            for future in self._request(stale).values():
+                # nobody awaits a background refresh, don't warn about its errors
+                future.add_done_callback(_consume_exception)
+
+        if missing:
+            futures = self._request(missing)
+            await asyncio.wait(futures.values())
+            failed = False
+            for symbol, future in futures.items():
+                if future.exception() is None:
+                    quote = future.result()
+                else:
+                    # unless a request that went through cached it meanwhile
+                    quote = self.cache["data"].get(symbol)
+                    failed = failed or quote is None
+                if quote is not None:
+                    out[symbol] = quote
+            if failed:
+                raise ContentNotFoundError(
+                    "Couldn't reach CoinMarketCap, try again later"
+                )
+
+        return out
+
+    async def get_quote(self, symbol: str) -> Optional[dict]:
+        return (await self.get_quotes([symbol])).get(symbol.upper())
+
+    def cached_embed(self, symbol: str) -> Optional[Embed]:
+        """
+        The pre-rendered embed of a symbol, if its quote is still fresh.
+        """
+        entry = self._embeds.get(symbol)
+        if entry is None or datetime.utcnow() - entry[0] >= self.QUOTE_TTL:
+            return None
+        return entry[1]
+
+    async def get_embed(self, symbol: str) -> Optional[Embed]:
+        """
+        Gets the embed of a symbol's latest quote; see `get_quotes` for how
+        quotes are fetched.
+        """
+        embed = self.cached_embed(symbol.upper())
+        if embed is not None:
+            return embed
+
+        quote = await self.get_quote(symbol)
+        if quote is None:
+            return None
+        version, embed = self._embeds.get(quote["symbol"], (None, None))
+        if version != quote["last_updated"]:
+            embed = self._render(quote)
+        return embed
+
+    async def refresh(self) -> None:
+        """
+        Refreshes the quotes of every tracked symbol, in one request, and
+        adds them to the price history.
+
+        Only this periodic refresh feeds the history, so its samples stay
+        evenly spaced; on-demand fetches in between would crowd the series.
+        """
+        futures = self._request(self.tracked)
+        await asyncio.wait(futures.values())
+        quotes = {}
+        for symbol, future in futures.items():
+            quote = future.result()
+            if quote is not None:
+                quotes[symbol] = quote
+        self.history.record(quotes)
+
+    def _request(self, symbols: Iterable[str]) -> Dict[str, "asyncio.Future"]:
+        """
+        Gets a future for the quote of each symbol, joining the in-flight request
+        for a symbol if there is one, else adding it to the next batch.
+        """
+        loop = asyncio.get_event_loop()
+        futures = {}
+        for symbol in symbols:
+            future = self._inflight.get(symbol)
+            if future is None:
+                future = self._inflight[symbol] = loop.create_future()
+                self._batch.add(symbol)
+            futures[symbol] = future
+
+        if self._batch and self._batch_handle is None:
+            self._batch_handle = loop.call_later(self.BATCH_WINDOW, self._flush)
+        return futures
+
+    def _flush(self) -> None:
+        self._batch_handle = None
+        batch, self._batch = self._batch, set()
+        self._tasks.spawn(self._fetch_batch(batch))
+
+    async def _fetch_batch(self, symbols: Set[str]) -> None:
+        try:
+            quotes = self.parse_data(await self.fetch_data(symbols))
+        except Exception as e:
+            logger.error(f"Failed to fetch crypto quotes for {symbols}: {e}")
+            for symbol in symbols:
+                self._inflight.pop(symbol).set_exception(e)
+            return
+
+        self._update_cache(quotes)
+        for symbol in symbols:
+            if symbol not in quotes:
+                self.tracked.discard(symbol)  # delisted, or never existed
+            self._inflight.pop(symbol).set_result(quotes.get(symbol))
+
+    def _update_cache(self, quotes: Dict[str, dict]) -> None:
+        """
+        Updates the bot's internal cache with freshly fetched quotes.
+        """
+        self.cache["data"].update(quotes)
+        self.cache["last_updated"] = datetime.utcnow()
+        self.tracked.update(quotes)
+        for quote in quotes.values():
+            self._render(quote)
+        self._update_rates(quotes)
+        self.bot.dispatch("crypto_refresh", quotes)
+
+    def _update_rates(self, quotes: Dict[str, dict]) -> None:
+        """
+        Rebuilds the cross-rate matrix over every cached crypto and fiat currency.
+        """
+        for quote in quotes.values():
+            # a coin's price in USD over its price in X is the USD value of one X
+            for currency, price in quote["fiat_prices"].items():
+                if price:
+                    self.fiat_values[currency] = quote["price"] / price
+            break  # any coin will do
+
+        usd_values = {s: q["price"] for s, q in self.cache["data"].items()}
+        usd_values.update(self.fiat_values)  # fiat wins if a coin shares its code
+        self.rates.update(usd_values)
+
+    def _render(self, quote: dict) -> Embed:
+        """
+        Renders a quote's embed, and caches it until the quote is refreshed.
+        The embed is shared by every message that sends it, so it must not be modified.
+        """
+        embed = self.prepare_output(quote)
+        embed.timestamp = quote["last_updated"]
+        embed.set_footer(text="Data last updated", icon_url=self.bot.user.avatar_url)
+        self._embeds[quote["symbol"]] = (quote["last_updated"], embed)
+        return embed
+
+    async def close(self) -> None:
+        await self.history.save()
+
     def prepare_output(self, crypto_data: Any) -> Embed:
         """
         Prepares Embed output for a specified crypto.
@@ -98,3 +402,19 @@ class CryptoClient(AbstractAPIClient):
         # set embed timestamp before sending
 
         return embed
+
+
+def _parse_timestamp(value: Optional[str], *, default: datetime) -> datetime:
+    """CoinMarketCap's ISO 8601 timestamps -> naive UTC datetime."""
+    if value is None:
+        return default
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return default
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _consume_exception(future: "asyncio.Future") -> None:
+    if not future.cancelled():
+        future.exception()
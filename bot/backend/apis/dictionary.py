@@ -1,15 +1,159 @@
 """Interacting with the dictionary API."""
+import asyncio
 from logging import error
-from typing import List, Optional, Union
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
+from decouple import config
 from loguru import logger
 from discord import Color, Embed
 
 from bot.backend.apis.abc import AbstractAPIClient
+from bot.backend.dictionary_cache import DictionaryCache
+from bot.backend.dictionary_index import INDEX_PATH, DictionaryIndex, IndexFormatError
+from bot.backend.word_completer import WordCompleter
+from bot.utils.constants import DATA_DIR
 
 
 class DictionaryClient(AbstractAPIClient):
+    """
+    Gets the meanings of words from dictionaryapi.dev.
+
+    Words in the offline `index`, if one has been imported, are answered
+    without a request. Otherwise parsed entries are cached by `cache`,
+    including "word not found" answers, and concurrent lookups of the same
+    word share one request; at most `UPSTREAM_CONCURRENCY` requests run at once.
+
+    Words that are found are added to `completer`, for autocomplete, along
+    with the optional `DICTIONARY_WORDLIST` file.
+    """
+
     API_URL = "https://api.dictionaryapi.dev/api/v2/entries/{language}/{word}".format
+    # requests to the API at once, across every command
+    UPSTREAM_CONCURRENCY = config("DICTIONARY_CONCURRENCY", default=4, cast=int)
+    MAX_WORDS = 10  # per command
+
+    def __init__(self, bot: "UtilityBot") -> None:  # type: ignore
+        super().__init__(bot)
+        self.cache = DictionaryCache(
+            DATA_DIR / "dictionary_cache.sqlite3",
+            size=config("DICTIONARY_CACHE_SIZE", default=1024, cast=int),
+            hit_ttl=config("DICTIONARY_HIT_TTL", default=30 * 24 * 60 * 60, cast=int),
+            miss_ttl=config("DICTIONARY_MISS_TTL", default=24 * 60 * 60, cast=int),
+        )
+        self._inflight: Dict[Tuple[str, str], "asyncio.Task[dict]"] = {}
+        self._upstream = asyncio.Semaphore(self.UPSTREAM_CONCURRENCY)
+        self.completer = WordCompleter(
+            max_words=config("DICTIONARY_WORDLIST_SIZE", default=500_000, cast=int),
+            recent_size=10_000,
+        )
+        self.index: Optional[DictionaryIndex] = None
+        if INDEX_PATH.exists():
+            try:
+                self.index = DictionaryIndex(INDEX_PATH)
+                logger.info(f"Opened offline dictionary of {len(self.index)} words")
+            except IndexFormatError as e:
+                logger.warning(f"Not using the offline dictionary: {e}")
+
+    async def open(self) -> None:
+        await self.cache.open()
+        # oldest first, so the newest end up most recently used
+        cached = await self.cache.words("en_GB", self.completer.recent_size)
+        for word in reversed(cached):
+            self.completer.add(word)
+
+        wordlist = config("DICTIONARY_WORDLIST", default=None)
+        if wordlist is not None:
+            await asyncio.get_event_loop().run_in_executor(
+                None, self.completer.load_wordlist, Path(wordlist)
+            )
+
+    async def close(self) -> None:
+        await self.cache.close()
+        if self.index is not None:
+            self.index.close()
+
+    async def get_meaning(self, word: str, *, language: str = "en_GB") -> dict:
+        """
+        Gets the parsed entry of a word (see `parse_data`), from the offline
+        index or the cache if it is there, else from the API.
+        """
+        word = word.strip().lower()
+        entry = await self._get_cached(word, language)
+        if entry is not None:
+            return entry
+        return await self._get_upstream(word, language)
+
+    async def get_meanings(
+        self, words: Iterable[str], *, language: str = "en_GB", concurrency: int = 3
+    ) -> Dict[str, dict]:
+        """
+        Gets the parsed entries of several words, by word, in the given order.
+
+        Cached words are answered right away, without waiting on the others;
+        at most `concurrency` of the rest are looked up at once (and at most
+        `UPSTREAM_CONCURRENCY` across every command). A word whose lookup
+        fails gets an error entry instead of failing the others.
+        """
+        limit = asyncio.Semaphore(concurrency)
+
+        async def lookup(word: str) -> dict:
+            entry = await self._get_cached(word, language)
+            if entry is not None:
+                return entry
+            async with limit:
+                return await self._get_upstream(word, language)
+
+        unique = list(dict.fromkeys(w.strip().lower() for w in words))
+        results = await asyncio.gather(
+            *(lookup(word) for word in unique), return_exceptions=True
+        )
+        out = {}
+        for word, result in zip(unique, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to look up {word}: {result!r}")
+                result = self.parse_data(None)
+            out[word] = result
+        return out
+
+    async def _get_cached(self, word: str, language: str) -> Optional[dict]:
+        if self.index is not None and self.index.language == language:
+            entry = self.index.get(word)
+            if entry is not None:
+                self.cache.stats.index_hits += 1
+                self.completer.add(word)
+                return entry
+
+        entry = await self.cache.get(language, word)
+        if entry is not None and "error" not in entry:
+            self.completer.add(word)
+        return entry
+
+    async def _get_upstream(self, word: str, language: str) -> dict:
+        key = (language, word)
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.create_task(
+                self._lookup(language, word)
+            )
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # one caller giving up shouldn't cancel the lookup for the others
+        return await asyncio.shield(task)
+
+    async def _lookup(self, language: str, word: str) -> dict:
+        async with self._upstream:
+            self.cache.stats.upstream_calls += 1
+            data = await self.fetch_data(language=language, word=word)
+        entry = self.parse_data(data)
+        # a list is the word's entries, a dict with a title means it doesn't
+        # exist; anything else is a failed request, which is worth retrying
+        if (isinstance(data, list) and data) or (
+            isinstance(data, dict) and "title" in data
+        ):
+            await self.cache.put(language, word, entry)
+        if "error" not in entry:
+            self.completer.add(word)
+        return entry
 
     async def fetch_data(self, *, language: str = "en_GB", word: str) -> Optional[list]:
         """
@@ -90,6 +234,17 @@ class DictionaryClient(AbstractAPIClient):
 
             return em
 
+    def make_summary(self, word: str, data: dict) -> str:
+        """
+        A short output of a parsed entry, for listing along with other words.
+        """
+        err = data.get("error")
+        if err:
+            return f"**{word}**\n{err}"
+        return f"**{data['title']}** {data['phonetic']}\n\n" + "\n".join(
+            data["meanings"]
+        )
+
     def _make_string_output(self, data: dict) -> str:
         out = f"__**Dictionary**__: {data['title']}\n\n"
         out += data["phonetic"]
@@ -1,33 +1,117 @@
 """interacting with the music api"""
+import asyncio
+import time
+from typing import Coroutine, Iterable, List, Optional, Tuple, Union
 
 import tekore
 from decouple import config
 from loguru import logger
 
 from bot.backend.exceptions import ContentNotFoundError
+from bot.backend.track_store import TrackStore
+from bot.utils.background import BackgroundTasks
+from bot.utils.constants import DATA_DIR
+
+
+class CountingSender(tekore.ExtendingSender):
+    """Counts the requests going through to `sender`, and the time they take."""
+
+    def __init__(self, sender: tekore.Sender) -> None:
+        super().__init__(sender)
+        self.requests = 0
+        self.errors = 0  # failed, or answered with an error status
+        self.seconds = 0.0
+
+    def send(
+        self, request: tekore.Request
+    ) -> Union[tekore.Response, Coroutine[None, None, tekore.Response]]:
+        if self.is_async:
+            return self._async_send(request)
+        start = time.perf_counter()
+        response = None
+        try:
+            response = self.sender.send(request)
+            return response
+        finally:
+            self._count(start, response)
+
+    async def _async_send(self, request: tekore.Request) -> tekore.Response:
+        start = time.perf_counter()
+        response = None
+        try:
+            response = await self.sender.send(request)
+            return response
+        finally:
+            self._count(start, response)
+
+    def _count(self, start: float, response: Optional[tekore.Response]) -> None:
+        self.requests += 1
+        self.seconds += time.perf_counter() - start
+        if response is None or response.status_code >= 400:
+            self.errors += 1
 
 
 class MusicClient:
-    """Manage music searches and recommendations"""
+    """
+    Manage music searches and recommendations
+
+    The app token is requested on first use, not at startup, and refreshed in
+    the background `REFRESH_MARGIN` seconds before it expires; requests made
+    meanwhile share one token request.
+    Responses are cached by a `CachingSender` of SPOTIFY_CACHE_SIZE entries,
+    between two `CountingSender`s: `sender` counts searches, `network` the
+    ones that went through to Spotify.
+    Found tracks, and their audio features, are also kept in a `TrackStore`,
+    which answers repeated searches.
+    """
+
+    REFRESH_MARGIN = 300  # seconds
+    RETRY_DELAY = 30  # seconds, after a failed refresh
+    FEATURES_BATCH = 100  # tracks per audio features request, Spotify's maximum
 
     def __init__(self):
-        client_id = config("SPOTIFY_CLIENT_ID")
-        client_secret = config("SPOTIFY_CLIENT_SECRET")
-        app_token = tekore.request_client_token(client_id, client_secret)
-        sender = tekore.CachingSender(max_size=30, sender=tekore.AsyncSender())
-        self.spotify = tekore.Spotify(app_token, sender=sender, asynchronous=True)
+        self.credentials = tekore.Credentials(
+            config("SPOTIFY_CLIENT_ID"),
+            config("SPOTIFY_CLIENT_SECRET"),
+            asynchronous=True,
+        )
+        self.network = CountingSender(tekore.AsyncSender())
+        self.sender = CountingSender(
+            tekore.CachingSender(
+                max_size=config("SPOTIFY_CACHE_SIZE", default=256, cast=int),
+                sender=self.network,
+            )
+        )
+        self.spotify = tekore.Spotify(sender=self.sender, asynchronous=True)
+        self._token: Optional[tekore.Token] = None
+        self._token_request: Optional["asyncio.Task[tekore.Token]"] = None
+        self._refresh_handle: Optional[asyncio.TimerHandle] = None
+        self._refresh_task: Optional["asyncio.Task[None]"] = None
+        self.tracks = TrackStore(
+            DATA_DIR / "tracks.sqlite3",
+            search_ttl=config("SPOTIFY_SEARCH_TTL", default=7 * 86400, cast=int),
+        )
+        self._tasks = BackgroundTasks()
+
+    async def open(self) -> None:
+        await self.tracks.open()
 
     async def fetch_track_data(self, query: str) -> tekore.model.FullTrack:
         """Fetch track data"""
 
+        stored = await self.tracks.get(query)
+        if stored is not None:
+            return stored
+
         logger.info(f"Searching Spotify for {query} MUSIC")
 
         try:
+            await self.ensure_token()
             (tracks,) = await self.spotify.search(
                 query, ("track",), limit=1, include_external="audio"
             )
 
-            return tracks.items[0]
+            track = tracks.items[0]
 
         except tekore.HTTPError as error:
             logger.warning(
@@ -48,3 +132,88 @@ class MusicClient:
             raise ContentNotFoundError(
                 f"Could not find MUSIC with name {query} \nPlease wait for a while before trying again"
             ) from error
+
+        await self.tracks.put(query, track)
+        # features are only needed by `similar`, no need to wait for them
+        self._tasks.spawn(self.fetch_features([track.id]))
+        return track
+
+    async def fetch_features(self, track_ids: Iterable[str]) -> None:
+        """Fetches and stores the audio features of tracks that don't have them yet."""
+        missing = list({i for i in track_ids if not self.tracks.has_features(i)})
+        try:
+            await self.ensure_token()
+            for start in range(0, len(missing), self.FEATURES_BATCH):
+                chunk = missing[start : start + self.FEATURES_BATCH]
+                await self.tracks.put_features(
+                    await self.spotify.tracks_audio_features(chunk)
+                )
+        except Exception as e:
+            # e.g. apps registered since late 2024 can't get audio features
+            logger.warning(f"Could not fetch audio features of {missing}: {e}")
+
+    async def similar(
+        self, track_id: str, candidates: List[str], limit: int = 10
+    ) -> List[Tuple[str, float]]:
+        """
+        Ranks tracks by how similar they sound to one, see `TrackStore.similar`.
+
+        Raises:
+            ContentNotFoundError: Spotify has no audio features for the track.
+        """
+        await self.fetch_features([track_id, *candidates])
+        if not self.tracks.has_features(track_id):
+            raise ContentNotFoundError("Spotify has no audio features for this track")
+        return self.tracks.similar(track_id, candidates, limit)
+
+    async def ensure_token(self) -> None:
+        """Gets an app token, if there's no valid one yet."""
+        if self._token is None or self._token.expires_in <= 0:
+            await self._request_token()
+
+    async def _request_token(self) -> None:
+        if self._token_request is None:
+            self._token_request = asyncio.create_task(
+                self.credentials.request_client_token()
+            )
+        request = self._token_request
+        try:
+            token = await asyncio.shield(request)
+        finally:
+            if self._token_request is request and request.done():
+                self._token_request = None
+
+        if token is not self._token:
+            logger.info(f"Got a Spotify token, expiring in {token.expires_in}s")
+            self._token = token
+            self.spotify.token = token
+            self._schedule_refresh(token.expires_in - self.REFRESH_MARGIN)
+
+    def _schedule_refresh(self, delay: float) -> None:
+        if self._refresh_handle is not None:
+            self._refresh_handle.cancel()
+        self._refresh_handle = asyncio.get_event_loop().call_later(
+            max(delay, 0), self._start_refresh
+        )
+
+    def _start_refresh(self) -> None:
+        self._refresh_handle = None
+        self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _refresh(self) -> None:
+        try:
+            await self._request_token()
+        except Exception as e:
+            # the current token is still valid until it expires
+            logger.error(f"Could not refresh the Spotify token: {e}")
+            self._schedule_refresh(self.RETRY_DELAY)
+
+    async def close(self) -> None:
+        if self._refresh_handle is not None:
+            self._refresh_handle.cancel()
+        for task in (self._refresh_task, self._token_request, *self._tasks):
+            if task is not None:
+                task.cancel()
+        await self.sender.close()
+        await self.credentials.close()
+        await self.tracks.close()
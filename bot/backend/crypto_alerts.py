@@ -0,0 +1,308 @@
+"""Crypto price alerts: notify users when a price crosses a threshold."""
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Set, Tuple
+
+from discord import Embed, Forbidden
+from loguru import logger
+
+from bot.backend.crypto_history import to_epoch
+from bot.utils.background import BackgroundTasks
+from bot.utils.constants import DATA_DIR, EmbedColour
+from bot.utils.ratelimit import message_limiter
+from bot.utils.sqlite import AsyncSQLite
+
+if TYPE_CHECKING:
+    from bot.internal.bot import UtilityBot
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS crypto_alerts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    channel_id INTEGER,
+    symbol TEXT NOT NULL,
+    above INTEGER NOT NULL,
+    threshold REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS crypto_alerts_user_id ON crypto_alerts(user_id);
+"""
+
+
+class Alert:
+    """
+    A one-off alert, for when `symbol` goes above (or below) `threshold` USD.
+    """
+
+    __slots__ = (
+        "id",
+        "user_id",
+        "channel_id",
+        "symbol",
+        "above",
+        "threshold",
+        "created_at",
+    )
+
+    def __init__(
+        self,
+        *,
+        user_id: int,
+        channel_id: Optional[int],
+        symbol: str,
+        above: bool,
+        threshold: float,
+        created_at: Optional[datetime] = None,
+        id: Optional[int] = None,
+    ) -> None:
+        self.id = id  # assigned by the store
+        self.user_id = user_id
+        self.channel_id = channel_id
+        self.symbol = symbol
+        self.above = above
+        self.threshold = threshold
+        self.created_at = created_at or datetime.utcnow()
+
+    @classmethod
+    def from_record(cls, record: Mapping[str, Any]) -> "Alert":
+        return cls(
+            id=record["id"],
+            user_id=record["user_id"],
+            channel_id=record["channel_id"],
+            symbol=record["symbol"],
+            above=bool(record["above"]),
+            threshold=record["threshold"],
+            created_at=datetime.utcfromtimestamp(record["created_at"]),
+        )
+
+    def describe(self) -> str:
+        return f"`{self.id}` • {self.symbol} {'>' if self.above else '<'} ${self.threshold:,.6g}"
+
+
+class ThresholdIndex:
+    """
+    Sorted thresholds of one direction (above or below) for one symbol,
+    with the IDs of their alerts in a parallel list.
+    """
+
+    __slots__ = ("thresholds", "ids")
+
+    def __init__(self) -> None:
+        self.thresholds: List[float] = []
+        self.ids: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, threshold: float, id: int) -> None:
+        i = bisect_right(self.thresholds, threshold)
+        self.thresholds.insert(i, threshold)
+        self.ids.insert(i, id)
+
+    def remove(self, threshold: float, id: int) -> bool:
+        i = bisect_left(self.thresholds, threshold)
+        while i < len(self.ids) and self.thresholds[i] == threshold:
+            if self.ids[i] == id:
+                del self.thresholds[i]
+                del self.ids[i]
+                return True
+            i += 1
+        return False
+
+    def pop_below(self, price: float) -> List[int]:
+        """Removes and returns the alerts with thresholds < price."""
+        i = bisect_left(self.thresholds, price)
+        ids = self.ids[:i]
+        del self.thresholds[:i], self.ids[:i]
+        return ids
+
+    def pop_above(self, price: float) -> List[int]:
+        """Removes and returns the alerts with thresholds > price."""
+        i = bisect_right(self.thresholds, price)
+        ids = self.ids[i:]
+        del self.thresholds[i:], self.ids[i:]
+        return ids
+
+
+class AlertIndex:
+    """
+    Pending alerts by symbol. Finding the alerts a price triggers is a bisect
+    per direction, O(log n + k) for k triggered alerts.
+    """
+
+    def __init__(self) -> None:
+        # symbol -> (alerts for going above, alerts for going below)
+        self._symbols: Dict[str, Tuple[ThresholdIndex, ThresholdIndex]] = {}
+        self._alerts: Dict[int, Alert] = {}
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def symbols(self) -> Set[str]:
+        return set(self._symbols)
+
+    def get(self, id: int) -> Optional[Alert]:
+        return self._alerts.get(id)
+
+    def add(self, alert: Alert) -> None:
+        above, below = self._symbols.setdefault(
+            alert.symbol, (ThresholdIndex(), ThresholdIndex())
+        )
+        (above if alert.above else below).add(alert.threshold, alert.id)  # type: ignore
+        self._alerts[alert.id] = alert  # type: ignore
+
+    def remove(self, id: int) -> Optional[Alert]:
+        alert = self._alerts.pop(id, None)
+        if alert is None:
+            return None
+        above, below = self._symbols[alert.symbol]
+        (above if alert.above else below).remove(alert.threshold, id)
+        self._drop_if_empty(alert.symbol)
+        return alert
+
+    def pop_triggered(self, symbol: str, price: float) -> List[Alert]:
+        """
+        Removes and returns the alerts of `symbol` that `price` triggers.
+        """
+        indexes = self._symbols.get(symbol)
+        if indexes is None:
+            return []
+        above, below = indexes
+        ids = above.pop_below(price) + below.pop_above(price)
+        self._drop_if_empty(symbol)
+        return [self._alerts.pop(id) for id in ids]
+
+    def _drop_if_empty(self, symbol: str) -> None:
+        above, below = self._symbols[symbol]
+        if not above and not below:
+            del self._symbols[symbol]
+
+
+class AlertManager:
+    """
+    Keeps track of crypto price alerts.
+
+    Every alert is held in memory in an `AlertIndex`, and persisted to a local
+    SQLite file so that alerts survive restarts. `check` is called with every
+    batch of refreshed quotes; alerts that trigger are removed in bulk and
+    sent to their users.
+    """
+
+    def __init__(self, bot: UtilityBot) -> None:
+        self.bot = bot
+        self.db = AsyncSQLite(DATA_DIR / "crypto_alerts.sqlite3")
+        self.index = AlertIndex()
+        self.limiter = message_limiter
+        self._opened = asyncio.Event()
+        self._tasks = BackgroundTasks()
+
+    async def open(self) -> None:
+        """Opens the store and loads every alert into the index."""
+        await self.db.connect()
+        await self.db.executescript(SQLITE_SCHEMA)
+        for record in await self.db.fetch("SELECT * FROM crypto_alerts"):
+            self.index.add(Alert.from_record(record))
+        self._opened.set()
+        logger.info(f"Loaded {len(self.index)} crypto alerts")
+
+    async def close(self) -> None:
+        await self.db.close()
+
+    async def add(self, alert: Alert) -> Alert:
+        await self._opened.wait()
+        alert.id = await self.db.insert(
+            (
+                "INSERT INTO crypto_alerts"
+                "(user_id, channel_id, symbol, above, threshold, created_at)"
+                "VALUES (?, ?, ?, ?, ?, ?)"
+            ),
+            alert.user_id,
+            alert.channel_id,
+            alert.symbol,
+            alert.above,
+            alert.threshold,
+            to_epoch(alert.created_at),
+        )
+        self.index.add(alert)
+        return alert
+
+    async def remove(self, user_id: int, id: int) -> Optional[Alert]:
+        """
+        Removes one of a user's alerts.
+
+        Returns:
+            The alert, or None if the user has no alert with that ID.
+        """
+        await self._opened.wait()
+        alert = self.index.get(id)
+        if alert is None or alert.user_id != user_id:
+            return None
+        self.index.remove(id)
+        await self.db.execute("DELETE FROM crypto_alerts WHERE id = ?", id)
+        return alert
+
+    async def for_user(self, user_id: int) -> List[Alert]:
+        await self._opened.wait()
+        rows = await self.db.fetch(
+            "SELECT * FROM crypto_alerts WHERE user_id = ? ORDER BY symbol, threshold",
+            user_id,
+        )
+        return [Alert.from_record(row) for row in rows]
+
+    def check(self, quotes: Dict[str, dict]) -> None:
+        """
+        Triggers the alerts crossed by freshly fetched quotes.
+        """
+        if not self._opened.is_set():
+            return
+
+        by_user: Dict[int, List[Tuple[Alert, float]]] = {}
+        for symbol, quote in quotes.items():
+            for alert in self.index.pop_triggered(symbol, quote["price"]):
+                by_user.setdefault(alert.user_id, []).append((alert, quote["price"]))
+        if not by_user:
+            return
+
+        self._tasks.spawn(self._trigger(by_user))
+
+    async def _trigger(self, by_user: Dict[int, List[Tuple[Alert, float]]]) -> None:
+        ids = [alert.id for triggered in by_user.values() for alert, _ in triggered]
+        await self.db.executemany(
+            "DELETE FROM crypto_alerts WHERE id = ?", [(id,) for id in ids]
+        )
+        logger.info(f"Triggered {len(ids)} crypto alerts")
+
+        for user_id, triggered in by_user.items():
+            try:
+                await self._notify(user_id, triggered)
+            except Exception as e:
+                logger.error(f"Failed to send crypto alerts to {user_id}: {e}")
+
+    async def _notify(self, user_id: int, triggered: List[Tuple[Alert, float]]) -> None:
+        """
+        Sends a user their triggered alerts in DMs, or in the channel the
+        first alert was set in if their DMs are closed.
+        """
+        embed = Embed(title="Crypto alert!", color=EmbedColour.Warning.value)
+        embed.description = "\n".join(
+            f"{alert.symbol} is {'above' if alert.above else 'below'} "
+            f"${alert.threshold:,.6g}: now ${price:,.6g}"
+            for alert, price in triggered[:25]
+        )
+
+        target = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+        try:
+            await self.limiter.acquire(("dm", user_id))
+            await target.send(embed=embed)
+        except Forbidden:
+            channel_id = triggered[0][0].channel_id
+            channel = self.bot.get_channel(channel_id)  # type: ignore
+            if channel is None:
+                return
+            await self.limiter.acquire(("channel", channel_id))
+            await channel.send(content=target.mention, embed=embed)
@@ -0,0 +1,151 @@
+"""Rendering crypto price charts, off the event loop."""
+import asyncio
+import io
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Hashable, Optional
+
+import numpy as np
+from decouple import config
+from loguru import logger
+
+from bot.backend.crypto_history import rolling_mean
+
+
+class ChartQueueFull(Exception):
+    """Raised when too many charts are already waiting to be rendered."""
+
+
+def _init_worker() -> None:
+    # pay for the matplotlib import once per worker, not on the first chart
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot  # noqa: F401
+
+
+def render_chart(title: str, samples: np.ndarray) -> bytes:
+    """
+    Renders (timestamp, price) samples as a PNG line chart, with a moving average.
+    Runs in a worker process.
+    """
+    import matplotlib.dates as mdates
+    import matplotlib.pyplot as plt
+
+    times = [datetime.utcfromtimestamp(t) for t in samples[:, 0]]
+    prices = samples[:, 1]
+
+    fig, ax = plt.subplots(figsize=(8, 4), dpi=100)
+    try:
+        ax.plot(times, prices, color="#f4c2c2", linewidth=1.5, label="Price")
+        ax.fill_between(times, prices, prices.min(), color="#f4c2c2", alpha=0.15)
+
+        window = max(len(prices) // 10, 2)
+        if len(prices) > window:
+            ax.plot(
+                times[window - 1 :],
+                rolling_mean(prices, window),
+                color="#8899aa",
+                linewidth=1,
+                label=f"{window} sample average",
+            )
+
+        ax.set_title(title)
+        ax.set_ylabel("USD")
+        ax.xaxis.set_major_formatter(
+            mdates.ConciseDateFormatter(ax.xaxis.get_major_locator())
+        )
+        ax.grid(alpha=0.3)
+        ax.legend(loc="upper left")
+        fig.tight_layout()
+
+        out = io.BytesIO()
+        fig.savefig(out, format="png")
+        return out.getvalue()
+    finally:
+        plt.close(fig)
+
+
+class ChartRenderer:
+    """
+    Renders charts in a process pool, so the bot's event loop is never blocked.
+
+    At most `workers` charts are rendered at once, and at most `max_queued`
+    wait for a worker; past that, `render` raises ChartQueueFull rather than
+    letting the backlog grow. Rendered images are kept in an LRU cache, keyed
+    by the caller: keys should include the data's version, so a chart is only
+    rendered again once the data has changed.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int = config("CRYPTO_CHART_WORKERS", default=2, cast=int),
+        max_queued: int = 8,
+        cache_size: int = 64,
+    ) -> None:
+        self.workers = workers
+        self.max_queued = max_queued
+        self.cache_size = cache_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots = asyncio.Semaphore(workers)
+        self._queued = 0
+        self._cache: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._inflight: Dict[Hashable, "asyncio.Future[bytes]"] = {}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                # forking a process with running threads (sqlite, aiohttp's
+                # resolver) isn't safe; spawned workers start clean. They don't
+                # re-run the bot, as `python -m bot` runs it from bot.__main__
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return self._executor
+
+    async def render(self, key: Hashable, title: str, samples: np.ndarray) -> bytes:
+        """
+        Gets the chart for `key`, rendering it from `samples` if it isn't cached.
+        Concurrent requests for the same key share one render.
+        """
+        png = self._cache.get(key)
+        if png is not None:
+            self._cache.move_to_end(key)
+            return png
+        if key in self._inflight:
+            return await asyncio.shield(self._inflight[key])
+
+        if self._queued >= self.max_queued + self.workers:
+            raise ChartQueueFull("Too many charts are being drawn, try again in a bit")
+
+        future = self._inflight[key] = asyncio.get_event_loop().create_future()
+        self._queued += 1
+        try:
+            async with self._slots:
+                png = await asyncio.get_event_loop().run_in_executor(
+                    self._get_executor(), render_chart, title, samples
+                )
+            self._cache[key] = png
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            future.set_result(png)
+            return png
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # retrieved by whoever joined, if anyone
+            raise
+        finally:
+            self._queued -= 1
+            del self._inflight[key]
+
+    def close(self) -> None:
+        if self._executor is not None:
+            logger.info("Shutting down chart workers")
+            self._executor.shutdown(wait=False)
@@ -0,0 +1,181 @@
+"""Directory of known cryptocurrencies, for resolving what users type to a symbol."""
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from loguru import logger
+
+from bot.utils.files import atomic_write
+from bot.utils.text import trigrams
+
+
+@dataclass(frozen=True)
+class CoinInfo:
+    symbol: str
+    name: str
+    slug: str
+    rank: int  # market cap rank, lower is bigger
+
+    @classmethod
+    def from_map(cls, coin: Dict[str, Any]) -> "CoinInfo":
+        """From an entry of CoinMarketCap's `cryptocurrency/map` endpoint."""
+        return cls(
+            symbol=coin["symbol"],
+            name=coin["name"],
+            slug=coin["slug"],
+            # unranked coins sort after every ranked one
+            rank=coin.get("rank") or 1 << 30,
+        )
+
+
+class CryptoDirectory:
+    """
+    Every cryptocurrency CoinMarketCap knows about, indexed by lowercased
+    symbol, name and slug.
+
+    - exact lookups are a dict lookup;
+    - prefix lookups walk a trie, whose nodes hold the biggest coins under
+      them, so completions cost O(len(prefix));
+    - fuzzy lookups rank keys by the trigrams they share with the query,
+      counted over integer posting lists with numpy.
+
+    Where coins share a key (symbols aren't unique) the biggest coin wins.
+    A directory isn't modified once built: to refresh it, build a new one
+    (off the event loop, building takes a while) and swap it in.
+    """
+
+    MAX_AGE = 24 * 60 * 60  # seconds
+    COMPLETIONS = 5  # kept per trie node
+    MIN_SIMILARITY = 0.3
+
+    def __init__(self, coins: Iterable[CoinInfo] = (), updated_at: float = 0.0) -> None:
+        self.updated_at = updated_at
+        self._coins = sorted(coins, key=lambda c: c.rank)
+        self._keys: Dict[str, CoinInfo] = {}
+        # char -> child node; the "" key holds the node's completions
+        self._trie: Dict[str, Any] = {}
+        grams: Dict[str, List[int]] = {}
+        gram_counts: List[int] = []
+
+        for coin in self._coins:
+            for key in {coin.symbol.lower(), coin.name.lower(), coin.slug}:
+                if key in self._keys:
+                    continue  # taken by a bigger coin
+                key_grams = trigrams(key)
+                for gram in key_grams:
+                    grams.setdefault(gram, []).append(len(self._keys))
+                gram_counts.append(len(key_grams))
+                self._keys[key] = coin
+
+                node = self._trie
+                for char in key:
+                    child = node.get(char)
+                    if child is None:
+                        child = node[char] = {"": [coin]}
+                    else:
+                        # coins come biggest first, and a coin's keys may
+                        # share prefixes (the name and slug usually do)
+                        completions = child[""]
+                        if (
+                            len(completions) < self.COMPLETIONS
+                            and completions[-1] is not coin
+                        ):
+                            completions.append(coin)
+                    node = child
+
+        # trigram -> IDs of the keys that have it; an ID indexes the arrays below
+        self._trigrams = {g: np.array(ids, dtype=np.int32) for g, ids in grams.items()}
+        self._key_names = list(self._keys)
+        self._gram_counts = np.array(gram_counts, dtype=np.int32)
+        self._ranks = np.array([c.rank for c in self._keys.values()], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self._coins)
+
+    @property
+    def stale(self) -> bool:
+        return time.time() - self.updated_at >= self.MAX_AGE
+
+    def get(self, query: str) -> Optional[CoinInfo]:
+        """The coin with `query` as its symbol, name or slug."""
+        return self._keys.get(query.strip().lower())
+
+    def complete(self, prefix: str) -> List[CoinInfo]:
+        """The biggest coins with a symbol, name or slug starting with `prefix`."""
+        node = self._trie
+        for char in prefix.strip().lower():
+            node = node.get(char)
+            if node is None:
+                return []
+        return list(node.get("", []))
+
+    def fuzzy(self, query: str, limit: int = COMPLETIONS) -> List[CoinInfo]:
+        """The coins with keys most similar to `query`, by trigram similarity."""
+        query_grams = trigrams(query.strip().lower())
+        postings = [self._trigrams[g] for g in query_grams if g in self._trigrams]
+        if not postings:
+            return []
+
+        # trigrams each key shares with the query, for the keys sharing any:
+        # the length of each run of the same ID in the sorted postings
+        hits = np.sort(np.concatenate(postings))
+        starts = np.flatnonzero(np.concatenate(([True], hits[1:] != hits[:-1])))
+        ids = hits[starts]
+        shared = np.diff(np.append(starts, len(hits)))
+        # jaccard similarity
+        similarity = shared / (len(query_grams) + self._gram_counts[ids] - shared)
+        keep = similarity >= self.MIN_SIMILARITY
+        ids, similarity = ids[keep], similarity[keep]
+        ids = ids[np.lexsort((self._ranks[ids], -similarity))]
+
+        out: List[CoinInfo] = []
+        for id in ids:
+            coin = self._keys[self._key_names[id]]
+            if coin not in out:
+                out.append(coin)
+                if len(out) == limit:
+                    break
+        return out
+
+    def suggest(self, query: str, limit: int = COMPLETIONS) -> List[CoinInfo]:
+        """Coins the user may have meant: completions first, then fuzzy matches."""
+        out = self.complete(query)[:limit]
+        for coin in self.fuzzy(query, limit):
+            if len(out) == limit:
+                break
+            if coin not in out:
+                out.append(coin)
+        return out
+
+    @classmethod
+    def load(cls, path: Path) -> "CryptoDirectory":
+        """Loads a persisted directory, or an empty one if there is none."""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            directory = cls(
+                (CoinInfo(**coin) for coin in data["coins"]), data["updated_at"]
+            )
+        except FileNotFoundError:
+            return cls()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Skipping unreadable crypto directory {path}: {e}")
+            return cls()
+        logger.info(f"Loaded {len(directory)} cryptocurrencies into the directory")
+        return directory
+
+    async def save(self, path: Path) -> None:
+        data = {
+            "updated_at": self.updated_at,
+            "coins": [coin.__dict__ for coin in self._coins],
+        }
+        await asyncio.get_event_loop().run_in_executor(None, _write, path, data)
+
+
+def _write(path: Path, data: Dict[str, Any]) -> None:
+    with atomic_write(path, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
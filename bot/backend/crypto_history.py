@@ -0,0 +1,205 @@
+"""Price history of tracked cryptocurrencies, and statistics over it."""
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional, Set
+from urllib.parse import quote, unquote
+
+import numpy as np
+from loguru import logger
+
+from bot.utils.files import atomic_write
+
+
+def to_epoch(dt: datetime) -> float:
+    """Naive UTC datetime -> epoch seconds."""
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _filename(symbol: str) -> str:
+    """
+    A symbol as a file name: tickers come from the API, and can hold "/",
+    "." or any Unicode, so everything but letters, digits, "_", "-" and "~"
+    is percent-encoded (reversed by `unquote`).
+    """
+    return quote(symbol, safe="").replace(".", "%2E") + ".npy"
+
+
+class PriceSeries:
+    """
+    Fixed capacity ring buffer of (epoch timestamp, price) samples for one symbol.
+    Once full, each new sample overwrites the oldest one.
+    """
+
+    __slots__ = ("_data", "_head", "_size")
+
+    def __init__(self, capacity: int) -> None:
+        self._data = np.zeros((capacity, 2), dtype=np.float64)
+        self._head = 0  # where the next sample is written
+        self._size = 0
+
+    @classmethod
+    def from_array(cls, samples: np.ndarray, capacity: int) -> "PriceSeries":
+        """Builds a series from chronological samples, keeping the newest `capacity`."""
+        series = cls(capacity)
+        samples = samples[-capacity:]
+        series._data[: len(samples)] = samples
+        series._size = len(samples)
+        series._head = len(samples) % capacity
+        return series
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    @property
+    def last_timestamp(self) -> Optional[float]:
+        return self._data[self._head - 1, 0] if self._size else None
+
+    def append(self, timestamp: float, price: float) -> bool:
+        """
+        Adds a sample. Samples not newer than the last one are ignored,
+        since the same quote can be seen by several refreshes.
+
+        Returns:
+            Whether the sample was added.
+        """
+        last = self.last_timestamp
+        if last is not None and timestamp <= last:
+            return False
+
+        self._data[self._head] = (timestamp, price)
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        return True
+
+    def view(self) -> np.ndarray:
+        """All samples, oldest first, as an (n, 2) array."""
+        if self._size < self.capacity:
+            return self._data[: self._size]
+        return np.concatenate((self._data[self._head :], self._data[: self._head]))
+
+    def since(self, timestamp: float) -> np.ndarray:
+        """Samples at or after `timestamp`, oldest first."""
+        samples = self.view()
+        start = np.searchsorted(samples[:, 0], timestamp, side="left")
+        return samples[start:]
+
+
+def rolling_mean(values: np.ndarray, n: int) -> np.ndarray:
+    """
+    Mean of every `n` consecutive values, i.e. len(values) - n + 1 means.
+    """
+    if n <= 0 or n > len(values):
+        return np.empty(0)
+    sums = np.cumsum(np.insert(values, 0, 0.0))
+    return (sums[n:] - sums[:-n]) / n
+
+
+@dataclass(frozen=True)
+class WindowStats:
+    """
+    Statistics over the samples of a time window.
+
+    Percentages are fractions (0.05 is 5%); volatility is the standard
+    deviation of the returns between consecutive samples.
+    """
+
+    samples: int
+    start: datetime
+    end: datetime
+    first: float
+    last: float
+    change: float
+    mean: float
+    volatility: float
+    low: float
+    high: float
+    max_drawdown: float
+
+    @classmethod
+    def from_samples(cls, samples: np.ndarray) -> "WindowStats":
+        """
+        Computes the stats over (timestamp, price) samples, oldest first.
+        Needs at least two samples.
+        """
+        prices = samples[:, 1]
+        returns = np.diff(prices) / prices[:-1]
+        running_peak = np.maximum.accumulate(prices)
+
+        return cls(
+            samples=len(prices),
+            start=datetime.utcfromtimestamp(samples[0, 0]),
+            end=datetime.utcfromtimestamp(samples[-1, 0]),
+            first=float(prices[0]),
+            last=float(prices[-1]),
+            change=float(prices[-1] / prices[0] - 1),
+            mean=float(prices.mean()),
+            volatility=float(returns.std()),
+            low=float(prices.min()),
+            high=float(prices.max()),
+            max_drawdown=float((prices / running_peak - 1).min()),
+        )
+
+
+class CryptoHistory:
+    """
+    Keeps a bounded price series per symbol, fed by the periodic quote refresh.
+
+    Each series is persisted as an (n, 2) float64 `.npy` file in `directory`,
+    so memory and disk use per symbol are capped at `capacity` * 16 bytes.
+    """
+
+    def __init__(self, directory: Path, capacity: int) -> None:
+        self.directory = directory
+        self.capacity = capacity
+        self._series: Dict[str, PriceSeries] = {}
+        self._dirty: Set[str] = set()
+
+    def get(self, symbol: str) -> Optional[PriceSeries]:
+        return self._series.get(symbol)
+
+    def record(self, quotes: Dict[str, dict]) -> None:
+        """
+        Adds a sample for each quote, at CoinMarketCap's time for it, so a
+        quote that hasn't changed since the last sample isn't added again.
+        """
+        for symbol, quote in quotes.items():
+            series = self._series.get(symbol)
+            if series is None:
+                series = self._series[symbol] = PriceSeries(self.capacity)
+            if series.append(to_epoch(quote["quoted_at"]), quote["price"]):
+                self._dirty.add(symbol)
+
+    def load(self) -> None:
+        """Loads the persisted series. Called once, at startup."""
+        if not self.directory.exists():
+            return
+        for path in self.directory.glob("*.npy"):
+            try:
+                samples = np.load(path, mmap_mode="r")
+                self._series[unquote(path.stem)] = PriceSeries.from_array(
+                    samples, self.capacity
+                )
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable price history {path}: {e}")
+        logger.info(f"Loaded price history for {len(self._series)} cryptos")
+
+    async def save(self) -> None:
+        """Writes out the series that changed since the last save."""
+        if not self._dirty:
+            return
+        # copy on the event loop, write in a thread
+        snapshots = {s: self._series[s].view().copy() for s in self._dirty}
+        self._dirty.clear()
+        await asyncio.get_event_loop().run_in_executor(None, self._write, snapshots)
+
+    def _write(self, snapshots: Dict[str, np.ndarray]) -> None:
+        for symbol, samples in snapshots.items():
+            path = self.directory / _filename(symbol)
+            with atomic_write(path) as f:
+                np.save(f, samples)
@@ -0,0 +1,42 @@
+"""Conversion rates between cryptocurrencies and fiat currencies."""
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class CrossRates:
+    """
+    Rates between every pair of tracked currencies, as an N x N matrix:
+    `matrix[i, j]` is how many of currency j one unit of currency i is worth.
+
+    The matrix is rebuilt in one vectorized step whenever prices change, so a
+    conversion is a dict lookup and an array index.
+    """
+
+    def __init__(self) -> None:
+        self.index: Dict[str, int] = {}
+        self.matrix = np.empty((0, 0))
+
+    def __contains__(self, currency: str) -> bool:
+        return currency in self.index
+
+    def update(self, usd_values: Dict[str, float]) -> None:
+        """
+        Rebuilds the matrix from the USD value of one unit of each currency.
+        """
+        values = np.fromiter(
+            usd_values.values(), dtype=np.float64, count=len(usd_values)
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            matrix = np.divide.outer(values, values)
+        self.index = {c: i for i, c in enumerate(usd_values)}
+        self.matrix = matrix
+
+    def rate(self, source: str, target: str) -> Optional[float]:
+        """How many `target` one `source` is worth, or None if either is unknown."""
+        i = self.index.get(source)
+        j = self.index.get(target)
+        if i is None or j is None:
+            return None
+        rate = float(self.matrix[i, j])
+        return rate if np.isfinite(rate) else None
@@ -0,0 +1,160 @@
+"""
+The bot's Postgres connection pool, and timed queries on prepared statements.
+
+Queries are registered by name with `statement`, prepared on every new
+connection of the pool, and run through `fetch`, `fetchrow`, `fetchval`,
+`execute` and `executemany`, which time them and log the slow ones:
+```py
+USER_LIST = db.statement("user_list", "SELECT * FROM user_content WHERE user_id = $1")
+
+async with bot.db_pool.acquire() as conn:
+    rows = await db.fetch(conn, USER_LIST, user_id)
+```
+"""
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import asyncpg
+from decouple import config
+from loguru import logger
+
+POOL_MIN_SIZE = config("DB_POOL_MIN_SIZE", default=2, cast=int)
+POOL_MAX_SIZE = config("DB_POOL_MAX_SIZE", default=10, cast=int)
+# for queries that aren't registered statements, e.g. the reminder store's
+STATEMENT_CACHE_SIZE = config("DB_STATEMENT_CACHE_SIZE", default=100, cast=int)
+QUERY_TIMEOUT = config("DB_QUERY_TIMEOUT", default=10.0, cast=float)  # seconds
+SLOW_QUERY = config("DB_SLOW_QUERY", default=0.2, cast=float)  # seconds
+
+# name -> SQL, prepared on every connection
+STATEMENTS: Dict[str, str] = {}
+
+
+@dataclass
+class QueryStats:
+    calls: int = 0
+    slow: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.seconds / self.calls if self.calls else 0.0
+
+
+# statement name -> stats, since the bot started
+stats: Dict[str, QueryStats] = {}
+
+
+class Connection(asyncpg.Connection):
+    """A connection holding the registered statements, prepared."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.statements: Dict[str, asyncpg.prepared_stmt.PreparedStatement] = {}
+
+
+def statement(name: str, sql: str) -> str:
+    """
+    Registers a statement, to be prepared on new connections.
+
+    Returns:
+        Its name, to run it by.
+    """
+    if STATEMENTS.get(name, sql) != sql:
+        raise ValueError(f"Statement {name} is already registered")
+    STATEMENTS[name] = sql
+    stats[name] = QueryStats()
+    return name
+
+
+async def _prepare_statements(conn: Connection) -> None:
+    for name, sql in STATEMENTS.items():
+        try:
+            conn.statements[name] = await conn.prepare(sql)
+        except asyncpg.PostgresError as e:
+            # e.g. a migration that hasn't been run; the statement is run
+            # unprepared, and fails then if it has to
+            logger.warning(f"Could not prepare statement {name}: {e}")
+
+
+async def create_pool(dsn: str) -> asyncpg.Pool:
+    pool = await asyncpg.create_pool(
+        dsn,
+        min_size=POOL_MIN_SIZE,
+        max_size=POOL_MAX_SIZE,
+        statement_cache_size=STATEMENT_CACHE_SIZE,
+        command_timeout=QUERY_TIMEOUT,
+        connection_class=Connection,
+        init=_prepare_statements,
+    )
+    logger.info(
+        f"Connected to database, pool of {POOL_MIN_SIZE} to {POOL_MAX_SIZE} "
+        f"connections, {len(STATEMENTS)} prepared statements"
+    )
+    return pool
+
+
+async def _call(conn: Connection, name: str, method: str, *args: Any) -> Any:
+    prepared = conn.statements.get(name)
+    if prepared is None:
+        return await getattr(conn, method)(STATEMENTS[name], *args)
+    if method == "execute":
+        # prepared statements have no execute(); fetch, then the status
+        await prepared.fetch(*args)
+        return prepared.get_statusmsg()
+    return await getattr(prepared, method)(*args)
+
+
+async def _run(conn: Connection, name: str, method: str, *args: Any) -> Any:
+    start = time.perf_counter()
+    try:
+        try:
+            return await _call(conn, name, method, *args)
+        except asyncpg.InvalidCachedStatementError:
+            # the schema changed under the prepared statement, e.g. by a
+            # migration: prepare it again, and retry unless the failure
+            # aborted a transaction
+            del conn.statements[name]
+            if conn.is_in_transaction():
+                # run unprepared on this connection from now on
+                logger.warning(f"Statement {name} was invalidated in a transaction")
+                raise
+            logger.warning(f"Statement {name} was invalidated, preparing it again")
+            conn.statements[name] = await conn.prepare(STATEMENTS[name])
+            return await _call(conn, name, method, *args)
+    finally:
+        elapsed = time.perf_counter() - start
+        query_stats = stats[name]
+        query_stats.calls += 1
+        query_stats.seconds += elapsed
+        query_stats.max_seconds = max(query_stats.max_seconds, elapsed)
+        if elapsed >= SLOW_QUERY:
+            query_stats.slow += 1
+            logger.warning(f"Slow query {name}: {elapsed * 1e3:.0f}ms")
+
+
+async def fetch(conn: Connection, name: str, *args: Any) -> List[asyncpg.Record]:
+    return await _run(conn, name, "fetch", *args)
+
+
+async def fetchrow(conn: Connection, name: str, *args: Any) -> Optional[asyncpg.Record]:
+    return await _run(conn, name, "fetchrow", *args)
+
+
+async def fetchval(conn: Connection, name: str, *args: Any) -> Any:
+    return await _run(conn, name, "fetchval", *args)
+
+
+async def execute(conn: Connection, name: str, *args: Any) -> str:
+    """
+    Returns:
+        The status, e.g. "DELETE 1".
+    """
+    return await _run(conn, name, "execute", *args)
+
+
+async def executemany(
+    conn: Connection, name: str, rows: Iterable[Sequence[Any]]
+) -> None:
+    await _run(conn, name, "executemany", list(rows))
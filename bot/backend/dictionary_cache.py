@@ -0,0 +1,158 @@
+"""Cache of dictionary lookups, in memory and on disk."""
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from loguru import logger
+
+from bot.utils.sqlite import AsyncSQLite
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dictionary_cache (
+    language TEXT NOT NULL,
+    word TEXT NOT NULL,
+    entry TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (language, word)
+);
+"""
+
+
+@dataclass
+class CacheStats:
+    """Counters since the bot started."""
+
+    index_hits: int = 0  # answered by the offline index, before the cache
+    memory_hits: int = 0
+    disk_hits: int = 0
+    negative_hits: int = 0  # hits on "not found" answers, counted in the above too
+    misses: int = 0
+    upstream_calls: int = 0  # fewer than misses, as concurrent misses share a call
+
+    @property
+    def hits(self) -> int:
+        return self.index_hits + self.memory_hits + self.disk_hits
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    @property
+    def saved_calls(self) -> int:
+        """Lookups that didn't need a call to the API."""
+        return self.lookups - self.upstream_calls
+
+
+class DictionaryCache:
+    """
+    Parsed dictionary entries by (language, word), in two tiers: an LRU of the
+    `size` most recently used entries, in front of a SQLite file holding every
+    entry until it expires, so that the cache survives restarts.
+
+    Entries for words the API doesn't know ("error" entries) expire after
+    `miss_ttl`, found words after `hit_ttl`.
+    """
+
+    def __init__(
+        self, path: Path, *, size: int, hit_ttl: float, miss_ttl: float
+    ) -> None:
+        self.db = AsyncSQLite(path)
+        self.size = size
+        self.hit_ttl = hit_ttl
+        self.miss_ttl = miss_ttl
+        self.stats = CacheStats()
+        # (language, word) -> (expires_at, entry)
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[float, dict]]" = OrderedDict()
+        self._opened = asyncio.Event()
+
+    async def open(self) -> None:
+        """Opens the store, dropping expired entries. Called once the bot is ready."""
+        await self.db.connect()
+        await self.db.executescript(SQLITE_SCHEMA)
+        expired = await self.db.execute(
+            "DELETE FROM dictionary_cache WHERE expires_at <= ?", time.time()
+        )
+        self._opened.set()
+        logger.info(f"Opened dictionary cache, dropped {expired} expired entries")
+
+    async def close(self) -> None:
+        await self.db.close()
+
+    async def get(self, language: str, word: str) -> Optional[dict]:
+        """The cached entry of a word, if there is one that hasn't expired."""
+        key = (language, word)
+        now = time.time()
+
+        cached = self._memory.get(key)
+        if cached is not None and cached[0] > now:
+            self._memory.move_to_end(key)
+            self._count_hit(cached[1], disk=False)
+            return cached[1]
+
+        await self._opened.wait()
+        row = await self.db.fetchrow(
+            "SELECT entry, expires_at FROM dictionary_cache "
+            "WHERE language = ? AND word = ? AND expires_at > ?",
+            language,
+            word,
+            now,
+        )
+        if row is None:
+            self.stats.misses += 1
+            return None
+
+        entry = json.loads(row["entry"])
+        self._remember(key, row["expires_at"], entry)
+        self._count_hit(entry, disk=True)
+        return entry
+
+    async def put(self, language: str, word: str, entry: dict) -> None:
+        ttl = self.miss_ttl if "error" in entry else self.hit_ttl
+        expires_at = time.time() + ttl
+        self._remember((language, word), expires_at, entry)
+
+        await self._opened.wait()
+        await self.db.execute(
+            "INSERT OR REPLACE INTO dictionary_cache (language, word, entry, expires_at) "
+            "VALUES (?, ?, ?, ?)",
+            language,
+            word,
+            json.dumps(entry),
+            expires_at,
+        )
+
+    async def words(self, language: str, limit: int) -> List[str]:
+        """The most recently cached words that were found, newest first."""
+        await self._opened.wait()
+        rows = await self.db.fetch(
+            # not found entries are {"error": ...}
+            "SELECT word FROM dictionary_cache "
+            "WHERE language = ? AND entry NOT LIKE '{\"error\"%' "
+            "ORDER BY expires_at DESC LIMIT ?",
+            language,
+            limit,
+        )
+        return [row["word"] for row in rows]
+
+    def _remember(self, key: Tuple[str, str], expires_at: float, entry: dict) -> None:
+        self._memory[key] = (expires_at, entry)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.size:
+            self._memory.popitem(last=False)
+
+    def _count_hit(self, entry: dict, *, disk: bool) -> None:
+        if disk:
+            self.stats.disk_hits += 1
+        else:
+            self.stats.memory_hits += 1
+        if "error" in entry:
+            self.stats.negative_hits += 1
@@ -0,0 +1,214 @@
+"""
+Offline dictionary: entries imported from a dump, looked up from a memory-mapped file.
+
+Build an index from a Wiktionary JSONL extract (one entry per line, in the
+format of https://kaikki.org's dumps):
+    python -m bot.backend.dictionary_index path/to/dump.jsonl [--out data/dictionary.idx]
+
+The bot has to be restarted to pick up a new index.
+"""
+import argparse
+import json
+import mmap
+import struct
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from decouple import config
+
+from bot.utils.constants import DATA_DIR
+from bot.utils.files import atomic_write
+
+INDEX_PATH = Path(config("DICTIONARY_INDEX", default=str(DATA_DIR / "dictionary.idx")))
+
+# magic, version, entry count, key area offset, entries blob offset, language
+HEADER = struct.Struct("<4sHxxIQQ16s")
+MAGIC = b"UBDI"
+VERSION = 1
+# key offset (in the key area), key length, entry offset (in the blob), entry length
+RECORD = struct.Struct("<IHQI")
+
+MAX_MEANINGS = 10  # what fits in an embed
+
+
+class IndexFormatError(ValueError):
+    """Raised when a file isn't a dictionary index this version can read."""
+
+
+class _Keys:
+    """The sorted keys of an index, as a sequence `bisect` can search."""
+
+    __slots__ = ("_buf", "_count", "_keys_offset")
+
+    def __init__(self, buf: mmap.mmap, count: int, keys_offset: int) -> None:
+        self._buf = buf
+        self._count = count
+        self._keys_offset = keys_offset
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> bytes:
+        key_offset, key_len, _, _ = RECORD.unpack_from(
+            self._buf, HEADER.size + i * RECORD.size
+        )
+        start = self._keys_offset + key_offset
+        return self._buf[start : start + key_len]
+
+
+class DictionaryIndex:
+    """
+    A read-only, memory-mapped dictionary of parsed entries (as returned by
+    `DictionaryClient.parse_data`), keyed by lowercased word.
+
+    File layout, after the header: a fixed width record per word, sorted by
+    key; the UTF-8 keys; then the JSON entries, back to back. Opening the index
+    only reads its header, and a lookup is a binary search over the records,
+    touching O(log n) pages; the OS page cache is shared between processes.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # empty file
+                raise IndexFormatError(f"{path} is empty") from e
+        try:
+            header = HEADER.unpack_from(self._buf)
+        except struct.error as e:
+            self._buf.close()
+            raise IndexFormatError(f"{path} is too short to be an index") from e
+        magic, version, count, keys_offset, entries_offset, language = header
+        if magic != MAGIC or version != VERSION:
+            self._buf.close()
+            raise IndexFormatError(f"{path} isn't a version {VERSION} index")
+
+        self.language = language.rstrip(b"\0").decode()
+        self._entries_offset = entries_offset
+        self._keys = _Keys(self._buf, count, keys_offset)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def get(self, word: str) -> Optional[dict]:
+        """The entry of a word, or None if the index doesn't have it."""
+        key = word.strip().lower().encode()
+        i = bisect_left(self._keys, key)
+        if i == len(self._keys) or self._keys[i] != key:
+            return None
+
+        _, _, entry_offset, entry_len = RECORD.unpack_from(
+            self._buf, HEADER.size + i * RECORD.size
+        )
+        start = self._entries_offset + entry_offset
+        return json.loads(self._buf[start : start + entry_len])
+
+    def close(self) -> None:
+        self._buf.close()
+
+
+def write_index(path: Path, entries: Dict[str, dict], language: str) -> None:
+    """
+    Writes entries, by word, to an index file.
+    The file is replaced at once, so the old one stays readable until then.
+    """
+    keys = sorted((word.lower().encode(), word) for word in entries)
+    records = bytearray()
+    key_area = bytearray()
+    blob = bytearray()
+    for key, word in keys:
+        entry = json.dumps(entries[word], separators=(",", ":")).encode()
+        records += RECORD.pack(len(key_area), len(key), len(blob), len(entry))
+        key_area += key
+        blob += entry
+
+    keys_offset = HEADER.size + len(records)
+    entries_offset = keys_offset + len(key_area)
+    header = HEADER.pack(
+        MAGIC, VERSION, len(keys), keys_offset, entries_offset, language.encode()
+    )
+
+    with atomic_write(path) as f:
+        for part in (header, records, key_area, blob):
+            f.write(part)
+
+
+def parse_wiktionary(lines: Iterable[str]) -> Dict[str, dict]:
+    """
+    Converts a Wiktionary JSONL extract (an object per word and part of
+    speech) to entries by lowercased word, in `parse_data`'s format.
+    """
+    entries: Dict[str, dict] = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        word = record.get("word")
+        senses = [s for s in record.get("senses", ()) if s.get("glosses")]
+        if not word or not senses:
+            continue
+
+        entry = entries.setdefault(
+            word.lower(),
+            {"title": word, "phonetic": _phonetic(record), "meanings": []},
+        )
+        if not entry["phonetic"]:
+            entry["phonetic"] = _phonetic(record)
+        if len(entry["meanings"]) < MAX_MEANINGS:
+            sense = senses[0]
+            examples = sense.get("examples") or [{}]
+            entry["meanings"].append(
+                _format_meaning(
+                    record.get("pos", "?"), sense["glosses"][0], examples[0].get("text")
+                )
+            )
+    return entries
+
+
+def _phonetic(record: Dict[str, Any]) -> str:
+    sounds: List[Dict[str, str]] = record.get("sounds", [])
+    ipa = next((s["ipa"] for s in sounds if "ipa" in s), None)
+    audio = next((s["mp3_url"] for s in sounds if "mp3_url" in s), None)
+    if ipa and audio:
+        return f"[{ipa}]({audio})"
+    return ipa or ""
+
+
+def _format_meaning(
+    part_of_speech: str, definition: str, example: Optional[str]
+) -> str:
+    # same as the API's, see DictionaryClient.parse_data
+    return f"_({part_of_speech})_ {definition}\n{'_Example: ' + example + '_' if example else ''}\n"
+
+
+def _read_lines(path: Path) -> Iterator[str]:
+    with open(path, encoding="utf-8") as f:
+        yield from f
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Builds the offline dictionary index from a Wiktionary JSONL extract."
+    )
+    parser.add_argument("dump", type=Path)
+    parser.add_argument("--out", type=Path, default=INDEX_PATH)
+    parser.add_argument(
+        "--language", default="en_GB", help="the language lookups it should answer"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    entries = parse_wiktionary(_read_lines(args.dump))
+    write_index(args.out, entries, args.language)
+    print(
+        f"Indexed {len(entries)} words into {args.out} "
+        f"({args.out.stat().st_size / 2**20:.1f}MB) "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,82 @@ Module to handle general database interactions models.
 """
 
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import asyncpg
 from loguru import logger
 
+from bot.backend import db
 from bot.utils.constants import ContentType
 
+# prepared on every connection, see bot.backend.db; columns are listed, as a
+# prepared `SELECT *` breaks when a migration changes the table
+CONTENT_COLUMNS = "id, user_id, content_name, content_type, recommended_by, content_url"
+
+CONTENT_BY_NAME = db.statement(
+    "content_by_name",
+    f"SELECT {CONTENT_COLUMNS} FROM user_content "
+    "WHERE LOWER(content_name) LIKE $1 AND user_id = $2",
+)
+CONTENT_BY_ID = db.statement(
+    "content_by_id", f"SELECT {CONTENT_COLUMNS} FROM user_content WHERE id = $1"
+)
+# the no-op update makes RETURNING give back the stored row on a conflict;
+# `inserted` tells the two apart (xmax is only set on updated rows)
+UPSERT_CONTENT = db.statement(
+    "upsert_content",
+    "INSERT INTO user_content"
+    "(user_id, content_name, content_type, recommended_by, content_url)"
+    "VALUES ($1, $2, $3, $4, $5) "
+    "ON CONFLICT (user_id, LOWER(content_name), content_type) "
+    "DO UPDATE SET content_name = user_content.content_name "
+    f"RETURNING {CONTENT_COLUMNS}, xmax = 0 AS inserted",
+)
+# save_many's: one statement for all the records, arrays unnested into rows
+INSERT_USERS = db.statement(
+    "insert_users",
+    "INSERT INTO users SELECT unnest($1::BIGINT[]) ON CONFLICT DO NOTHING",
+)
+UPSERT_CONTENTS = db.statement(
+    "upsert_contents",
+    "INSERT INTO user_content"
+    "(user_id, content_name, content_type, recommended_by, content_url)"
+    "SELECT * FROM unnest($1::BIGINT[], $2::TEXT[], $3::TEXT[], $4::BIGINT[], $5::TEXT[]) "
+    "ON CONFLICT (user_id, LOWER(content_name), content_type) "
+    "DO UPDATE SET content_name = user_content.content_name "
+    f"RETURNING {CONTENT_COLUMNS}, xmax = 0 AS inserted",
+)
+DELETE_CONTENT = db.statement(
+    "delete_content",
+    "DELETE FROM user_content WHERE user_id = $1 AND LOWER(content_name) = $2",
+)
+USER_CONTENT = db.statement(
+    "user_content",
+    f"SELECT {CONTENT_COLUMNS} FROM user_content "
+    "WHERE user_id = $1 AND content_type = $2",
+)
+GUILD_CONTENT = db.statement(
+    "guild_content",
+    "SELECT uc.id, uc.user_id, uc.content_name, uc.content_type, "
+    "uc.recommended_by, uc.content_url FROM user_content uc "
+    "JOIN guild_users gu ON gu.user_id = uc.user_id "
+    "WHERE gu.guild = $1 AND uc.content_type = $2",
+)
+GUILD_PREFIX = db.statement(
+    "guild_prefix", "SELECT prefix FROM guilds WHERE guild_id = $1"
+)
+SET_GUILD_PREFIX = db.statement(
+    "set_guild_prefix", "UPDATE guilds SET prefix = $1 WHERE guild_id = $2"
+)
+INSERT_GUILD = db.statement("insert_guild", "INSERT INTO guilds VALUES ($1)")
+INSERT_USER = db.statement(
+    "insert_user", "INSERT INTO users VALUES ($1) ON CONFLICT DO NOTHING"
+)
+INSERT_GUILD_USER = db.statement(
+    "insert_guild_user", "INSERT INTO guild_users VALUES($1, $2)"
+)
+DELETE_GUILD = db.statement("delete_guild", "DELETE FROM guilds WHERE guild_id = $1")
+
 
 @dataclass
 class ContentRecord:
@@ -35,11 +104,7 @@ class ContentRecord:
         NOTE: query is run with '%name%'
         """
         logger.debug(f"Retrieving content with name {name} for user {user}")
-        r = await conn.fetchrow(
-            "SELECT * FROM user_content WHERE LOWER(content_name) LIKE $1 AND user_id = $2",
-            f"%{name.lower()}%",
-            user,
-        )
+        r = await db.fetchrow(conn, CONTENT_BY_NAME, f"%{name.lower()}%", user)
 
         if not r:
             logger.info(f"Content with name {name} did not exist")
@@ -55,7 +120,7 @@ class ContentRecord:
         Fetches a content record by its ID.
         """
         logger.debug(f"Retrieving content with ID {id}")
-        r = await conn.fetchrow("SELECT * FROM user_content WHERE id = $1", id)
+        r = await db.fetchrow(conn, CONTENT_BY_ID, id)
 
         if not r:
             logger.info(f"Content with ID {id} did not exist")
@@ -74,44 +139,92 @@ class ContentRecord:
             id=r["id"],
         )
 
-    async def save(self, conn: asyncpg.Connection) -> Optional["ContentRecord"]:
+    async def save(self, conn: asyncpg.Connection) -> "ContentRecord":
         """
-        Saves a new Content record to the database.
-        """
-        existing = await self.__class__.by_name(conn, name=self.name, user=self.user_id)
+        Saves a new Content record to the database, in one query.
+        If the user already has content of this type and name (in any case),
+        that record is kept as it was.
 
-        if not existing:
+        Returns:
+            The stored record, with its ID.
+        """
+        r = await db.fetchrow(
+            conn,
+            UPSERT_CONTENT,
+            self.user_id,
+            self.name,
+            self.type.value,
+            self.recommended_by,
+            self.url,
+        )
+        if r["inserted"]:
             logger.info(
-                f"Creating new content record for user {self.user_id} with name {self.name}"
+                f"Created new content record for user {self.user_id} with name {self.name}"
             )
-            await conn.execute(
-                (
-                    "INSERT INTO user_content"
-                    "(user_id, content_name, content_type, recommended_by, content_url)"
-                    "VALUES ($1, $2, $3, $4, $5)"
-                ),
-                self.user_id,
-                self.name,
-                self.type.value,
-                self.recommended_by,
-                self.url,
-            )
-            return self
         else:
             logger.info(
                 f"Content record with name {self.name} for user {self.user_id} already exists"
             )
-            return self
+        return self._parse_db_output(r)
+
+    @classmethod
+    async def save_many(
+        cls, conn: asyncpg.Connection, records: List["ContentRecord"]
+    ) -> Tuple[List["ContentRecord"], List["ContentRecord"]]:
+        """
+        Saves records for many users at once, e.g. one recommendation to
+        several members: the users (and recommenders) missing from the users
+        table, then the records, in one transaction of two queries.
+        Records users already have are kept as they were, like `save` does.
+
+        Returns:
+            The records added, and the stored records of users who already had
+            theirs; both in the order given, with IDs.
+        """
+        # a row can't be upserted twice in one statement
+        unique: Dict[tuple, ContentRecord] = {}
+        for record in records:
+            key = (record.user_id, record.name.lower(), record.type)
+            unique.setdefault(key, record)
+        records = list(unique.values())
+        if not records:
+            return [], []
+
+        users = {r.user_id for r in records}
+        users.update(r.recommended_by for r in records if r.recommended_by)
+        async with conn.transaction():
+            await db.execute(conn, INSERT_USERS, list(users))
+            rows = await db.fetch(
+                conn,
+                UPSERT_CONTENTS,
+                [r.user_id for r in records],
+                [r.name for r in records],
+                [r.type.value for r in records],
+                [r.recommended_by for r in records],
+                [r.url for r in records],
+            )
+
+        # RETURNING's order isn't guaranteed; users are unique per name and type
+        stored = {
+            (r["user_id"], r["content_name"].lower(), r["content_type"]): r
+            for r in rows
+        }
+        added, existing = [], []
+        for record in records:
+            r = stored[(record.user_id, record.name.lower(), record.type.value)]
+            (added if r["inserted"] else existing).append(cls._parse_db_output(r))
+        logger.info(
+            f"Saved {len(added)} new content records, {len(existing)} already existed"
+        )
+        return added, existing
 
     async def delete(self, conn: asyncpg.Connection) -> str:
         """
         Deletes a content record from the database.
         """
         logger.info(f"Deleting content with name {self.name} for user {self.id}")
-        return await conn.execute(
-            "DELETE FROM user_content WHERE user_id = $1 AND LOWER(content_name) = $2",
-            self.user_id,
-            self.name,
+        return await db.execute(
+            conn, DELETE_CONTENT, self.user_id, self.name
         )  # lowercase names must match
 
 
@@ -130,16 +243,12 @@ class User:
         Gets the user's recommended 'list' for a specific content type.
         """
         logger.info(f"Fetching {content_type.value} list for user {self.id}")
-        data = await conn.fetch(
-            "SELECT * FROM user_content WHERE user_id = $1 AND content_type = $2",
-            self.id,
-            content_type.value,
-        )
+        data = await db.fetch(conn, USER_CONTENT, self.id, content_type.value)
         return [ContentRecord._parse_db_output(record) for record in data]
 
     async def add_to_list(
         self, conn: asyncpg.Connection, *, record: ContentRecord
-    ) -> Optional[ContentRecord]:
+    ) -> ContentRecord:
         """
         Adds a content record to the user's list.
 
@@ -167,9 +276,7 @@ class Guild:
     prefix: Optional[str] = "u!"
 
     async def get_prefix(self, conn: asyncpg.Connection) -> Optional[str]:
-        return await conn.fetchval(
-            "SELECT prefix FROM guilds WHERE guild_id = $1", self.id
-        )
+        return await db.fetchval(conn, GUILD_PREFIX, self.id)
 
     async def set_prefix(self, conn: asyncpg.Connection, *, prefix: str) -> str:
         """
@@ -181,32 +288,36 @@ class Guild:
             The new prefix
         """
         logger.info(f"Setting prefix for guild {self.id} to {prefix}")
-        await conn.execute(
-            "UPDATE guilds SET prefix = $1 WHERE id = $2", prefix, self.id
-        )
+        await db.execute(conn, SET_GUILD_PREFIX, prefix, self.id)
         self.prefix = prefix
         return prefix
 
+    async def get_content_list(
+        self, conn: asyncpg.Connection, *, content_type: ContentType
+    ) -> List[ContentRecord]:
+        """
+        Gets the content of a specific type recommended to the guild's members.
+        """
+        logger.info(f"Fetching {content_type.value} list for guild {self.id}")
+        data = await db.fetch(conn, GUILD_CONTENT, self.id, content_type.value)
+        return [ContentRecord._parse_db_output(record) for record in data]
+
     async def save(self, conn: asyncpg.Connection) -> Optional[str]:
         """Save a guild to the database."""
         logger.info(f"Saving guild {self.id} to the database")
-        return await conn.execute("INSERT INTO guilds VALUES ($1)", self.id)
+        return await db.execute(conn, INSERT_GUILD, self.id)
 
     async def bulk_save_members(
         self, conn: asyncpg.Connection, *, members: List[int]
     ) -> Optional[str]:
         """Save the guilds members to the database."""
         logger.info(f"Saving guild {self.id} members to global users table")
-        await conn.executemany(
-            "INSERT INTO users VALUES ($1) ON CONFLICT DO NOTHING",
-            [(m,) for m in members],
-        )
+        await db.executemany(conn, INSERT_USER, [(m,) for m in members])
         logger.info(f"Saving guild {self.id} members to guild-users table")
-        await conn.executemany(
-            "INSERT INTO guild_users VALUES($1, $2)",
-            [(self.id, member) for member in members],
+        await db.executemany(
+            conn, INSERT_GUILD_USER, [(self.id, member) for member in members]
         )
         logger.info(f"Completed inserting guild {self.id} members to database!")
 
     async def delete(self, conn: asyncpg.Connection) -> Optional[str]:
-        return await conn.execute("DELETE FROM guilds WHERE guild_id = $1", self.id)
+        return await db.execute(conn, DELETE_GUILD, self.id)
@@ -0,0 +1,269 @@
+"""Persistent storage for pending reminders."""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, List, Mapping, Optional
+
+import asyncpg
+from decouple import config
+from loguru import logger
+
+from bot.internal.checks import DatabaseUnavailable
+from bot.utils.constants import DATA_DIR
+from bot.utils.sqlite import AsyncSQLite
+
+if TYPE_CHECKING:
+    from bot.backend.reminders import Reminder
+    from bot.internal.bot import UtilityBot
+
+
+EPOCH = datetime(1970, 1, 1)
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    channel_id INTEGER,
+    content TEXT NOT NULL,
+    title TEXT,
+    created_at REAL NOT NULL,
+    due_at REAL NOT NULL,
+    recurrence TEXT
+);
+
+CREATE INDEX IF NOT EXISTS reminders_due_at ON reminders(due_at);
+CREATE INDEX IF NOT EXISTS reminders_user_id ON reminders(user_id);
+"""
+
+
+class ReminderStore(ABC):
+    """
+    Abstract base class for reminder storage backends.
+
+    Rows returned by the fetch methods are mappings with the keys
+    id, user_id, channel_id, content, title, created_at, due_at and recurrence;
+    timestamps are naive UTC datetimes.
+    """
+
+    @property
+    def available(self) -> bool:
+        """Whether the store can be used right now."""
+        return True
+
+    @abstractmethod
+    async def open(self) -> None:
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        pass
+
+    @abstractmethod
+    async def add(self, reminder: Reminder) -> int:
+        """
+        Persists a reminder.
+
+        Returns:
+            The ID assigned to the reminder.
+        """
+        pass
+
+    @abstractmethod
+    async def fetch_due(
+        self, *, until: datetime, after: Optional[datetime] = None
+    ) -> List[Mapping[str, Any]]:
+        """
+        Fetches the reminders due in the window (after, until].
+        If `after` is None, every reminder due up to `until` is returned.
+        """
+        pass
+
+    @abstractmethod
+    async def fetch_user(self, user_id: int) -> List[Mapping[str, Any]]:
+        """
+        Fetches all of a user's pending reminders.
+        """
+        pass
+
+    @abstractmethod
+    async def update_due(self, id: int, due_at: datetime) -> None:
+        pass
+
+    @abstractmethod
+    async def delete(self, id: int) -> None:
+        pass
+
+    @abstractmethod
+    async def delete_many(self, ids: List[int]) -> None:
+        pass
+
+
+class PostgresReminderStore(ReminderStore):
+    """
+    Stores reminders in the `reminders` table (see migrations/0004_reminders.sql
+    and 0006_reminders_recurrence.sql), through the bot's connection pool.
+
+    The pool may not exist, if the bot couldn't connect to the database (see
+    `UtilityBot.connect_db`); every query then raises `DatabaseUnavailable`.
+    """
+
+    def __init__(self, bot: UtilityBot) -> None:
+        self.bot = bot
+
+    @property
+    def available(self) -> bool:
+        return self.bot.db_pool is not None
+
+    @property
+    def pool(self) -> asyncpg.Pool:
+        if self.bot.db_pool is None:
+            raise DatabaseUnavailable("Reminders aren't available right now")
+        return self.bot.db_pool
+
+    async def open(self) -> None:
+        # the pool is created by the bot before the store is opened
+        logger.info("Opened postgres reminder store")
+
+    async def close(self) -> None:
+        pass  # the bot closes the pool
+
+    async def add(self, reminder: Reminder) -> int:
+        return await self.pool.fetchval(
+            (
+                "INSERT INTO reminders"
+                "(user_id, channel_id, content, title, created_at, due_at, recurrence)"
+                "VALUES ($1, $2, $3, $4, $5, $6, $7) RETURNING id"
+            ),
+            reminder.user_id,
+            reminder.channel_id,
+            reminder.content,
+            reminder.title,
+            reminder.created_at,
+            reminder.due_at,
+            reminder.recurrence,
+        )
+
+    async def fetch_due(
+        self, *, until: datetime, after: Optional[datetime] = None
+    ) -> List[Mapping[str, Any]]:
+        if after is None:
+            return await self.pool.fetch(
+                "SELECT * FROM reminders WHERE due_at <= $1 ORDER BY due_at", until
+            )
+        return await self.pool.fetch(
+            "SELECT * FROM reminders WHERE due_at > $1 AND due_at <= $2 ORDER BY due_at",
+            after,
+            until,
+        )
+
+    async def fetch_user(self, user_id: int) -> List[Mapping[str, Any]]:
+        return await self.pool.fetch(
+            "SELECT * FROM reminders WHERE user_id = $1", user_id
+        )
+
+    async def update_due(self, id: int, due_at: datetime) -> None:
+        await self.pool.execute(
+            "UPDATE reminders SET due_at = $1 WHERE id = $2", due_at, id
+        )
+
+    async def delete(self, id: int) -> None:
+        await self.pool.execute("DELETE FROM reminders WHERE id = $1", id)
+
+    async def delete_many(self, ids: List[int]) -> None:
+        await self.pool.execute(
+            "DELETE FROM reminders WHERE id = ANY($1::BIGINT[])", ids
+        )
+
+
+class SQLiteReminderStore(ReminderStore):
+    """
+    Stores reminders in a local SQLite file; used when no DB_URI is configured.
+    Timestamps are stored as UTC epoch seconds.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.db = AsyncSQLite(path)
+
+    @staticmethod
+    def _to_epoch(dt: datetime) -> float:
+        return (dt - EPOCH).total_seconds()
+
+    @staticmethod
+    def _parse_row(row: Any) -> Mapping[str, Any]:
+        out = dict(row)
+        out["created_at"] = datetime.utcfromtimestamp(row["created_at"])
+        out["due_at"] = datetime.utcfromtimestamp(row["due_at"])
+        return out
+
+    async def open(self) -> None:
+        await self.db.connect()
+        await self.db.executescript(SQLITE_SCHEMA)
+        columns = {
+            row["name"] for row in await self.db.fetch("PRAGMA table_info(reminders)")
+        }
+        if "recurrence" not in columns:  # created before repeating reminders
+            await self.db.execute("ALTER TABLE reminders ADD COLUMN recurrence TEXT")
+        logger.info(f"Opened sqlite reminder store at {self.db.path}")
+
+    async def close(self) -> None:
+        await self.db.close()
+
+    async def add(self, reminder: Reminder) -> int:
+        return await self.db.insert(
+            (
+                "INSERT INTO reminders"
+                "(user_id, channel_id, content, title, created_at, due_at, recurrence)"
+                "VALUES (?, ?, ?, ?, ?, ?, ?)"
+            ),
+            reminder.user_id,
+            reminder.channel_id,
+            reminder.content,
+            reminder.title,
+            self._to_epoch(reminder.created_at),
+            self._to_epoch(reminder.due_at),
+            reminder.recurrence,
+        )
+
+    async def fetch_due(
+        self, *, until: datetime, after: Optional[datetime] = None
+    ) -> List[Mapping[str, Any]]:
+        if after is None:
+            rows = await self.db.fetch(
+                "SELECT * FROM reminders WHERE due_at <= ? ORDER BY due_at",
+                self._to_epoch(until),
+            )
+        else:
+            rows = await self.db.fetch(
+                "SELECT * FROM reminders WHERE due_at > ? AND due_at <= ? ORDER BY due_at",
+                self._to_epoch(after),
+                self._to_epoch(until),
+            )
+        return [self._parse_row(row) for row in rows]
+
+    async def fetch_user(self, user_id: int) -> List[Mapping[str, Any]]:
+        rows = await self.db.fetch("SELECT * FROM reminders WHERE user_id = ?", user_id)
+        return [self._parse_row(row) for row in rows]
+
+    async def update_due(self, id: int, due_at: datetime) -> None:
+        await self.db.execute(
+            "UPDATE reminders SET due_at = ? WHERE id = ?", self._to_epoch(due_at), id
+        )
+
+    async def delete(self, id: int) -> None:
+        await self.db.execute("DELETE FROM reminders WHERE id = ?", id)
+
+    async def delete_many(self, ids: List[int]) -> None:
+        await self.db.executemany(
+            "DELETE FROM reminders WHERE id = ?", [(id,) for id in ids]
+        )
+
+
+def make_reminder_store(bot: UtilityBot) -> ReminderStore:
+    """
+    Picks the reminder store backend: postgres if DB_URI is set, else a local sqlite file.
+    """
+    if config("DB_URI", default=None):
+        return PostgresReminderStore(bot)
+    logger.warning("DB_URI is not set; falling back to sqlite for reminders")
+    return SQLiteReminderStore(str(DATA_DIR / "reminders.sqlite3"))
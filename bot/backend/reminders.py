@@ -1,78 +1,673 @@
 """Schedule reminders for later."""
-from typing import Optional
+from __future__ import annotations
+
+import asyncio
 from datetime import datetime, timedelta
+import heapq
+from collections import OrderedDict, deque
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Deque,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
 
-from discord import Embed, Forbidden
-from discord.ext import commands
+import discord
+from discord import Embed, Forbidden, NotFound
+from discord.ext import commands, tasks
+from discord_slash import SlashContext
 from loguru import logger
+from more_itertools import chunked
 
+from bot.backend.reminder_store import EPOCH, ReminderStore, make_reminder_store
+from bot.internal.checks import DatabaseUnavailable
+from bot.utils.background import BackgroundTasks
 from bot.utils.constants import EmbedColour
+from bot.utils.converters import parse_recurrence
+from bot.utils.ratelimit import message_limiter
+from bot.utils.recurrence import Interval, Recurrence
+from bot.utils.timing_wheel import TimerHandle
+
+if TYPE_CHECKING:
+    from bot.internal.bot import UtilityBot
+
+
+# fields are capped at 1024 characters, and a whole embed at 6000
+REMINDERS_PER_EMBED = 5
 
 
 class Reminder:
     """
     Represents a Reminder.
+
+    Only the IDs of the user and channel are kept; the discord objects are
+    resolved when the reminder fires, so a pending reminder does not keep the
+    invocation context (message, author, state...) alive.
     """
 
+    __slots__ = (
+        "id",
+        "user_id",
+        "channel_id",
+        "content",
+        "title",
+        "created_at",
+        "due_at",
+        "recurrence",
+    )
+
     def __init__(
         self,
-        ctx: commands.Context,
         *,
-        delay: timedelta,
+        user_id: int,
+        channel_id: Optional[int],
         content: str,
+        due_at: datetime,
         title: Optional[str] = "Reminder!",
+        created_at: Optional[datetime] = None,
+        id: Optional[int] = None,
+        recurrence: Optional[str] = None,
     ) -> None:
-        self.ctx = ctx
-        self.bot = ctx.bot
-        self.target = ctx.author
-        self._delay = delay
+        self.id = id  # assigned by the reminder store
+        self.user_id = user_id
+        self.channel_id = channel_id
         self.content = content
         self.title = title
+        self.created_at = created_at or datetime.utcnow()
+        self.due_at = due_at
+        # the schedule expression of repeating reminders, see `parse_recurrence`
+        self.recurrence = recurrence
+
+    @classmethod
+    def from_context(
+        cls,
+        ctx: Union[commands.Context, SlashContext],
+        *,
+        delay: Optional[Union[timedelta, Interval]] = None,
+        recurrence: Optional[Recurrence] = None,
+        content: str,
+        title: Optional[str] = "Reminder!",
+    ) -> "Reminder":
+        """
+        Creates a reminder for the invoker of a prefix or slash command.
+        Either `delay` or `recurrence` must be given; a repeating reminder
+        first fires at the schedule's next occurrence.
+        """
+        now = datetime.utcnow()
+        if delay is not None:
+            due_at = now + delay  # type: ignore ; Interval.__radd__
+        elif recurrence is not None:
+            due_at = recurrence.next_after(now)
+        else:
+            raise ValueError("A reminder needs a delay or a recurrence")
+
+        return cls(
+            user_id=ctx.author.id,
+            channel_id=getattr(ctx, "channel_id", None) or ctx.channel.id,
+            content=content,
+            title=title,
+            created_at=now,
+            due_at=due_at,
+            recurrence=str(recurrence) if recurrence is not None else None,
+        )
+
+    @classmethod
+    def from_record(cls, record: Mapping[str, Any]) -> "Reminder":
+        """
+        Rebuilds a reminder from a row of the reminder store.
+        """
+        return cls(
+            id=record["id"],
+            user_id=record["user_id"],
+            channel_id=record["channel_id"],
+            content=record["content"],
+            title=record["title"],
+            created_at=record["created_at"],
+            due_at=record["due_at"],
+            recurrence=record["recurrence"],
+        )
+
+    def next_occurrence(self) -> Optional["Reminder"]:
+        """
+        The next occurrence of a repeating reminder, None for one-off reminders.
+        Occurrences missed while the bot was down are skipped. Interval
+        schedules count from when the reminder was created (its first
+        occurrence is one interval later), not from the last occurrence.
+        """
+        if self.recurrence is None:
+            return None
+
+        rule = parse_recurrence(self.recurrence)  # cached
+        due_at = rule.next_after(
+            max(self.due_at, datetime.utcnow()), anchor=self.created_at
+        )
+
+        return Reminder(
+            id=self.id,
+            user_id=self.user_id,
+            channel_id=self.channel_id,
+            content=self.content,
+            title=self.title,
+            created_at=self.created_at,
+            due_at=due_at,
+            recurrence=self.recurrence,
+        )
 
-    @property
-    def embed(self) -> Embed:
+    def describe(self) -> str:
+        """
+        One line summary, for listing a user's reminders.
+        """
+        due = int((self.due_at - EPOCH).total_seconds())
+        content = self.content if len(self.content) <= 100 else self.content[:99] + "…"
+        repeats = f" • repeats `{self.recurrence}`" if self.recurrence else ""
+        return f"`{self.id}` • <t:{due}:R>{repeats} • {content}"
+
+    def embed(self, bot: UtilityBot, target: discord.abc.User) -> Embed:
         """
         Embed to be sent to the user.
         """
-        set_at = getattr(self.ctx.message, "created_at", None)
         em = Embed(
             title=self.title,
             description=self.content,
-            timestamp=set_at if set_at else Embed.Empty,
+            timestamp=self.created_at,
             color=EmbedColour.Info.value,
         )
-        em.set_author(
-            name=self.target, icon_url=self.target.avatar_url
-        )  # type: ignore ; dpy issue
+        em.set_author(name=target, icon_url=target.avatar_url)  # type: ignore ; dpy issue
         em.set_footer(
-            text="Reminder was set" if set_at else "",
-            icon_url=self.ctx.bot.user.avatar_url,
+            text="Reminder was set",
+            icon_url=bot.user.avatar_url,
         )
 
         return em
 
-    def schedule_reminder(self) -> None:
+
+def build_embeds(
+    bot: UtilityBot, target: discord.abc.User, reminders: List[Reminder]
+) -> List[Embed]:
+    """
+    Builds the embeds for reminders delivered together.
+    A single reminder gets its own embed; several are merged into fields,
+    split over as many embeds as needed to stay within Discord's size limits.
+    """
+    if len(reminders) == 1:
+        return [reminders[0].embed(bot, target)]
+
+    embeds = []
+    for chunk in chunked(reminders, REMINDERS_PER_EMBED):
+        em = Embed(
+            title=f"{len(reminders)} reminders!",
+            color=EmbedColour.Info.value,
+        )
+        em.set_author(name=target, icon_url=target.avatar_url)  # type: ignore ; dpy issue
+        for reminder in chunk:
+            em.add_field(
+                name=f"{reminder.title} (set {reminder.created_at:%d %b %H:%M} UTC)",
+                value=reminder.content[:1024],
+                inline=False,
+            )
+        embeds.append(em)
+
+    embeds[-1].set_footer(text="Reminders were set", icon_url=bot.user.avatar_url)
+    return embeds
+
+
+class LatencyStats:
+    """
+    Records how late reminders are delivered, relative to their due time.
+    """
+
+    def __init__(self, sample_size: int = 1024) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent: Deque[float] = deque(maxlen=sample_size)
+
+    def record(self, reminders: List[Reminder]) -> None:
+        now = datetime.utcnow()
+        for reminder in reminders:
+            latency = (now - reminder.due_at).total_seconds()
+            self.count += 1
+            self.total += latency
+            self.max = max(self.max, latency)
+            self._recent.append(latency)
+
+    def summary(self) -> str:
+        if not self.count:
+            return "no reminders delivered yet"
+        recent = sorted(self._recent)
+        p50 = recent[len(recent) // 2]
+        p95 = recent[int(len(recent) * 0.95)]
+        return (
+            f"{self.count} delivered, mean {self.total / self.count:.2f}s, "
+            f"p50 {p50:.2f}s, p95 {p95:.2f}s, max {self.max:.2f}s late"
+        )
+
+
+class ReminderDelivery:
+    """
+    Sends fired reminders out.
+
+    Reminders that fire in the same scheduler tick are grouped per user and
+    sent as a single message. Sends are paced per route bucket (every DM and
+    text channel has its own message rate limit) under a global cap, so a
+    burst of reminders doesn't run into Discord's rate limits.
+
+    A reminder is only removed from the store once it's been sent, or can't
+    ever be: the user is gone, or neither their DMs nor any of its channels
+    can be reached. Other failures are retried with a backoff, up to
+    `MAX_ATTEMPTS` times; after that the reminder stays in the store, and is
+    tried again when the bot restarts.
+    """
+
+    RETRY_DELAY = timedelta(seconds=30)  # doubled after every failed attempt
+    MAX_ATTEMPTS = 5
+
+    def __init__(self, bot: UtilityBot, store: ReminderStore) -> None:
+        self.bot = bot
+        self.store = store
+        self.limiter = message_limiter
+        self.latency = LatencyStats()
+        self._batches: Dict[int, List[Reminder]] = {}
+        # failed delivery attempts so far, by reminder ID
+        self._attempts: Dict[int, int] = {}
+        self._flush_scheduled = False
+        self._tasks = BackgroundTasks()
+
+    def enqueue(self, reminder: Reminder) -> None:
         """
-        Schedules a reminder to be sent out later.
+        Queues a fired reminder. The queue is flushed once the current
+        scheduler tick is done firing, so reminders due together are batched.
         """
-        when = datetime.utcnow() + self._delay
-        self.bot.manager.schedule(self.execute_reminder(), when)
-        logger.debug(f"{self.target} - Reminder Scheduled for {when}")
+        self._batches.setdefault(reminder.user_id, []).append(reminder)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_event_loop().call_soon(self._flush)
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        batches, self._batches = self._batches, {}
+        for user_id, reminders in batches.items():
+            self._tasks.spawn(self._deliver(user_id, reminders))
 
-    async def execute_reminder(self) -> None:
+    async def _deliver(self, user_id: int, reminders: List[Reminder]) -> None:
         """
-        Sends the reminder in DMs to the user.
-        If the user has DMs disabled, pings the user in channel
+        Sends the reminders in DMs to the user.
+        If the user has DMs disabled, pings the user in the channels
         in which they called the command.
         """
         try:
-            await self.target.send(embed=self.embed)  # type: ignore ; dpy issue
-            logger.debug(f"{self.target} - Reminder sent")
-        except Forbidden:
-            await self.ctx.send(
-                content=f"{self.target.mention}, here's your reminder:",  # type: ignore ; dpy issue
-                embed=self.embed,
+            target = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+            try:
+                for embed in build_embeds(self.bot, target, reminders):
+                    await self.limiter.acquire(("dm", user_id))
+                    await target.send(embed=embed)
+                logger.debug(f"{target} - {len(reminders)} reminder(s) sent")
+            except Forbidden:
+                await self._deliver_in_channels(target, reminders)
+            self.latency.record(reminders)
+        except NotFound:
+            logger.warning(f"User {user_id} not found, dropping their reminders")
+        except Exception as e:
+            logger.error(f"Failed to deliver reminders to {user_id}: {e}")
+            self._retry(reminders)
+            return
+
+        for reminder in reminders:
+            self._attempts.pop(reminder.id, None)  # type: ignore
+        try:
+            # repeating reminders stay in the store, rescheduled by the manager
+            await self.store.delete_many(
+                [r.id for r in reminders if r.recurrence is None]  # type: ignore
             )
-            logger.debug(
-                f"{self.target} had their DMs disabled, pinged in invocation channel"
+        except Exception:
+            # they're delivered again after a restart, rather than lost
+            logger.exception(f"Could not delete the delivered reminders of {user_id}")
+
+    def _retry(self, reminders: List[Reminder]) -> None:
+        """Queues reminders whose delivery failed again, after a backoff."""
+        for reminder in reminders:
+            attempts = self._attempts.get(reminder.id, 0) + 1  # type: ignore
+            if attempts >= self.MAX_ATTEMPTS:
+                del self._attempts[reminder.id]  # type: ignore
+                logger.error(
+                    f"Giving up on reminder {reminder.id} after {attempts} attempts, "
+                    "it's retried when the bot restarts"
+                )
+                continue
+            self._attempts[reminder.id] = attempts  # type: ignore
+            self.bot.scheduler.schedule(
+                datetime.utcnow() + self.RETRY_DELAY * 2 ** (attempts - 1),
+                self.enqueue,
+                reminder,
             )
+
+    async def _deliver_in_channels(
+        self, target: discord.abc.User, reminders: List[Reminder]
+    ) -> None:
+        """
+        Pings the user in the channels the reminders were set in; channels
+        that are gone, or that the bot can't send to, are skipped.
+        """
+        by_channel: Dict[Optional[int], List[Reminder]] = {}
+        for reminder in reminders:
+            by_channel.setdefault(reminder.channel_id, []).append(reminder)
+
+        for channel_id, channel_reminders in by_channel.items():
+            channel = self.bot.get_channel(channel_id)  # type: ignore
+            if channel is None:
+                logger.warning(
+                    f"{target} had their DMs disabled and channel {channel_id} is gone"
+                )
+                continue
+            try:
+                for embed in build_embeds(self.bot, target, channel_reminders):
+                    await self.limiter.acquire(("channel", channel_id))
+                    await channel.send(
+                        content=f"{target.mention}, here's your reminder:",
+                        embed=embed,
+                    )
+            except Forbidden:
+                logger.warning(
+                    f"{target} had their DMs disabled and channel {channel_id} "
+                    "can't be sent to"
+                )
+        logger.debug(f"{target} had their DMs disabled, pinged in invocation channel")
+
+
+class ReminderIndex:
+    """
+    Per-user index of pending reminders: user id -> heap of (due time, reminder id).
+
+    Users are loaded lazily (see `ReminderManager._index_user`) and evicted least
+    recently used first. Removals and due time changes leave stale heap entries
+    behind, which are skipped and dropped whenever a heap is read.
+    """
+
+    def __init__(self, max_users: int = 1024) -> None:
+        self.max_users = max_users
+        self._heaps: "OrderedDict[int, List[Tuple[datetime, int]]]" = OrderedDict()
+        self._reminders: Dict[int, Reminder] = {}
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._heaps
+
+    def add_user(self, user_id: int) -> None:
+        """Starts indexing a user, evicting the least recently used one if needed."""
+        self._heaps[user_id] = []
+        if len(self._heaps) > self.max_users:
+            _, evicted = self._heaps.popitem(last=False)
+            for _, id in evicted:
+                self._reminders.pop(id, None)
+
+    def remove_user(self, user_id: int) -> None:
+        """Stops indexing a user, so they're loaded again on their next lookup."""
+        for _, id in self._heaps.pop(user_id, []):
+            self._reminders.pop(id, None)
+
+    def push(self, reminder: Reminder) -> None:
+        """Indexes a reminder, if its user is being indexed."""
+        heap = self._heaps.get(reminder.user_id)
+        if heap is None:
+            return
+        self._reminders[reminder.id] = reminder  # type: ignore
+        heapq.heappush(heap, (reminder.due_at, reminder.id))  # type: ignore
+
+    def get(self, id: int) -> Optional[Reminder]:
+        return self._reminders.get(id)
+
+    def remove(self, id: int) -> Optional[Reminder]:
+        return self._reminders.pop(id, None)
+
+    def _valid(self, entry: Tuple[datetime, int]) -> bool:
+        reminder = self._reminders.get(entry[1])
+        return reminder is not None and reminder.due_at == entry[0]
+
+    def next_for_user(self, user_id: int) -> Optional[Reminder]:
+        """The user's next reminder; O(log n) amortized."""
+        heap = self._heaps[user_id]
+        while heap and not self._valid(heap[0]):
+            heapq.heappop(heap)
+        return self._reminders[heap[0][1]] if heap else None
+
+    def for_user(self, user_id: int) -> List[Reminder]:
+        """All of the user's reminders, soonest first."""
+        self._heaps.move_to_end(user_id)
+        heap = [entry for entry in self._heaps[user_id] if self._valid(entry)]
+        heapq.heapify(heap)
+        self._heaps[user_id] = heap
+        return [self._reminders[id] for _, id in sorted(heap)]
+
+
+class ReminderManager:
+    """
+    Keeps track of pending reminders.
+
+    Every reminder is persisted to the reminder store; only the ones due within
+    `PRELOAD_WINDOW` are held in memory and handed to the scheduler. The preload
+    loop slides the window forward, pulling in reminders as they come due.
+
+    Reminders of users who list, cancel or snooze their reminders are also kept
+    in a per-user index, so those operations don't need to touch the schedule.
+    """
+
+    # must be longer than the preload loop interval, so consecutive windows overlap
+    PRELOAD_WINDOW = timedelta(minutes=10)
+
+    def __init__(self, bot: UtilityBot) -> None:
+        self.bot = bot
+        self.store: ReminderStore = make_reminder_store(bot)
+        self.delivery = ReminderDelivery(bot, self.store)
+        self._opened = asyncio.Event()
+        self.index = ReminderIndex()
+        # timers of the reminders currently held in the scheduler, by reminder ID
+        self._pending: Dict[int, TimerHandle] = {}
+        # users whose reminders are being loaded into the index
+        self._indexing: Dict[int, "asyncio.Future[None]"] = {}
+        # every reminder due at or before this has been loaded into memory
+        self._horizon: Optional[datetime] = None
+        # held while the preloader moves the horizon, and while a reminder just
+        # stored is checked against it, so no reminder falls between the two
+        self._window_lock = asyncio.Lock()
+        self._tasks = BackgroundTasks()
+
+    async def open(self) -> None:
+        """Opens the reminder store. Called once the bot is ready."""
+        await self.store.open()
+        self._opened.set()
+
+    async def close(self) -> None:
+        self.preload_loop.cancel()
+        await self.store.close()
+
+    async def add(self, reminder: Reminder) -> Reminder:
+        """
+        Persists a new reminder, scheduling it right away if it falls in the preload window.
+        """
+        await self._opened.wait()
+        reminder.id = await self.store.add(reminder)
+        logger.debug(
+            f"{reminder.user_id} - Reminder {reminder.id} scheduled for {reminder.due_at}"
+        )
+
+        self.index.push(reminder)
+        await self._schedule_if_in_window(reminder)
+
+        return reminder
+
+    async def for_user(self, user_id: int) -> List[Reminder]:
+        """
+        Gets a user's pending reminders, soonest first.
+        """
+        await self._index_user(user_id)
+        return self.index.for_user(user_id)
+
+    async def cancel(self, user_id: int, id: int) -> Optional[Reminder]:
+        """
+        Cancels one of a user's reminders.
+
+        Returns:
+            The cancelled reminder, or None if the user has no reminder with that ID.
+        """
+        await self._index_user(user_id)
+        reminder = self.index.get(id)
+        if reminder is None or reminder.user_id != user_id:
+            return None
+
+        self.index.remove(id)
+        timer = self._pending.pop(id, None)
+        if timer is not None:
+            timer.cancel()
+        await self.store.delete(id)
+        logger.debug(f"{user_id} - Reminder {id} cancelled")
+        return reminder
+
+    async def snooze(
+        self, user_id: int, id: int, delay: Union[timedelta, Interval]
+    ) -> Optional[Reminder]:
+        """
+        Pushes one of a user's reminders back by `delay`.
+
+        Returns:
+            The snoozed reminder, or None if the user has no reminder with that ID.
+        """
+        await self._index_user(user_id)
+        reminder = self.index.get(id)
+        if reminder is None or reminder.user_id != user_id:
+            return None
+
+        reminder.due_at += delay  # type: ignore ; Interval.__radd__
+        await self.store.update_due(id, reminder.due_at)
+        self.index.push(reminder)  # the old heap entry is now stale
+
+        timer = self._pending.pop(id, None)
+        if timer is not None:
+            timer.cancel()
+        await self._schedule_if_in_window(reminder)
+        # otherwise the preloader picks it up once the window reaches it
+        logger.debug(f"{user_id} - Reminder {id} snoozed until {reminder.due_at}")
+        return reminder
+
+    async def _index_user(self, user_id: int) -> None:
+        """
+        Loads a user's reminders into the index, if they aren't already.
+        """
+        if user_id in self.index:
+            return
+        if user_id in self._indexing:
+            return await asyncio.shield(self._indexing[user_id])
+
+        future = self._indexing[user_id] = asyncio.get_event_loop().create_future()
+        try:
+            await self._opened.wait()
+            # index the user before querying, so reminders added meanwhile are pushed
+            self.index.add_user(user_id)
+            for record in await self.store.fetch_user(user_id):
+                reminder = Reminder.from_record(record)
+                if self.index.get(reminder.id) is not None:  # type: ignore
+                    continue
+                if self._in_window(reminder) and reminder.id not in self._pending:
+                    # already fired, waiting for delivery to remove it from the store
+                    continue
+                self.index.push(reminder)
+            future.set_result(None)
+        except Exception as e:
+            # not loaded after all; the next lookup tries again
+            self.index.remove_user(user_id)
+            future.set_exception(e)
+            future.exception()  # retrieved by the waiters, if there are any
+            raise
+        finally:
+            del self._indexing[user_id]
+
+    def _in_window(self, reminder: Reminder) -> bool:
+        return self._horizon is not None and reminder.due_at <= self._horizon
+
+    async def _schedule_if_in_window(self, reminder: Reminder) -> None:
+        """
+        Schedules a reminder whose due time was just stored, if the preload
+        window already covers it. A preload running meanwhile is waited for:
+        its query may have missed the reminder, but its horizon then covers it.
+        """
+        async with self._window_lock:
+            if self._in_window(reminder):
+                self._schedule(reminder)
+
+    def _schedule(self, reminder: Reminder) -> None:
+        if reminder.id in self._pending:
+            # the preloader and `add` can both see a reminder created mid-poll
+            return
+
+        # overdue reminders (e.g. from while the bot was down) fire on the next tick
+        self._pending[reminder.id] = self.bot.scheduler.schedule(  # type: ignore
+            reminder.due_at, self._fire, reminder
+        )
+
+    def _fire(self, reminder: Reminder) -> None:
+        self._pending.pop(reminder.id, None)  # type: ignore
+        self.index.remove(reminder.id)  # type: ignore
+        if reminder.recurrence is not None:
+            self._repeat(reminder)
+        self.delivery.enqueue(reminder)
+
+    def _repeat(self, reminder: Reminder) -> None:
+        """
+        Schedules the next occurrence of a repeating reminder that just fired.
+        The next fire time is computed once, here, and stored as the reminder's due time.
+        """
+        next_reminder = reminder.next_occurrence()
+        if next_reminder is None:
+            return
+
+        self.index.push(next_reminder)
+        if self._in_window(next_reminder):
+            self._schedule(next_reminder)
+            coro = self.store.update_due(next_reminder.id, next_reminder.due_at)  # type: ignore
+        else:
+            coro = self._store_next(next_reminder)
+
+        self._tasks.spawn(coro)
+
+    async def _store_next(self, reminder: Reminder) -> None:
+        """
+        Stores the next due time of a repeating reminder outside the window,
+        then schedules it if a preload that ran meanwhile moved past it.
+        """
+        await self.store.update_due(reminder.id, reminder.due_at)  # type: ignore
+        if reminder.user_id in self.index and self.index.get(reminder.id) is None:  # type: ignore
+            return  # cancelled meanwhile
+        await self._schedule_if_in_window(reminder)
+
+    @tasks.loop(minutes=5)
+    async def preload_loop(self) -> None:
+        """
+        Loads reminders that are now inside the preload window.
+        Failures are logged, and the window retried on the next iteration.
+        """
+        async with self._window_lock:
+            until = datetime.utcnow() + self.PRELOAD_WINDOW
+            try:
+                records = await self.store.fetch_due(until=until, after=self._horizon)
+            except DatabaseUnavailable:
+                logger.warning("Not connected to the database, reminders not preloaded")
+                return
+            except Exception:
+                logger.exception("Could not preload reminders")
+                return
+            # only now, or reminders in the window would count as loaded
+            self._horizon = until
+            for record in records:
+                self._schedule(Reminder.from_record(record))
+
+        logger.debug(
+            f"Preloaded {len(records)} reminders, {len(self._pending)} held in memory"
+        )
+        logger.debug(f"Reminder delivery latency: {self.delivery.latency.summary()}")
+
+    @preload_loop.before_loop
+    async def before_preload(self) -> None:
+        await self._opened.wait()
@@ -0,0 +1,183 @@
+"""Spotify tracks found by searches, and their audio features, kept on disk."""
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import tekore
+from loguru import logger
+
+from bot.utils.sqlite import AsyncSQLite
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    id TEXT PRIMARY KEY,
+    track TEXT,  -- FullTrack JSON; NULL for tracks only known by id
+    features BLOB  -- float32 vector of FEATURES; NULL until fetched
+);
+
+CREATE TABLE IF NOT EXISTS track_searches (
+    query TEXT PRIMARY KEY,  -- normalized
+    track_id TEXT NOT NULL REFERENCES tracks(id),
+    expires_at REAL NOT NULL
+);
+"""
+
+# the audio features compared for similarity, each scaled to 0..1
+FEATURES = (
+    "danceability",
+    "energy",
+    "speechiness",
+    "acousticness",
+    "instrumentalness",
+    "liveness",
+    "valence",
+    "tempo",  # / 250 BPM
+    "loudness",  # from -60dB to 0dB
+)
+
+
+def feature_vector(features: tekore.model.AudioFeatures) -> np.ndarray:
+    values = [getattr(features, name) for name in FEATURES[:-2]]
+    values.append(features.tempo / 250)
+    values.append((features.loudness + 60) / 60)
+    return np.clip(np.array(values, dtype=np.float32), 0, 1)
+
+
+def normalize(query: str) -> str:
+    return " ".join(query.casefold().split())
+
+
+class TrackStore:
+    """
+    Tracks by the searches that found them, and their audio features.
+
+    A search maps to its track for `search_ttl`, as Spotify's top result
+    changes with new releases; tracks and their features are kept for good.
+    The features of every track are also held in memory, as the rows of a
+    matrix, so comparing a track to thousands is a single matrix product.
+    """
+
+    def __init__(self, path: Path, *, search_ttl: float) -> None:
+        self.db = AsyncSQLite(path)
+        self.search_ttl = search_ttl
+        self.hits = 0
+        self.misses = 0
+        self._rows: Dict[str, int] = {}  # track id -> row of _features
+        self._features = np.zeros((64, len(FEATURES)), dtype=np.float32)
+        self._opened = asyncio.Event()
+
+    def __len__(self) -> int:
+        """The number of tracks with features."""
+        return len(self._rows)
+
+    async def open(self) -> None:
+        """Opens the store, and loads the features. Called once the bot is ready."""
+        await self.db.connect()
+        await self.db.executescript(SQLITE_SCHEMA)
+        expired = await self.db.execute(
+            "DELETE FROM track_searches WHERE expires_at <= ?", time.time()
+        )
+        rows = await self.db.fetch(
+            "SELECT id, features FROM tracks WHERE features IS NOT NULL"
+        )
+        self._features = np.zeros((max(len(rows), 64), len(FEATURES)), np.float32)
+        for i, row in enumerate(rows):
+            self._features[i] = np.frombuffer(row["features"], dtype=np.float32)
+            self._rows[row["id"]] = i
+        self._opened.set()
+        logger.info(
+            f"Opened track store, {len(rows)} tracks with features, "
+            f"dropped {expired} expired searches"
+        )
+
+    async def close(self) -> None:
+        await self.db.close()
+
+    async def get(self, query: str) -> Optional[tekore.model.FullTrack]:
+        """The track a search found before, if it hasn't expired."""
+        await self._opened.wait()
+        track = await self.db.fetchval(
+            "SELECT t.track FROM track_searches s JOIN tracks t ON t.id = s.track_id "
+            "WHERE s.query = ? AND s.expires_at > ? AND t.track IS NOT NULL",
+            normalize(query),
+            time.time(),
+        )
+        if track is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return tekore.model.FullTrack(**json.loads(track))
+
+    async def put(self, query: str, track: tekore.model.FullTrack) -> None:
+        await self._opened.wait()
+        await self.db.execute(
+            "INSERT INTO tracks (id, track) VALUES (?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET track = excluded.track",
+            track.id,
+            track.json(),
+        )
+        await self.db.execute(
+            "INSERT OR REPLACE INTO track_searches (query, track_id, expires_at) "
+            "VALUES (?, ?, ?)",
+            normalize(query),
+            track.id,
+            time.time() + self.search_ttl,
+        )
+
+    def has_features(self, track_id: str) -> bool:
+        return track_id in self._rows
+
+    async def put_features(
+        self, features: Iterable[Optional[tekore.model.AudioFeatures]]
+    ) -> None:
+        """Stores audio features, skipping tracks Spotify has none for (None)."""
+        vectors = [(f.id, feature_vector(f)) for f in features if f is not None]
+        await self._opened.wait()  # open() replaces the matrix
+        for track_id, vector in vectors:
+            self._set_row(track_id, vector)
+        await self.db.executemany(
+            "INSERT INTO tracks (id, features) VALUES (?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET features = excluded.features",
+            [(track_id, vector.tobytes()) for track_id, vector in vectors],
+        )
+
+    def _set_row(self, track_id: str, vector: np.ndarray) -> None:
+        row = self._rows.get(track_id)
+        if row is None:
+            row = self._rows[track_id] = len(self._rows)
+            if row == len(self._features):  # full, double it
+                self._features = np.concatenate(
+                    [self._features, np.zeros_like(self._features)]
+                )
+        self._features[row] = vector
+
+    def similar(
+        self, track_id: str, candidates: Sequence[str], limit: int
+    ) -> List[Tuple[str, float]]:
+        """
+        Ranks candidate tracks by the cosine similarity of their features to
+        a track's, centred on the mean of all tracks, so that what most tracks
+        have in common (e.g. loudness) doesn't make everything look similar.
+
+        Returns:
+            Up to `limit` (track id, similarity) pairs, most similar first;
+            candidates without features, and the track itself, are left out.
+        """
+        ids = [c for c in candidates if c in self._rows and c != track_id]
+        if track_id not in self._rows or not ids:
+            return []
+
+        features = self._features[: len(self._rows)]
+        mean = features.mean(axis=0)
+        matrix = self._features[[self._rows[c] for c in ids]] - mean
+        query = self._features[self._rows[track_id]] - mean
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        similarity = matrix @ query / np.maximum(norms, 1e-9)
+
+        top = np.argpartition(-similarity, min(limit, len(ids)) - 1)[:limit]
+        top = top[np.argsort(-similarity[top])]
+        return [(ids[i], float(similarity[i])) for i in top]
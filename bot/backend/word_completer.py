@@ -0,0 +1,117 @@
+"""Prefix completion of words, for the dictionary's autocomplete."""
+import sys
+from array import array
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from itertools import accumulate, islice
+from pathlib import Path
+from typing import Iterable, List
+
+from loguru import logger
+
+
+class PackedWords:
+    """
+    Sorted, unique words packed into one bytes object, with their offsets in
+    an array: about 4 bytes per word on top of the UTF-8 itself, where a list
+    of str would take ~60. Prefix search is a bisect over the packed words.
+    """
+
+    def __init__(self, words: Iterable[str]) -> None:
+        encoded = [
+            w.encode() for w in sorted({w.strip().lower() for w in words} - {""})
+        ]
+        self._blob = b"".join(encoded)
+        # word i is _blob[_offsets[i]:_offsets[i + 1]]
+        self._offsets = array("I", accumulate((len(w) for w in encoded), initial=0))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        return self._blob[self._offsets[i] : self._offsets[i + 1]]
+
+    @property
+    def nbytes(self) -> int:
+        return sys.getsizeof(self._blob) + sys.getsizeof(self._offsets)
+
+    def with_prefix(self, prefix: str, limit: int) -> List[str]:
+        """The first `limit` words starting with `prefix`, alphabetically."""
+        key = prefix.encode()
+        out: List[str] = []
+        for i in range(bisect_left(self, key), len(self)):
+            word = self[i]
+            if not word.startswith(key) or len(out) == limit:
+                break
+            out.append(word.decode())
+        return out
+
+
+class WordCompleter:
+    """
+    Completes words from a wordlist, loaded into `PackedWords`, and from the
+    last `recent_size` words users have looked up, which come first.
+    Wordlists are cut off at `max_words`, so memory use stays bounded.
+    """
+
+    def __init__(self, *, max_words: int, recent_size: int) -> None:
+        self.max_words = max_words
+        self.recent_size = recent_size
+        self.words = PackedWords(())
+        # recently looked up words, sorted for prefix search, and by use for eviction
+        self._recent: List[str] = []
+        self._recent_lru: "OrderedDict[str, None]" = OrderedDict()
+
+    @property
+    def nbytes(self) -> int:
+        """Rough memory use, in bytes."""
+        recent = sys.getsizeof(self._recent) + sys.getsizeof(self._recent_lru)
+        recent += sum(sys.getsizeof(w) for w in self._recent)
+        return self.words.nbytes + recent
+
+    def load_wordlist(self, path: Path) -> None:
+        """
+        Loads a file of one word per line. Slow for big lists, run it in a thread.
+        """
+        with open(path, encoding="utf-8") as f:
+            words = [line for _, line in zip(range(self.max_words), f)]
+        # swapped in at once, lookups use the old words until then
+        self.words = PackedWords(words)
+        logger.info(
+            f"Loaded {len(self.words)} words for autocomplete, "
+            f"{self.words.nbytes / 2**20:.1f}MB"
+        )
+
+    def add(self, word: str) -> None:
+        """Adds a looked up word, evicting the least recently used if full."""
+        if word in self._recent_lru:
+            self._recent_lru.move_to_end(word)
+            return
+        insort(self._recent, word)
+        self._recent_lru[word] = None
+        if len(self._recent_lru) > self.recent_size:
+            evicted, _ = self._recent_lru.popitem(last=False)
+            del self._recent[bisect_left(self._recent, evicted)]
+
+    def complete(self, prefix: str, limit: int = 25) -> List[str]:
+        """
+        Words starting with `prefix`; the most recently looked up if it's empty.
+        """
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return list(islice(reversed(self._recent_lru), limit))
+
+        out: List[str] = []
+        for i in range(bisect_left(self._recent, prefix), len(self._recent)):
+            word = self._recent[i]
+            if not word.startswith(prefix) or len(out) == limit:
+                break
+            out.append(word)
+
+        seen = set(out)
+        for word in self.words.with_prefix(prefix, limit):
+            if len(out) == limit:
+                break
+            if word not in seen:
+                out.append(word)
+        return out
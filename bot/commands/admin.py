@@ -0,0 +1,46 @@
+"""Owner-only diagnostics of the bot's internals."""
+from discord import Embed
+from discord.ext import commands
+
+from bot.backend import db
+from bot.internal.bot import UtilityBot
+from bot.utils.constants import EmbedColour
+
+
+class Admin(commands.Cog):
+    """Owner-only diagnostics of the bot's internals."""
+
+    def __init__(self, bot: UtilityBot) -> None:
+        self.bot = bot
+
+    async def cog_check(self, ctx: commands.Context) -> bool:
+        return await self.bot.is_owner(ctx.author)
+
+    @commands.command(name="db-stats")
+    async def db_stats(self, ctx: commands.Context) -> None:
+        """
+        Timings of the database queries since the bot started, slowest first.
+        """
+        embed = Embed(title="Database queries", color=EmbedColour.Info.value)
+        if self.bot.db_pool is None:
+            embed.description = "Not connected to a database"
+        else:
+            pool = self.bot.db_pool
+            embed.description = (
+                f"Pool: {pool.get_size()} connections, {pool.get_idle_size()} idle\n"
+                f"Slow query threshold: {db.SLOW_QUERY * 1e3:.0f}ms"
+            )
+        used = [(name, s) for name, s in db.stats.items() if s.calls]
+        for name, s in sorted(used, key=lambda item: -item[1].mean_seconds)[:25]:
+            embed.add_field(
+                name=name,
+                value=f"Calls: {s.calls}\n"
+                f"Average: {s.mean_seconds * 1e3:.1f}ms\n"
+                f"Max: {s.max_seconds * 1e3:.1f}ms\n"
+                f"Slow: {s.slow}",
+            )
+        await ctx.send(embed=embed)
+
+
+def setup(bot: UtilityBot) -> None:
+    bot.add_cog(Admin(bot))
@@ -1,10 +1,35 @@
 """Standard commands for getting cryptocurrency values."""
-from datetime import datetime
+import io
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
 
+import numpy as np
+from discord import Embed, File
 from discord.ext import commands, tasks
 from loguru import logger
 
+from bot.backend.crypto_alerts import Alert
+from bot.backend.crypto_charts import ChartQueueFull, ChartRenderer
+from bot.backend.crypto_history import WindowStats, to_epoch
+from bot.backend.exceptions import ContentNotFoundError
 from bot.internal.bot import UtilityBot
+from bot.utils import pagination
+from bot.utils.constants import EmbedColour
+from bot.utils.converters import TimeDelta
+from bot.utils.recurrence import Interval
+
+
+DEFAULT_STATS_WINDOW = Interval(delta=timedelta(days=7))
+
+ALERT_DIRECTIONS = {">": True, "above": True, "<": False, "below": False}
+
+
+def alert_direction(arg: str) -> bool:
+    """Converts `>`/`above` and `<`/`below` to whether an alert is for going above."""
+    try:
+        return ALERT_DIRECTIONS[arg.lower()]
+    except KeyError:
+        raise ValueError("The direction should be one of >, <, above or below")
 
 
 class Crypto(commands.Cog):
@@ -15,6 +40,8 @@ class Crypto(commands.Cog):
     def __init__(self, bot: UtilityBot) -> None:
         self.bot = bot
         self.api = bot.crypto_client
+        self.alerts = bot.crypto_alerts
+        self.charts = ChartRenderer()
 
         # adding task loop to bot variable
         self.bot.task_loops["crypto"] = self.crypto_cache_loop
@@ -22,51 +49,285 @@ class Crypto(commands.Cog):
     @commands.group(name="crypto", invoke_without_command=True)
     async def crypto_group(self, ctx: commands.Context, crypto: str) -> None:
         """
-        Gets data about specified cryptocurrency.
-        Currently supported crypto include:
-            "BTC", "ETH", "ADA", "XRM", "XLM", "XRP", "NANO", "IOTA", "VET"
+        Gets data about specified cryptocurrency, by its symbol, name or slug
+        (BTC, ethereum...).
         """
+        # rendered when the quote was fetched
+        embed = await self.api.get_embed(self._resolve(crypto))
+        if embed is None:
+            raise ContentNotFoundError(self._not_found(crypto))
 
-        cached_data = self.bot.api_caches["crypto"]
+        logger.debug(f"Crypto command called by {ctx.author} for crypto {crypto}")
 
-        if not cached_data and (len(self.bot.api_caches) != 0):
-            raise ValueError(
-                "Looks like the cache wasn't ready yet. Please try again later."
-            )
+        await ctx.send(embed=embed)
+
+    @crypto_group.command(name="stats")
+    async def crypto_stats(
+        self,
+        ctx: commands.Context,
+        crypto: str,
+        window: Optional[TimeDelta] = None,
+    ) -> None:
+        """
+        Price statistics of a cryptocurrency over a time window (default 7d),
+        from the prices the bot has recorded, e.g. `crypto stats BTC 30d`.
+        """
+        window = window or DEFAULT_STATS_WINDOW
+        crypto_data, samples = await self._history_window(crypto, window)  # type: ignore
+
+        stats = WindowStats.from_samples(samples)
+        embed = Embed(
+            title=f"{crypto_data['symbol']} - {crypto_data['name']}, last {window}",
+            color=EmbedColour.Info.value,
+        )
+        embed.add_field(
+            name="Price",
+            value=f"Now: ${stats.last:,.6g}\n"
+            f"Change: {stats.change:+.2%}\n"
+            f"Mean: ${stats.mean:,.6g}",
+        )
+        embed.add_field(
+            name="Range",
+            value=f"Low: ${stats.low:,.6g}\n"
+            f"High: ${stats.high:,.6g}\n"
+            f"Max drawdown: {stats.max_drawdown:.2%}",
+        )
+        embed.add_field(
+            name="Volatility",
+            value=f"{stats.volatility:.2%} between samples\n"
+            f"({stats.samples} samples)",
+        )
+        embed.timestamp = stats.start
+        embed.set_footer(text="Recorded since", icon_url=self.bot.user.avatar_url)
 
-        embed = self.api.prepare_output(cached_data["data"][crypto.upper()])
-        embed.timestamp = cached_data["last_updated"]
+        await ctx.send(embed=embed)
+
+    @crypto_group.command(name="chart")
+    async def crypto_chart(
+        self,
+        ctx: commands.Context,
+        crypto: str,
+        window: Optional[TimeDelta] = None,
+    ) -> None:
+        """
+        Draws a price chart of a cryptocurrency over a time window (default 7d),
+        from the prices the bot has recorded, e.g. `crypto chart ETH 30d`.
+        """
+        window = window or DEFAULT_STATS_WINDOW
+        crypto_data, samples = await self._history_window(crypto, window)  # type: ignore
+        symbol = crypto_data["symbol"]
+
+        # the chart only changes when a new sample is recorded
+        key = (symbol, str(window), samples[-1, 0])
+        async with ctx.typing():
+            try:
+                png = await self.charts.render(
+                    key, f"{symbol} - last {window}", samples.copy()
+                )
+            except ChartQueueFull as e:
+                await ctx.reply(str(e))
+                return
+
+        filename = f"{symbol.lower()}.png"
+        embed = Embed(
+            title=f"{symbol} - {crypto_data['name']}",
+            color=EmbedColour.Info.value,
+        )
+        embed.set_image(url=f"attachment://{filename}")
+        embed.timestamp = crypto_data["last_updated"]
         embed.set_footer(text="Data last updated", icon_url=self.bot.user.avatar_url)
 
-        logger.debug(f"Crypto command called by {ctx.author} for crypto {crypto}")
+        await ctx.send(embed=embed, file=File(io.BytesIO(png), filename=filename))
 
+    @crypto_group.command(name="convert")
+    async def crypto_convert(
+        self, ctx: commands.Context, amount: float, source: str, target: str = "USD"
+    ) -> None:
+        """
+        Converts between cryptocurrencies and fiat currencies,
+        e.g. `crypto convert 1.5 ETH ADA` or `crypto convert 100 USD BTC`.
+        Fiat currencies other than USD need CRYPTO_FIAT_CURRENCIES.
+        """
+        source, target = source.upper(), target.upper()
+        # fiat rates come with every quote, only the cryptos need fetching
+        if source not in self.api.fiat_values:
+            source = self._resolve(source)
+        if target not in self.api.fiat_values:
+            target = self._resolve(target)
+        cryptos = [c for c in (source, target) if c not in self.api.fiat_values]
+        quotes = await self.api.get_quotes(cryptos)
+        for crypto in cryptos:
+            if crypto not in quotes:
+                raise ContentNotFoundError(self._not_found(crypto))
+
+        rate = self.api.rates.rate(source, target)
+        if rate is None:
+            raise ContentNotFoundError(f"Can't convert {source} to {target} yet")
+
+        embed = Embed(
+            title=f"{amount:,.8g} {source} = {amount * rate:,.8g} {target}",
+            description=f"1 {source} = {rate:,.8g} {target}",
+            color=EmbedColour.Info.value,
+        )
+        embed.timestamp = self.bot.api_caches["crypto"]["last_updated"]
+        embed.set_footer(text="Rates last updated", icon_url=self.bot.user.avatar_url)
         await ctx.send(embed=embed)
 
-    def _update_cache(self, data: dict) -> None:
+    def _resolve(self, crypto: str) -> str:
+        """
+        Resolves what the user typed to a symbol, or raises with suggestions.
+        """
+        symbol = self.api.resolve(crypto)
+        if symbol is None:
+            raise ContentNotFoundError(self._not_found(crypto))
+        return symbol
+
+    def _not_found(self, crypto: str) -> str:
+        message = f"Couldn't find a cryptocurrency called {crypto}"
+        suggestions = self.api.directory.suggest(crypto)
+        if suggestions:
+            message += "\nDid you mean: " + ", ".join(
+                f"`{c.symbol}` ({c.name})" for c in suggestions
+            )
+        return message
+
+    async def _history_window(
+        self, crypto: str, window: Interval
+    ) -> Tuple[dict, np.ndarray]:
+        """
+        Gets the latest quote of a crypto, and its recorded prices over the window.
         """
-        Updates the bot's internal cache with the crypto data.
+        crypto_data = await self.api.get_quote(self._resolve(crypto))
+        if crypto_data is None:
+            raise ContentNotFoundError(self._not_found(crypto))
+
+        symbol = crypto_data["symbol"]
+        now = datetime.utcnow()
+        start = now - ((now + window) - now)  # type: ignore ; Interval.__radd__
+        series = self.api.history.get(symbol)
+        samples = series.since(to_epoch(start)) if series is not None else []
+        if len(samples) < 2:
+            raise ContentNotFoundError(
+                f"Not enough price history for {symbol} over {window} yet"
+            )
+        return crypto_data, samples  # type: ignore
+
+    @crypto_group.group(name="alert", invoke_without_command=True)
+    async def crypto_alert(
+        self,
+        ctx: commands.Context,
+        crypto: str,
+        direction: alert_direction,  # type: ignore ; converter
+        threshold: float,
+    ) -> None:
         """
-        logger.info("Updating crypto cache")
-        self.bot.api_caches["crypto"] = {  # type: ignore
-            "data": data,
-            "last_updated": datetime.utcnow(),
-        }
+        Get notified once a cryptocurrency goes above or below a price in USD,
+        e.g. `crypto alert BTC > 50000`. Alerts fire once, then are removed.
+        """
+        crypto_data = await self.api.get_quote(self._resolve(crypto))
+        if crypto_data is None:
+            raise ContentNotFoundError(self._not_found(crypto))
+
+        price = crypto_data["price"]
+        if (price > threshold) if direction else (price < threshold):
+            await ctx.reply(
+                f"{crypto_data['symbol']} is already at ${price:,.6g}, "
+                f"{'above' if direction else 'below'} that!"
+            )
+            return
+
+        alert = await self.alerts.add(
+            Alert(
+                user_id=ctx.author.id,
+                channel_id=ctx.channel.id,
+                symbol=crypto_data["symbol"],
+                above=direction,  # type: ignore ; converter
+                threshold=threshold,
+            )
+        )
+
+        embed = Embed(
+            title="Alert set!",
+            description=alert.describe(),
+            color=EmbedColour.Info.value,
+        )
+        embed.set_footer(text=f"Currently ${price:,.6g}")
+        await ctx.reply(embed=embed)
+
+    @crypto_alert.command(name="list")
+    async def list_alerts(self, ctx: commands.Context) -> None:
+        """
+        List your pending crypto alerts.
+        """
+        alerts = await self.alerts.for_user(ctx.author.id)
+        title = f"{ctx.author.display_name}'s crypto alerts"
+
+        if not alerts:
+            await ctx.send(
+                embed=Embed(
+                    title=title,
+                    description="Nothing to see here!",
+                    colour=EmbedColour.Error.value,
+                )
+            )
+            return
+
+        menu = pagination.grouped(
+            [a.describe() for a in alerts], title=title, group_size=10
+        )
+        await menu.start(ctx)
+
+    @crypto_alert.command(name="remove", aliases=["delete", "rm"])
+    async def remove_alert(self, ctx: commands.Context, id: int) -> None:
+        """
+        Remove one of your crypto alerts, by its ID.
+        """
+        alert = await self.alerts.remove(ctx.author.id, id)
+        if alert is None:
+            raise ContentNotFoundError(f"You don't have a crypto alert with ID {id}")
+
+        embed = Embed(
+            title="Alert removed",
+            description=alert.describe(),
+            colour=EmbedColour.Warning.value,
+        )
+        await ctx.reply(embed=embed)
+
+    @commands.Cog.listener()
+    async def on_crypto_refresh(self, quotes: dict) -> None:
+        self.alerts.check(quotes)
+
+    def cog_unload(self) -> None:
+        # the alert store is the bot's, closed with it
+        self.charts.close()
 
     @tasks.loop(hours=1)
     async def crypto_cache_loop(self) -> None:
         """
-        Fetches data every hour from the API
-        and updates the cache.
+        Refreshes every tracked crypto every hour,
+        in between on-demand fetches, and the directory once a day.
+        Failures are logged, and retried on the next iteration; an exception
+        would stop the loop for good.
         """
-        raw_response = await self.api.fetch_data()
-        parsed = self.api.parse_data(raw_response)
-        self._update_cache(parsed)
-        logger.info("Crypto data fetched")
+        try:
+            if self.api.directory.stale:
+                await self.api.refresh_directory()
+            await self.api.refresh()
+            logger.info(f"Crypto data fetched for {len(self.api.tracked)} symbols")
+        except Exception:
+            logger.exception("Could not refresh crypto data")
+        try:
+            await self.api.history.save()
+        except Exception:
+            logger.exception("Could not save crypto history")
 
     @crypto_cache_loop.before_loop
     async def before_crypto_cache(self) -> None:
         logger.info("Crypto data loop starting")
         await self.bot.wait_until_ready()
+        await self.alerts.open()
+        # keep the prices of symbols with alerts refreshed
+        self.api.tracked.update(self.alerts.index.symbols())
 
 
 def setup(bot: UtilityBot) -> None:
@@ -1,8 +1,11 @@
 import typing as t
 
+from discord import Embed
 from discord.ext import commands
 
 from bot.internal.bot import UtilityBot
+from bot.utils import pagination
+from bot.utils.constants import EmbedColour
 
 
 class Dictionary(commands.Cog):
@@ -14,20 +17,74 @@ class Dictionary(commands.Cog):
         self.bot = bot
         self.dictionary = bot.dictionary_client
 
-    @commands.command(name="dictionary", aliases=["meaning"], usage="<word>")
+    @commands.command(name="dictionary", aliases=["meaning"], usage="<words...>")
     @commands.cooldown(rate=1, per=15, type=commands.BucketType.user)
-    async def get_word_meaning(self, ctx: commands.Context, word: str) -> None:
+    async def get_word_meaning(
+        self, ctx: commands.Context, word: str, *words: str
+    ) -> None:
         """
-        Find the meaning of a word easily.
+        Find the meaning of a word easily, or of up to 10 words at once.
         """
+        if words:
+            await self._get_meanings(ctx, [word, *words])
+            return
+
         async with ctx.typing():
-            api_data = await self.dictionary.fetch_data(word=word)
-            parsed_data = self.dictionary.parse_data(api_data)
+            parsed_data = await self.dictionary.get_meaning(word)
 
             embed = self.dictionary.prepare_output(parsed_data, mode="embed")
 
             await ctx.reply(embed=embed, mention_author=False)
 
+    async def _get_meanings(self, ctx: commands.Context, words: t.List[str]) -> None:
+        if len(words) > self.dictionary.MAX_WORDS:
+            await ctx.reply(
+                f"That's a lot of words! Up to {self.dictionary.MAX_WORDS} at a time, please."
+            )
+            return
+
+        async with ctx.typing():
+            entries = await self.dictionary.get_meanings(words)
+
+        menu = pagination.grouped(
+            [self.dictionary.make_summary(w, e) for w, e in entries.items()],
+            title="Dictionary",
+            group_size=1,
+        )
+        await menu.start(ctx)
+
+    @commands.command(name="dictionary-stats")
+    @commands.is_owner()
+    async def dictionary_stats(self, ctx: commands.Context) -> None:
+        """
+        How well the dictionary cache has been doing since the bot started.
+        """
+        stats = self.dictionary.cache.stats
+        embed = Embed(title="Dictionary cache", color=EmbedColour.Info.value)
+        embed.add_field(
+            name="Lookups",
+            value=f"Total: {stats.lookups}\n"
+            f"Hit ratio: {stats.hit_ratio:.1%}\n"
+            f"API calls saved: {stats.saved_calls}",
+        )
+        embed.add_field(
+            name="Hits",
+            value=f"Offline: {stats.index_hits}\n"
+            f"Memory: {stats.memory_hits}\n"
+            f"Disk: {stats.disk_hits}\n"
+            f"Not found: {stats.negative_hits}",
+        )
+        embed.add_field(
+            name="Misses",
+            value=f"Total: {stats.misses}\nAPI calls: {stats.upstream_calls}",
+        )
+        completer = self.dictionary.completer
+        embed.set_footer(
+            text=f"Autocomplete: {len(completer.words)} words, "
+            f"{completer.nbytes / 2**20:.1f}MB"
+        )
+        await ctx.send(embed=embed)
+
 
 def setup(bot: UtilityBot) -> None:
     bot.add_cog(Dictionary(bot))
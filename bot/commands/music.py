@@ -1,10 +1,16 @@
 """music commands for recommending music"""
 
+import tekore
+from discord import Embed
 from discord.ext import commands
 
+from bot.backend import models
 from bot.backend.apis import music
+from bot.backend.exceptions import ContentNotFoundError
 from bot.internal.bot import UtilityBot
+from bot.internal.checks import requires_db
 from bot.internal.context import UtilityContext
+from bot.utils.constants import ContentType, EmbedColour
 
 
 class Music(commands.Cog):
@@ -23,6 +29,76 @@ class Music(commands.Cog):
         response = await self.api.fetch_track_data(name)
         await ctx.send(response.external_urls["spotify"])
 
+    @commands.command(name="music-similar")
+    @commands.guild_only()
+    @requires_db()
+    async def similar(self, ctx: UtilityContext, *, name: str) -> None:
+        """
+        Rank the songs recommended in this server by how much they sound like a song.
+        """
+        async with ctx.typing():
+            track = await self.api.fetch_track_data(name)
+            async with self.bot.db_pool.acquire() as conn:
+                records = await models.Guild(id=ctx.guild.id).get_content_list(
+                    conn, content_type=ContentType.Music
+                )
+
+            # track id -> record, from the recommended tracks' URLs
+            recommended = {}
+            for record in records:
+                try:
+                    kind, track_id = tekore.from_url(record.url or "")
+                except tekore.ConversionError:
+                    continue
+                if kind == "track":
+                    recommended[track_id] = record
+            ranked = await self.api.similar(track.id, list(recommended))
+
+        if not ranked:
+            raise ContentNotFoundError(
+                "No songs recommended in this server can be compared to it yet"
+            )
+        lines = [
+            f"{i}. [{recommended[track_id].name}]({recommended[track_id].url}) "
+            f"({similarity:.0%})"
+            for i, (track_id, similarity) in enumerate(ranked, start=1)
+        ]
+        embed = Embed(
+            title=f"Songs like {track.name}",
+            description="\n".join(lines),
+            color=EmbedColour.Info.value,
+            url=track.external_urls["spotify"],
+        )
+        await ctx.send(embed=embed)
+
+    @commands.command(name="music-stats")
+    @commands.is_owner()
+    async def music_stats(self, ctx: commands.Context) -> None:
+        """
+        Spotify requests since the bot started, and how many were saved.
+        """
+        sent, network = self.api.sender, self.api.network
+        embed = Embed(title="Spotify", color=EmbedColour.Info.value)
+        embed.add_field(
+            name="Requests",
+            value=f"Total: {sent.requests}\n"
+            f"Cached: {sent.requests - network.requests}\n"
+            f"Errors: {sent.errors}",
+        )
+        embed.add_field(
+            name="Sent to Spotify",
+            value=f"Total: {network.requests}\n"
+            f"Average: {network.seconds / max(network.requests, 1) * 1e3:.0f}ms",
+        )
+        tracks = self.api.tracks
+        embed.add_field(
+            name="Track store",
+            value=f"Searches answered: {tracks.hits}\n"
+            f"Searches missed: {tracks.misses}\n"
+            f"Tracks with features: {len(tracks)}",
+        )
+        await ctx.send(embed=embed)
+
 
 def setup(bot: UtilityBot) -> None:
     bot.add_cog(Music(bot))
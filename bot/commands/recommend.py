@@ -7,6 +7,7 @@ from discord.ext import commands
 from bot.backend import anime
 from bot.backend import models
 from bot.internal.bot import UtilityBot
+from bot.internal.checks import requires_db
 from bot.internal.context import UtilityContext
 from bot.utils import pagination
 from bot.utils.constants import ContentType, EmbedColour
@@ -19,33 +20,47 @@ class Recommendations(commands.Cog):
     def __init__(self, bot: UtilityBot) -> None:
         self.bot = bot
 
-    def recommend_output(self, records: List[models.ContentRecord]) -> Embed:
+    def recommend_output(
+        self,
+        added: List[models.ContentRecord],
+        existing: List[models.ContentRecord],
+    ) -> Embed:
         """
         Prepares the embed output for a `recommend x` command.
 
         Args:
-            records: List of ContentRecord objects, for each user that something was recommended to.
+            added: List of ContentRecord objects, for each user that something was recommended to.
+            existing: List of ContentRecord objects, for each user that already had it.
 
         Returns:
             The embed to be sent as the output.
         """
-        if len(records) > 1:
-            last_record = records[-1]
-            uptil_last = ", ".join([f"<@{r.user_id}>" for r in records[:-1]])
-            last = f"<@{last_record.user_id}>'s"
-            out = f"Added [{last_record.name}]({last_record.url}) to {uptil_last} and {last} {last_record.type.value} lists."
-        else:
-            record = records[0]
-            out = f"Added [{record.name}]({record.url}) to <@{record.user_id}>'s {record.type.value} list."
+        record = (added or existing)[0]
+        link = f"[{record.name}]({record.url})"
+        out = []
+        if len(added) > 1:
+            uptil_last = ", ".join([f"<@{r.user_id}>" for r in added[:-1]])
+            last = f"<@{added[-1].user_id}>'s"
+            out.append(
+                f"Added {link} to {uptil_last} and {last} {record.type.value} lists."
+            )
+        elif added:
+            out.append(
+                f"Added {link} to <@{added[0].user_id}>'s {record.type.value} list."
+            )
+        if existing:
+            mentions = ", ".join([f"<@{r.user_id}>" for r in existing])
+            out.append(f"{mentions} already had {link} on their list.")
 
         em = Embed(
-            title="Recommended!",
-            description=out,
-            color=EmbedColour.Success.value,
+            title="Recommended!" if added else "Already recommended",
+            description="\n".join(out),
+            color=EmbedColour.Success.value if added else EmbedColour.Info.value,
         )
         return em  # TODO: add header/footer images with users pfp
 
     @commands.command(name="recommend")
+    @requires_db()
     async def recommend(
         self,
         ctx: UtilityContext,
@@ -55,6 +70,16 @@ class Recommendations(commands.Cog):
         name: Union[URL, str],
     ) -> None:
         """Recommend content to users"""
+        if not members:
+            await ctx.send(
+                embed=Embed(
+                    title="Recommend to who?",
+                    description="Mention the members to recommend this to.",
+                    colour=EmbedColour.Error.value,
+                )
+            )
+            return
+
         async with ctx.typing():
             if isinstance(name, URL):
                 embed = ctx.message.embeds[0]
@@ -84,13 +109,12 @@ class Recommendations(commands.Cog):
             ]
 
         async with self.bot.db_pool.acquire() as conn:
-            for record in db_records:
-                db_member = models.User(id=record.user_id)
-                await db_member.add_to_list(conn, record=record)
+            added, existing = await models.ContentRecord.save_many(conn, db_records)
 
-        await ctx.reply(embed=self.recommend_output(db_records))
+        await ctx.reply(embed=self.recommend_output(added, existing))
 
     @commands.command(name="recommended", aliases=["list"])
+    @requires_db()
     async def recommended(self, ctx: UtilityContext, list_type: ContentType) -> None:
         """Returns all the content that you've been recommended."""
         async with self.bot.db_pool.acquire() as conn:
@@ -1,17 +1,18 @@
 """Standard reminder command."""
-from datetime import datetime
-
 from discord import Embed
 from discord.ext import commands
 from loguru import logger
 
+from bot.backend.exceptions import ContentNotFoundError
 from bot.backend.reminders import Reminder
 from bot.internal.bot import UtilityBot
+from bot.internal.checks import DatabaseUnavailable
+from bot.utils import pagination
 from bot.utils.constants import EmbedColour
-from bot.utils.converters import TimeDelta
+from bot.utils.converters import RecurrenceConverter, TimeDelta
 
 
-class Reminder(commands.Cog):
+class Reminders(commands.Cog):
     """
     Standard commands for setting reminders.
     """
@@ -19,6 +20,12 @@ class Reminder(commands.Cog):
     def __init__(self, bot: UtilityBot) -> None:
         self.bot = bot
 
+    async def cog_check(self, ctx: commands.Context) -> bool:
+        # with DB_URI set, reminders are stored in the database
+        if not self.bot.reminders.store.available:
+            raise DatabaseUnavailable("Reminders aren't available right now")
+        return True
+
     @commands.command(name="remind")
     async def remind(
         self, ctx: commands.Context, delay: TimeDelta, *, content: str
@@ -28,27 +35,133 @@ class Reminder(commands.Cog):
 
         The `delay` argument should be a string, like:
             `3h4m` -> represents 3 hours and 4 minutes.
+            `1mo2d` -> represents 1 month and 2 days.
         """
         logger.debug(f"Reminder command called by {ctx.author}")
-        when = (
-            datetime.utcnow() + delay
-        )  # type: ignore ; pylance won't understand converters
+        reminder = await self.bot.reminders.add(
+            Reminder.from_context(
+                ctx, delay=delay, content=content  # type: ignore ; converter
+            )
+        )
+
         embed = Embed(
-            title="Reminder set!", colour=EmbedColour.Info.value, timestamp=when
+            title="Reminder set!",
+            colour=EmbedColour.Info.value,
+            timestamp=reminder.due_at,
+        )
+
+        embed.set_footer(
+            text=f"ID {reminder.id} • You will be reminded",
+            icon_url=ctx.bot.user.avatar_url,
+        )
+        embed.set_author(
+            name=ctx.author.display_name,  # type: ignore ; dpy issue
+            url=ctx.author.avatar_url,  # type: ignore ; dpy issue
+        )
+
+        await ctx.reply(embed=embed)
+
+    @commands.command(name="every", aliases=["repeat"])
+    async def every(
+        self, ctx: commands.Context, schedule: RecurrenceConverter, *, content: str
+    ) -> None:
+        """
+        Set a reminder that repeats until you cancel it.
+
+        The `schedule` argument is either an interval, or a cron expression
+        in quotes (times are in UTC):
+            `1d` -> every day from now on.
+            `"0 9 * * 1-5"` -> at 9:00 UTC on weekdays.
+        """
+        reminder = await self.bot.reminders.add(
+            Reminder.from_context(
+                ctx, recurrence=schedule, content=content  # type: ignore ; converter
+            )
         )
 
-        embed.set_footer(text="You will be reminded", icon_url=ctx.bot.user.avatar_url)
+        embed = Embed(
+            title="Repeating reminder set!",
+            description=f"Repeats `{reminder.recurrence}`",
+            colour=EmbedColour.Info.value,
+            timestamp=reminder.due_at,
+        )
+        embed.set_footer(
+            text=f"ID {reminder.id} • First reminder",
+            icon_url=ctx.bot.user.avatar_url,
+        )
         embed.set_author(
             name=ctx.author.display_name,  # type: ignore ; dpy issue
             url=ctx.author.avatar_url,  # type: ignore ; dpy issue
         )
 
-        Reminder(
-            ctx, delay=delay, content=content  # type: ignore ; converter
-        ).schedule_reminder()  # type: ignore ; converter
+        await ctx.reply(embed=embed)
+
+    @commands.command(name="reminders")
+    async def list_reminders(self, ctx: commands.Context) -> None:
+        """
+        List your pending reminders.
+        """
+        reminders = await self.bot.reminders.for_user(ctx.author.id)
+        title = f"{ctx.author.display_name}'s reminders"
+
+        if not reminders:
+            await ctx.send(
+                embed=Embed(
+                    title=title,
+                    description="Nothing to see here!",
+                    colour=EmbedColour.Error.value,
+                )
+            )
+            return
+
+        menu = pagination.grouped(
+            [r.describe() for r in reminders], title=title, group_size=10
+        )
+        await menu.start(ctx)
+
+    @commands.group(name="reminder", invoke_without_command=True)
+    async def reminder_group(self, ctx: commands.Context) -> None:
+        """
+        Manage your pending reminders.
+        """
+        await ctx.send_help(ctx.command)
+
+    @reminder_group.command(name="cancel", aliases=["delete", "rm"])
+    async def cancel(self, ctx: commands.Context, id: int) -> None:
+        """
+        Cancel one of your reminders, by its ID.
+        """
+        reminder = await self.bot.reminders.cancel(ctx.author.id, id)
+        if reminder is None:
+            raise ContentNotFoundError(f"You don't have a reminder with ID {id}")
+
+        embed = Embed(
+            title="Reminder cancelled",
+            description=reminder.describe(),
+            colour=EmbedColour.Warning.value,
+        )
+        await ctx.reply(embed=embed)
+
+    @reminder_group.command(name="snooze")
+    async def snooze(self, ctx: commands.Context, id: int, delay: TimeDelta) -> None:
+        """
+        Push one of your reminders back, e.g. `snooze 42 1h`.
+        """
+        reminder = await self.bot.reminders.snooze(
+            ctx.author.id, id, delay  # type: ignore ; converter
+        )
+        if reminder is None:
+            raise ContentNotFoundError(f"You don't have a reminder with ID {id}")
 
+        embed = Embed(
+            title="Reminder snoozed",
+            description=reminder.describe(),
+            colour=EmbedColour.Info.value,
+            timestamp=reminder.due_at,
+        )
+        embed.set_footer(text="You will be reminded")
         await ctx.reply(embed=embed)
 
 
 def setup(bot: UtilityBot) -> None:
-    bot.add_cog(Reminder(bot))
+    bot.add_cog(Reminders(bot))
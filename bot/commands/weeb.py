@@ -1,10 +1,11 @@
 """Standard anime and manga commands."""
+from discord import Embed
 from discord.ext import commands
 
 from bot.backend import anime
 from bot.internal.bot import UtilityBot
 from bot.internal.context import UtilityContext
-from bot.utils.constants import ContentType
+from bot.utils.constants import ContentType, EmbedColour
 
 
 class Weeb(commands.Cog):
@@ -37,6 +38,32 @@ class Weeb(commands.Cog):
             resp = await anime.get_character(self.bot, name=name)
             await ctx.send(resp["siteUrl"])
 
+    @commands.command(name="anilist-stats")
+    @commands.is_owner()
+    async def anilist_stats(self, ctx: commands.Context) -> None:
+        """
+        How well the AniList cache has been doing since the bot started.
+        """
+        client = self.bot.anilist_client
+        stats = client.cache.stats
+        embed = Embed(title="AniList cache", color=EmbedColour.Info.value)
+        embed.add_field(
+            name="Searches",
+            value=f"Total: {stats.lookups}\nHit ratio: {stats.hit_ratio:.1%}",
+        )
+        embed.add_field(
+            name="Hits",
+            value=f"Exact: {stats.exact_hits}\nNear-duplicate: {stats.fuzzy_hits}",
+        )
+        embed.add_field(
+            name="Misses",
+            value=f"Total: {stats.misses}\n"
+            f"API calls: {client.requests}\n"
+            f"Throttled: {client.throttled}",
+        )
+        embed.set_footer(text=f"{len(client.cache)}/{client.cache.size} cached")
+        await ctx.send(embed=embed)
+
 
 def setup(bot: UtilityBot) -> None:
     bot.add_cog(Weeb(bot))
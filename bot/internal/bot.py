@@ -1,23 +1,29 @@
 """Bot definition."""
 from typing import Any
 from typing import Mapping
+from typing import Optional
 from typing import Type
 
 import discord
 from aiohttp import ClientSession
-from aioscheduler import Manager
-from asyncpg import create_pool
+from asyncpg import Pool
 from decouple import config
 from discord.ext import commands
-from discord_slash import SlashCommand
+from discord_slash import SlashCommand, SlashContext
 from loguru import logger
 
+from bot.backend import db
+from bot.backend.apis import anilist
 from bot.backend.apis import crypto
 from bot.backend.apis import dictionary
 from bot.backend.apis import music  # add more clients here as we go
+from bot.backend.crypto_alerts import AlertManager
 from bot.backend.exceptions import ContentNotFoundError
 from bot.backend.models import Guild
+from bot.backend.reminders import ReminderManager
+from bot.internal.checks import DatabaseUnavailable
 from bot.internal.context import UtilityContext
+from bot.utils.timing_wheel import TimingWheel
 
 
 class UtilityBot(commands.Bot):
@@ -28,15 +34,17 @@ class UtilityBot(commands.Bot):
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
         self.slash = SlashCommand(self, sync_commands=True, override_type=True)
-        self.manager = Manager(
-            5
-        )  # creates a Scheduler manager which manages 5 TimedSchedulers.
+        # schedules callbacks for future work (reminders etc.) on a single timer
+        self.scheduler = TimingWheel()
+        self.reminders = ReminderManager(self)
+        # opened by the crypto cog, before its refresh loop starts
+        self.crypto_alerts = AlertManager(self)
 
         # set logger level
         debug = config("DEBUG", False) == "true"  # if not set, this will be False
         # logger.add(sys.stderr, level="DEBUG" if debug else "INFO")
 
-        # bot variable for list of cryptos to cache
+        # cryptos to start tracking with; others are added as they're looked up
         self._crypto_list = [
             "BTC",
             "ETH",
@@ -55,13 +63,15 @@ class UtilityBot(commands.Bot):
         #   'crypto'
         # caches are of format:
         # {cache_name: {last_updated: utc datetime, data: data}}
-        self.api_caches: Mapping[str, Mapping[str, Any]] = {}
+        self.api_caches: Mapping[str, Mapping[str, Any]] = {
+            "crypto": {"data": {}, "last_updated": None},
+        }
 
         # map of running task loops
-        self.task_loops = {}
+        self.task_loops = {"reminders": self.reminders.preload_loop}
 
-        # create db pool; await on_ready
-        # self.db_pool = create_pool(config("DB_URI"))
+        # postgres connection pool, created in on_ready if DB_URI is set
+        self.db_pool: Optional[Pool] = None
 
         self.initialize_api_clients()
 
@@ -72,14 +82,43 @@ class UtilityBot(commands.Bot):
             # make http client session
             self.http_session = ClientSession()
             logger.info("Created HTTP ClientSession")
+            # connect to the db before the stores that use it are opened
+            await self.connect_db()
+            # open the reminder store before the preload loop starts
+            await self.reminders.open()
+            await self.dictionary_client.open()
+            await self.music_client.open()
             # start task loops
             self.start_task_loops()
-            # actually connect to the db
-            # await self.db_pool
-            # logger.info("Connected to database")
-
-        self.manager.start()
-        logger.info("Started Scheduler manager")
+        elif self.db_pool is None:
+            await self.connect_db()
+
+        self.scheduler.start()
+        logger.info("Started scheduler")
+
+    async def connect_db(self) -> None:
+        """
+        Creates the db pool, if DB_URI is set. Failures are logged, and the
+        bot runs without a db until a reconnect retries (see on_ready).
+        """
+        dsn = config("DB_URI", default=None)
+        if not dsn:
+            return
+        try:
+            self.db_pool = await db.create_pool(dsn)
+        except Exception:
+            logger.exception("Could not connect to the database, retrying on reconnect")
+
+    async def close(self) -> None:
+        self.scheduler.stop()
+        await self.reminders.close()
+        await self.crypto_client.close()
+        await self.crypto_alerts.close()
+        await self.dictionary_client.close()
+        await self.music_client.close()
+        if self.db_pool is not None:
+            await self.db_pool.close()
+        await super().close()
 
     async def on_command_error(self, ctx: commands.Context, error: Any) -> None:
         ignored = (commands.CommandNotFound,)
@@ -93,7 +132,7 @@ class UtilityBot(commands.Bot):
                 delete_after=7,
             )
             return
-        elif isinstance(error, ContentNotFoundError):
+        elif isinstance(error, (ContentNotFoundError, DatabaseUnavailable)):
             embed = discord.Embed(
                 title="Nope", description=error.args[0], color=discord.Colour.red()
             )
@@ -110,9 +149,21 @@ class UtilityBot(commands.Bot):
         else:
             raise error
 
+    async def on_slash_command_error(self, ctx: SlashContext, error: Exception) -> None:
+        if isinstance(error, DatabaseUnavailable):
+            embed = discord.Embed(
+                title="Nope", description=error.args[0], color=discord.Colour.red()
+            )
+            await ctx.send(embed=embed, hidden=True)
+            return
+        raise error
+
     async def on_guild_join(self, guild: discord.Guild) -> None:
         # register new guilds to the database
         logger.info(f"Added to {guild.name} with {guild.member_count} members.")
+        if self.db_pool is None:
+            logger.warning(f"Not connected to the database, {guild.name} isn't saved")
+            return
         db_guild = Guild(id=guild.id)
 
         async with self.db_pool.acquire() as conn:
@@ -122,6 +173,9 @@ class UtilityBot(commands.Bot):
 
     async def on_guild_remove(self, guild: discord.Guild) -> None:
         # delete the guilds data when they remove the bot
+        if self.db_pool is None:
+            logger.warning(f"Not connected to the database, {guild.name} isn't deleted")
+            return
         async with self.db_pool.acquire() as conn:
             await Guild(id=guild.id).delete(conn)
 
@@ -135,6 +189,7 @@ class UtilityBot(commands.Bot):
         self.dictionary_client = dictionary.DictionaryClient(self)
         self.crypto_client = crypto.CryptoClient(self)
         self.music_client = music.MusicClient()
+        self.anilist_client = anilist.AniListClient(self)
 
     def start_task_loops(self) -> None:
         if len(self.task_loops) == 0:
@@ -0,0 +1,32 @@
+"""Command checks shared by the cogs."""
+from typing import Callable, TypeVar
+
+from discord.ext import commands
+
+T = TypeVar("T")
+
+
+class DatabaseUnavailable(commands.CheckFailure):
+    """
+    Raised by `requires_db`, and by stores that need the database, when the
+    bot has no database connection.
+    """
+
+    def __init__(
+        self, message: str = "This needs the database, which isn't available right now"
+    ) -> None:
+        super().__init__(message)
+
+
+def requires_db() -> Callable[[T], T]:
+    """
+    Only runs the command when the bot is connected to the database, i.e.
+    DB_URI is set and the pool started; users get an error otherwise.
+    """
+
+    async def predicate(ctx: commands.Context) -> bool:
+        if ctx.bot.db_pool is None:
+            raise DatabaseUnavailable()
+        return True
+
+    return commands.check(predicate)
@@ -0,0 +1,13 @@
+/* persist pending reminders, so that they survive restarts. */
+
+CREATE TABLE IF NOT EXISTS reminders (
+    id BIGINT PRIMARY KEY GENERATED ALWAYS AS IDENTITY,
+    user_id BIGINT NOT NULL,
+    channel_id BIGINT,
+    content TEXT NOT NULL,
+    title TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc'),
+    due_at TIMESTAMP NOT NULL  -- naive UTC, like the rest of the bot
+);
+
+CREATE INDEX reminders_due_at ON reminders(due_at);  -- the preloader scans by due time window
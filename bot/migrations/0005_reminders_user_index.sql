@@ -0,0 +1,3 @@
+/* index reminders by user, for listing, cancelling and snoozing a user's reminders. */
+
+CREATE INDEX reminders_user_id ON reminders(user_id);
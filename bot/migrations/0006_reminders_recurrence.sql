@@ -0,0 +1,3 @@
+/* repeating reminders: the schedule expression ("every 1d", or a cron expression), NULL for one-off reminders. */
+
+ALTER TABLE reminders ADD COLUMN recurrence TEXT;
@@ -0,0 +1,11 @@
+/* one record per user, name (in any case) and content type, so saves can upsert instead of checking first. */
+
+DELETE FROM user_content a
+    USING user_content b
+    WHERE a.user_id = b.user_id
+        AND LOWER(a.content_name) = LOWER(b.content_name)
+        AND a.content_type = b.content_type
+        AND a.id > b.id;  -- keep the first recommendation
+
+CREATE UNIQUE INDEX user_content_unique
+    ON user_content (user_id, LOWER(content_name), content_type);
@@ -3,6 +3,19 @@ from discord_slash import cog_ext, SlashContext
 from discord_slash.utils.manage_commands import create_option
 
 from bot.internal.bot import UtilityBot
+from bot.utils import pagination
+
+# interaction types not supported by discord_slash yet
+AUTOCOMPLETE = 4
+AUTOCOMPLETE_RESULT = 8
+
+
+def autocomplete_option(**kwargs) -> dict:
+    """An option Discord asks to autocomplete; these can't have choices."""
+    option = create_option(**kwargs)
+    del option["choices"]
+    option["autocomplete"] = True
+    return option
 
 
 class SlashDictionary(commands.Cog):
@@ -17,9 +30,9 @@ class SlashDictionary(commands.Cog):
         name="dictionary",
         description="Find the meaning of a word easily.",
         options=[
-            create_option(
+            autocomplete_option(
                 name="word",
-                description="Word to search for",
+                description="Word to search for, suggested as you type",
                 option_type=3,
                 required=True,
             ),
@@ -36,13 +49,80 @@ class SlashDictionary(commands.Cog):
     ) -> None:
         await ctx.defer(hidden=ephemeral)
 
-        api_data = await self.bot.dictionary_client.fetch_data(word=word)
-        parsed_data = self.bot.dictionary_client.parse_data(api_data)
+        parsed_data = await self.bot.dictionary_client.get_meaning(word)
 
         output = self.bot.dictionary_client.prepare_output(parsed_data)
 
         await ctx.send(embed=output, hidden=ephemeral)
 
+    @cog_ext.cog_slash(
+        name="meanings",
+        description="Find the meanings of several words at once.",
+        options=[
+            create_option(
+                name="words",
+                description="Words to search for, separated by spaces",
+                option_type=3,
+                required=True,
+            ),
+        ],
+    )
+    async def slash_meanings(self, ctx: SlashContext, words: str) -> None:
+        dictionary = self.bot.dictionary_client
+        split = words.replace(",", " ").split()
+        if not split or len(split) > dictionary.MAX_WORDS:
+            await ctx.send(
+                f"Give me between 1 and {dictionary.MAX_WORDS} words, please.",
+                hidden=True,
+            )
+            return
+        await ctx.defer()
+
+        entries = await dictionary.get_meanings(split)
+
+        menu = pagination.grouped(
+            [dictionary.make_summary(w, e) for w, e in entries.items()],
+            title="Dictionary",
+            group_size=1,
+        )
+        # the first page answers the interaction, the menu takes it from there
+        menu.message = await ctx.send(embed=menu.source.entries[0])
+        await menu.start(ctx)
+
+    @commands.Cog.listener()
+    async def on_socket_response(self, msg: dict) -> None:
+        """
+        Answers autocomplete requests for /dictionary's word, which
+        discord_slash ignores. Discord gives up on them after 3 seconds.
+        """
+        if msg["t"] != "INTERACTION_CREATE" or msg["d"]["type"] != AUTOCOMPLETE:
+            return
+        interaction = msg["d"]
+        if interaction["data"]["name"] != "dictionary":
+            return
+
+        focused = next(
+            (o for o in interaction["data"].get("options", []) if o.get("focused")),
+            None,
+        )
+        if focused is None or focused["name"] != "word":
+            return
+
+        words = self.bot.dictionary_client.completer.complete(focused["value"])
+        await self.bot.slash.req.command_response(
+            interaction["token"],
+            False,
+            "POST",
+            interaction["id"],
+            json={
+                "type": AUTOCOMPLETE_RESULT,
+                # choice names and values are limited to 100 characters
+                "data": {
+                    "choices": [{"name": w, "value": w} for w in words if len(w) <= 100]
+                },
+            },
+        )
+
 
 def setup(bot: UtilityBot) -> None:
     bot.add_cog(SlashDictionary(bot))
@@ -1,5 +1,4 @@
 from bot.internal.bot import UtilityBot
-from datetime import datetime
 
 from discord import Embed
 from discord.ext import commands
@@ -8,7 +7,7 @@ from discord_slash.utils.manage_commands import create_option
 
 from bot.backend.reminders import Reminder
 from bot.utils.constants import EmbedColour
-from bot.utils.converters import TimeDelta
+from bot.utils.converters import TimeDelta, parse_recurrence
 
 
 GUILD_IDS = [298871492924669954]
@@ -19,6 +18,9 @@ class SlashReminders(commands.Cog):
     Reminders cog: Slash commands version.
     """
 
+    def __init__(self, bot: UtilityBot) -> None:
+        self.bot = bot
+
     @cog_ext.cog_slash(
         name="remind",
         description="Sets a reminder.",
@@ -42,16 +44,153 @@ class SlashReminders(commands.Cog):
         await ctx.defer()
 
         td = await TimeDelta().convert(ctx, delay)
-        when = datetime.utcnow() + td
+        reminder = await self.bot.reminders.add(
+            Reminder.from_context(ctx, delay=td, content=content)
+        )
 
-        em = Embed(title="Reminder set!", colour=EmbedColour.Info.value, timestamp=when)
+        em = Embed(
+            title="Reminder set!",
+            colour=EmbedColour.Info.value,
+            timestamp=reminder.due_at,
+        )
         em.set_author(name=ctx.author.display_name, icon_url=ctx.author.avatar_url)
-        em.set_footer(text="You will be reminded", icon_url=ctx.bot.user.avatar_url)
+        em.set_footer(
+            text=f"ID {reminder.id} • You will be reminded",
+            icon_url=ctx.bot.user.avatar_url,
+        )
 
-        Reminder(ctx, delay=td, content=content).schedule_reminder()
+        await ctx.send(embed=em)
+
+    @cog_ext.cog_slash(
+        name="every",
+        description="Sets a repeating reminder.",
+        options=[
+            create_option(
+                name="schedule",
+                description="an interval like 1d, or a cron expression in UTC",
+                option_type=3,
+                required=True,
+            ),
+            create_option(
+                name="content",
+                description="what to remind you about.",
+                option_type=3,
+                required=True,
+            ),
+        ],
+        guild_ids=GUILD_IDS,
+    )
+    async def slash_every(self, ctx: SlashContext, schedule: str, content: str) -> None:
+        await ctx.defer()
+
+        recurrence = parse_recurrence(schedule)
+        reminder = await self.bot.reminders.add(
+            Reminder.from_context(ctx, recurrence=recurrence, content=content)
+        )
+
+        em = Embed(
+            title="Repeating reminder set!",
+            description=f"Repeats `{reminder.recurrence}`",
+            colour=EmbedColour.Info.value,
+            timestamp=reminder.due_at,
+        )
+        em.set_author(name=ctx.author.display_name, icon_url=ctx.author.avatar_url)
+        em.set_footer(
+            text=f"ID {reminder.id} • First reminder",
+            icon_url=ctx.bot.user.avatar_url,
+        )
 
         await ctx.send(embed=em)
 
+    @cog_ext.cog_slash(
+        name="reminders",
+        description="Lists your pending reminders.",
+        guild_ids=GUILD_IDS,
+    )
+    async def slash_list_reminders(self, ctx: SlashContext) -> None:
+        await ctx.defer(hidden=True)
+
+        reminders = await self.bot.reminders.for_user(ctx.author_id)
+        lines = [r.describe() for r in reminders[:20]]
+        if len(reminders) > 20:
+            lines.append(f"...and {len(reminders) - 20} more")
+
+        em = Embed(
+            title=f"{ctx.author.display_name}'s reminders",
+            description="\n".join(lines) or "Nothing to see here!",
+            colour=EmbedColour.Info.value,
+        )
+        await ctx.send(embed=em, hidden=True)
+
+    @cog_ext.cog_subcommand(
+        base="reminder",
+        name="cancel",
+        description="Cancels one of your reminders.",
+        options=[
+            create_option(
+                name="id",
+                description="ID of the reminder, see /reminders",
+                option_type=4,
+                required=True,
+            ),
+        ],
+        guild_ids=GUILD_IDS,
+    )
+    async def slash_cancel_reminder(self, ctx: SlashContext, id: int) -> None:
+        await ctx.defer(hidden=True)
+
+        reminder = await self.bot.reminders.cancel(ctx.author_id, id)
+        if reminder is None:
+            await ctx.send(f"You don't have a reminder with ID {id}", hidden=True)
+            return
+
+        em = Embed(
+            title="Reminder cancelled",
+            description=reminder.describe(),
+            colour=EmbedColour.Warning.value,
+        )
+        await ctx.send(embed=em, hidden=True)
+
+    @cog_ext.cog_subcommand(
+        base="reminder",
+        name="snooze",
+        description="Pushes one of your reminders back.",
+        options=[
+            create_option(
+                name="id",
+                description="ID of the reminder, see /reminders",
+                option_type=4,
+                required=True,
+            ),
+            create_option(
+                name="delay",
+                description="how much later you should be reminded",
+                option_type=3,
+                required=True,
+            ),
+        ],
+        guild_ids=GUILD_IDS,
+    )
+    async def slash_snooze_reminder(
+        self, ctx: SlashContext, id: int, delay: str
+    ) -> None:
+        await ctx.defer(hidden=True)
+
+        td = await TimeDelta().convert(ctx, delay)
+        reminder = await self.bot.reminders.snooze(ctx.author_id, id, td)
+        if reminder is None:
+            await ctx.send(f"You don't have a reminder with ID {id}", hidden=True)
+            return
+
+        em = Embed(
+            title="Reminder snoozed",
+            description=reminder.describe(),
+            colour=EmbedColour.Info.value,
+            timestamp=reminder.due_at,
+        )
+        em.set_footer(text="You will be reminded")
+        await ctx.send(embed=em, hidden=True)
+
 
 def setup(bot: UtilityBot) -> None:
     bot.add_cog(SlashReminders(bot))
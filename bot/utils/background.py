@@ -0,0 +1,32 @@
+"""Fire-and-forget tasks that are still kept track of."""
+import asyncio
+from typing import Any, Awaitable, Iterator, Set
+
+
+class BackgroundTasks:
+    """
+    Holds on to background tasks until they're done: the event loop only keeps
+    weak references to tasks, so one nothing refers to can vanish mid-run.
+
+    Usage:
+    ```py
+    self._tasks = BackgroundTasks()
+    self._tasks.spawn(self.store.save(item))
+    ```
+    """
+
+    def __init__(self) -> None:
+        self._tasks: Set["asyncio.Future[Any]"] = set()
+
+    def spawn(self, awaitable: Awaitable[Any]) -> "asyncio.Future[Any]":
+        """Runs a coroutine (or awaits a future) in the background."""
+        task = asyncio.ensure_future(awaitable)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def __iter__(self) -> Iterator["asyncio.Future[Any]"]:
+        return iter(set(self._tasks))
+
+    def __len__(self) -> int:
+        return len(self._tasks)
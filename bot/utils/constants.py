@@ -2,8 +2,10 @@
 from __future__ import annotations
 
 from enum import Enum
+from pathlib import Path
 from typing import TYPE_CHECKING
 
+from decouple import config
 
 from bot.backend.exceptions import BadContentTypeError
 
@@ -11,6 +13,10 @@ if TYPE_CHECKING:
     from bot.internal.context import UtilityContext
 
 
+# directory for local state (sqlite fallbacks, caches etc.)
+DATA_DIR = Path(config("DATA_DIR", default="data"))
+
+
 class EmbedColour(Enum):
     """
     Colors used throughout embeds returned by the bot.
@@ -1,5 +1,5 @@
 """Argument type converters."""
-import itertools
+import functools
 import re
 from dataclasses import dataclass
 from datetime import timedelta
@@ -7,6 +7,13 @@ from typing import Optional
 
 from discord.ext import commands
 
+from bot.utils.recurrence import (
+    CronRecurrence,
+    Interval,
+    IntervalRecurrence,
+    Recurrence,
+)
+
 
 FORMATTED_CODE_REGEX = re.compile(
     r"```(?P<lang>[a-z+]+)?\s*" r"(?P<code>.*)" r"\s*" r"```", re.DOTALL | re.IGNORECASE
@@ -53,54 +60,118 @@ class TimeConversionError(Exception):
     pass
 
 
+# one `<amount><unit>` pair, optionally separated by whitespace
+TIME_TOKEN_REGEX = re.compile(r"\s*(\d+)\s*([a-z]+)")
+
+# unit -> (months, seconds) it stands for
+TIME_UNITS = {
+    **dict.fromkeys(("s", "sec", "secs", "second", "seconds"), (0, 1)),
+    **dict.fromkeys(("m", "min", "mins", "minute", "minutes"), (0, 60)),
+    **dict.fromkeys(("h", "hr", "hrs", "hour", "hours"), (0, 3600)),
+    **dict.fromkeys(("d", "day", "days"), (0, 86400)),
+    **dict.fromkeys(("w", "week", "weeks"), (0, 604800)),
+    **dict.fromkeys(
+        ("mo", "month", "months"), (1, 0)
+    ),  # m already assigned for minutes
+    **dict.fromkeys(("y", "year", "years"), (12, 0)),
+}
+
+# repeating reminders more often than this would just be spam
+MIN_RECURRENCE = timedelta(minutes=1)
+
+
 class TimeDelta(commands.Converter):
     """
-    Converter to convert a time string into a `datetime.timedelta`
-    object.
+    Converter to convert a time string into an `Interval`, which
+    can be added to a datetime like a `datetime.timedelta`.
     """
 
-    async def convert(self, ctx: commands.Context, arg: str) -> timedelta:
-        return get_timedelta(arg)
+    async def convert(self, ctx: commands.Context, arg: str) -> Interval:
+        return parse_interval(arg)
 
 
-def get_timedelta(arg: str) -> timedelta:
+class RecurrenceConverter(commands.Converter):
     """
-    Converts a time string into an equivalent timedelta object.
+    Converter for repeating schedules, see `parse_recurrence`.
+    """
+
+    async def convert(self, ctx: commands.Context, arg: str) -> Recurrence:
+        return parse_recurrence(arg)
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_interval(arg: str) -> Interval:
+    """
+    Converts a time string like `3h4m` or `1mo 2d` into an Interval.
+    The string is tokenized in a single pass; results are cached, as users
+    tend to type the same handful of delays.
 
     Arguments:
         arg: The string to be converted.
     Returns:
-        timedelta
+        Interval
     Raises:
         TimeConversionError, if the string wasn't properly formatted.
     """
+    text = arg.lower().strip()
+    months = seconds = 0
+    pos = 0
+
+    while pos < len(text):
+        match = TIME_TOKEN_REGEX.match(text, pos)
+        if match is None:
+            raise TimeConversionError(f"Couldn't understand the time {arg!r}")
+        amount, unit = match.groups()
+        if unit not in TIME_UNITS:
+            raise TimeConversionError(f"Unknown time unit {unit!r}")
+
+        unit_months, unit_seconds = TIME_UNITS[unit]
+        months += int(amount) * unit_months
+        seconds += int(amount) * unit_seconds
+        pos = match.end()
+
+    if pos == 0:
+        raise TimeConversionError("No time was given")
     try:
-        arg = arg.lower()
-        amts, units = [], []
-
-        unit_mapping = {
-            "h": "hours",
-            "hour": "hours",
-            "m": "minutes",
-            "minute": "minutes",
-            "s": "seconds",
-            "second": "seconds",
-            "d": "days",
-            "day": "days",
-            "month": "months",  # m already assigned for minutes
-            "year": "years",
-        }
-
-        grouped = itertools.groupby(arg, key=str.isdigit)
-
-        for key, group in grouped:
-            if key:  # means isdigit returned true, meaning they are numbers
-                amts.append(int("".join(group)))
-            else:
-                units.append(
-                    unit_mapping["".join(group)]
-                )  # convert h -> hours, m -> minutes and so on
-
-        return timedelta(**dict(zip(units, amts)))
-    except Exception as e:
-        raise TimeConversionError from e
+        return Interval(months, timedelta(seconds=seconds))
+    except OverflowError as e:
+        raise TimeConversionError("That's too far away") from e
+
+
+def get_timedelta(arg: str) -> timedelta:
+    """
+    Converts a time string into an equivalent timedelta object.
+    Months and years have no fixed length, so they are rejected here;
+    use `parse_interval` where they make sense.
+
+    Raises:
+        TimeConversionError, if the string wasn't properly formatted.
+    """
+    interval = parse_interval(arg)
+    if interval.months:
+        raise TimeConversionError("Months and years can't be used here")
+    return interval.delta
+
+
+@functools.lru_cache(maxsize=256)
+def parse_recurrence(arg: str) -> Recurrence:
+    """
+    Parses a repeating schedule, either an interval (`every 1d`, `every 2w`)
+    or a 5 field cron expression in UTC (`0 9 * * 1-5`).
+
+    Raises:
+        TimeConversionError, if the schedule wasn't properly formatted.
+    """
+    text = arg.lower().strip()
+    if len(text.split()) == 5 and not text.startswith("every"):
+        try:
+            return CronRecurrence(text)
+        except ValueError as e:
+            raise TimeConversionError(str(e)) from e
+
+    if text.startswith("every"):
+        text = text[len("every") :]
+    interval = parse_interval(text)
+    if not interval.at_least(MIN_RECURRENCE):
+        raise TimeConversionError("Reminders can repeat at most once a minute")
+    return IntervalRecurrence(interval)
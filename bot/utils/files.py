@@ -0,0 +1,28 @@
+"""Helpers for the bot's local state files."""
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+
+@contextmanager
+def atomic_write(path: Path, mode: str = "wb") -> Iterator[IO[Any]]:
+    """
+    Opens a temporary file next to `path`, which replaces it once written, so
+    a crash mid-write never leaves a half-written file behind.
+
+    Usage:
+    ```py
+    with atomic_write(DATA_DIR / "state.json", "w") as f:
+        json.dump(state, f)
+    ```
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, mode) as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
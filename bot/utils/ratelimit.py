@@ -0,0 +1,170 @@
+"""Client-side rate limiting, to pace requests before they hit an API's limits."""
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+class TokenBucket:
+    """
+    A token bucket holding up to `rate` tokens, refilled continuously over `per` seconds.
+    """
+
+    __slots__ = ("rate", "per", "tokens", "updated")
+
+    def __init__(self, rate: int, per: float) -> None:
+        self.rate = rate
+        self.per = per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if now < self.updated:  # emptied until then
+            return
+        self.tokens = min(
+            self.rate, self.tokens + (now - self.updated) * self.rate / self.per
+        )
+        self.updated = now
+
+    def delay(self) -> float:
+        """
+        Takes a token if one is available.
+
+        Returns:
+            0 if a token was taken, else the number of seconds until one will be.
+        """
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        paused = max(0.0, self.updated - time.monotonic())
+        return paused + (1 - self.tokens) * self.per / self.rate
+
+    def sync(self, remaining: int, rate: Optional[int] = None) -> None:
+        """
+        Corrects the bucket with an API's count of calls left (e.g. from a
+        `X-RateLimit-Remaining` header), which includes calls made elsewhere.
+        """
+        self._refill()
+        if rate is not None:
+            self.rate = rate
+        self.tokens = min(self.tokens, float(remaining))
+
+    def empty(self, seconds: float = 0.0) -> None:
+        """Takes every token, and keeps the bucket empty for `seconds`."""
+        self.tokens = 0.0
+        # refilling counts from `updated`, so it starts once the pause is over
+        self.updated = max(self.updated, time.monotonic() + seconds)
+
+    @property
+    def full(self) -> bool:
+        self._refill()
+        return self.tokens >= self.rate
+
+
+class RateLimiter:
+    """
+    Paces calls per key (e.g. per route bucket), with an optional global limit on top.
+
+    Usage:
+    ```py
+    limiter = RateLimiter(rate=5, per=5, global_rate=50)
+    await limiter.acquire(("channel", channel_id))
+    await channel.send(...)
+    ```
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: int,
+        per: float,
+        global_rate: Optional[int] = None,
+        global_per: float = 1.0,
+    ) -> None:
+        self.rate = rate
+        self.per = per
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+        self._global = (
+            TokenBucket(global_rate, global_per) if global_rate is not None else None
+        )
+
+    async def acquire(self, key: Hashable) -> None:
+        """Waits until a call for `key` is allowed."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.per)
+
+        while (wait := bucket.delay()) > 0:
+            await asyncio.sleep(wait)
+        if self._global is not None:
+            while (wait := self._global.delay()) > 0:
+                await asyncio.sleep(wait)
+
+        if len(self._buckets) > 1024:
+            self._prune()
+
+    def _prune(self) -> None:
+        # buckets that have fully refilled behave exactly like fresh ones
+        for key in [k for k, b in self._buckets.items() if b.full]:
+            del self._buckets[key]
+
+
+class PriorityRateLimiter:
+    """
+    Hands out a single bucket's tokens by priority: waiting calls with the
+    lowest priority number go first, then in the order they came.
+
+    Usage:
+    ```py
+    limiter = PriorityRateLimiter(TokenBucket(rate=90, per=60))
+    await limiter.acquire(priority=0)
+    ```
+    """
+
+    def __init__(self, bucket: TokenBucket) -> None:
+        self.bucket = bucket
+        self._waiters: List[Tuple[int, int, "asyncio.Future[None]"]] = []  # a heap
+        self._order = itertools.count()
+        self._dispatcher: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def waiting(self) -> int:
+        return sum(not future.done() for *_, future in self._waiters)
+
+    async def acquire(self, priority: int = 0) -> None:
+        """Waits until a call with this priority is allowed."""
+        if not self._waiters and self.bucket.delay() == 0:
+            return
+        future = asyncio.get_event_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+
+    async def _dispatch(self) -> None:
+        while self._waiters:
+            if self._waiters[0][2].done():  # cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            # sleeping before picking a waiter, so one that comes in meanwhile
+            # with a higher priority goes first; and not for long at once, in
+            # case the bucket is synced to a higher rate
+            wait = self.bucket.delay()
+            if wait > 0:
+                await asyncio.sleep(min(wait, 1.0))
+                continue
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                self.bucket.tokens += 1  # give it back
+            else:
+                future.set_result(None)
+
+
+# Shared by everything that sends Discord messages outside of commands (reminders,
+# crypto alerts...), keyed by ("channel", id) or ("dm", user id): Discord allows 5
+# messages per 5 seconds per channel, and 50 requests per second overall (45 here,
+# leaving room for command replies).
+message_limiter = RateLimiter(rate=5, per=5, global_rate=45)
@@ -0,0 +1,206 @@
+"""
+Calendar-aware intervals and recurrence rules, for repeating reminders.
+"""
+import calendar
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+
+
+def add_months(dt: datetime, months: int) -> datetime:
+    """
+    Adds calendar months to a datetime, clamping the day to the end of shorter months
+    (Jan 31 + 1 month -> Feb 28/29).
+    """
+    year, month = divmod(dt.month - 1 + months, 12)
+    year += dt.year
+    month += 1
+    day = min(dt.day, calendar.monthrange(year, month)[1])
+    return dt.replace(year=year, month=month, day=day)
+
+
+@dataclass(frozen=True)
+class Interval:
+    """
+    A length of time that may include calendar months, which timedelta can't express.
+    Supports `datetime + interval`.
+    """
+
+    months: int = 0
+    delta: timedelta = timedelta()
+
+    def __radd__(self, other: datetime) -> datetime:
+        if not isinstance(other, datetime):
+            return NotImplemented
+        return add_months(other, self.months) + self.delta
+
+    def __bool__(self) -> bool:
+        return bool(self.months or self.delta)
+
+    def at_least(self, minimum: timedelta) -> bool:
+        return self.months > 0 or self.delta >= minimum
+
+    def __str__(self) -> str:
+        parts = []
+        years, months = divmod(self.months, 12)
+        if years:
+            parts.append(f"{years}y")
+        if months:
+            parts.append(f"{months}mo")
+        days, seconds = self.delta.days, self.delta.seconds
+        if days:
+            parts.append(f"{days}d")
+        for size, unit in ((3600, "h"), (60, "m"), (1, "s")):
+            amount, seconds = divmod(seconds, size)
+            if amount:
+                parts.append(f"{amount}{unit}")
+        return "".join(parts) or "0s"
+
+
+class Recurrence(ABC):
+    """
+    Base class for rules that produce a sequence of fire times.
+    """
+
+    @abstractmethod
+    def next_after(
+        self, dt: datetime, *, anchor: Optional[datetime] = None
+    ) -> datetime:
+        """
+        The first fire time strictly after `dt`, of the schedule that started
+        at `anchor` (by default, `dt`).
+        """
+        pass
+
+    @abstractmethod
+    def __str__(self) -> str:
+        """The expression this rule was parsed from, used to store it."""
+        pass
+
+
+class IntervalRecurrence(Recurrence):
+    """
+    Fires every `interval`, e.g. `every 1d`.
+
+    Fire times are counted from the anchor (anchor + k * interval) rather than
+    from the last one, so month lengths don't make them drift (Jan 31, Feb 29,
+    Mar 31...) and missed ones keep the time of day.
+    """
+
+    # the average month, to estimate how many intervals fit before a time
+    MONTH = timedelta(days=365.2425 / 12)
+
+    def __init__(self, interval: Interval) -> None:
+        self.interval = interval
+
+    def _nth(self, anchor: datetime, k: int) -> datetime:
+        return add_months(anchor, k * self.interval.months) + k * self.interval.delta
+
+    def next_after(
+        self, dt: datetime, *, anchor: Optional[datetime] = None
+    ) -> datetime:
+        if anchor is None:
+            anchor = dt
+        length = self.interval.months * self.MONTH + self.interval.delta
+        k = max(1, int((dt - anchor) / length))
+        while k > 1 and self._nth(anchor, k - 1) > dt:
+            k -= 1
+        while self._nth(anchor, k) <= dt:
+            k += 1
+        return self._nth(anchor, k)
+
+    def __str__(self) -> str:
+        return f"every {self.interval}"
+
+
+class CronRecurrence(Recurrence):
+    """
+    Fires on a standard 5 field cron schedule: minute hour day-of-month month day-of-week.
+    Supports `*`, lists, ranges and steps (`*/15`, `1-5`, `0,30`, `9-17/2`).
+    Times are in UTC.
+    """
+
+    # (min, max) of each field
+    BOUNDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+    # give up looking for a match this many years ahead (e.g. "0 0 31 2 *")
+    MAX_YEARS = 5
+
+    def __init__(self, expression: str) -> None:
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError("Cron expressions need exactly 5 fields")
+
+        self.expression = " ".join(fields)
+        sets = [self._parse_field(f, *b) for f, b in zip(fields, self.BOUNDS)]
+        self.minutes: List[int] = sorted(sets[0])
+        self.hours: List[int] = sorted(sets[1])
+        self.days = sets[2]
+        self.months = sets[3]
+        self.weekdays = {d % 7 for d in sets[4]}  # 0 and 7 are both sunday
+        # when both day fields are restricted, cron matches either of them
+        self._dom_star = fields[2] == "*"
+        self._dow_star = fields[4] == "*"
+
+        # fail now rather than at fire time for schedules that never match
+        self.next_after(datetime(2000, 1, 1))
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> Set[int]:
+        values: Set[int] = set()
+        for part in field.split(","):
+            body, _, step_text = part.partition("/")
+            step = int(step_text) if step_text else 1
+            if body == "*":
+                start, end = low, high
+            elif "-" in body:
+                start_text, end_text = body.split("-", 1)
+                start, end = int(start_text), int(end_text)
+            else:
+                start = int(body)
+                end = high if step_text else start
+            if not (low <= start <= end <= high) or step < 1:
+                raise ValueError(f"Invalid cron field: {field}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        dom = dt.day in self.days
+        dow = (dt.isoweekday() % 7) in self.weekdays  # cron weeks start on sunday
+        if self._dom_star or self._dow_star:
+            return dom and dow
+        return dom or dow
+
+    def next_after(
+        self, dt: datetime, *, anchor: Optional[datetime] = None
+    ) -> datetime:
+        # cron schedules are fixed to the calendar, not to when they started
+        t = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t.year + self.MAX_YEARS
+
+        while t.year <= limit:
+            if t.month not in self.months:
+                t = add_months(t.replace(day=1, hour=0, minute=0), 1)
+                continue
+            if not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+
+            i = bisect_left(self.hours, t.hour)
+            if i == len(self.hours):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if self.hours[i] != t.hour:
+                t = t.replace(hour=self.hours[i], minute=0)
+
+            j = bisect_left(self.minutes, t.minute)
+            if j == len(self.minutes):
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            return t.replace(minute=self.minutes[j])
+
+        raise ValueError(f"Cron expression {self.expression} never fires")
+
+    def __str__(self) -> str:
+        return self.expression
@@ -0,0 +1,105 @@
+"""
+A small asyncio wrapper around the standard library sqlite3 module.
+
+Used as the local fallback wherever the bot needs persistence without a Postgres server.
+"""
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Union
+
+
+class AsyncSQLite:
+    """
+    Runs sqlite3 queries on a single worker thread, so that disk I/O never blocks the event loop.
+    The method names mirror asyncpg's, to keep call sites similar across both backends.
+
+    Usage:
+    ```py
+    db = AsyncSQLite("data/things.sqlite3")
+    await db.connect()
+    rows = await db.fetch("SELECT * FROM things WHERE id = ?", 1)
+    ```
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self._conn: Optional[sqlite3.Connection] = None
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args))
+
+    def _connect(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn = conn
+
+    async def connect(self) -> "AsyncSQLite":
+        if self._conn is None:
+            await self._run(self._connect)
+        return self
+
+    def _execute(self, sql: str, args: Sequence[Any]) -> sqlite3.Cursor:
+        with self._conn:  # type: ignore ; commits or rolls back
+            return self._conn.execute(sql, args)  # type: ignore
+
+    async def execute(self, sql: str, *args: Any) -> int:
+        """
+        Runs a single statement in its own transaction.
+
+        Returns:
+            The number of affected rows.
+        """
+        cursor = await self._run(self._execute, sql, args)
+        return cursor.rowcount
+
+    async def insert(self, sql: str, *args: Any) -> int:
+        """
+        Runs a single INSERT statement in its own transaction.
+
+        Returns:
+            The rowid of the inserted row.
+        """
+        cursor = await self._run(self._execute, sql, args)
+        return cursor.lastrowid
+
+    def _executemany(self, sql: str, rows: Iterable[Sequence[Any]]) -> None:
+        with self._conn:  # type: ignore
+            self._conn.executemany(sql, rows)  # type: ignore
+
+    async def executemany(self, sql: str, rows: Iterable[Sequence[Any]]) -> None:
+        await self._run(self._executemany, sql, list(rows))
+
+    def _executescript(self, script: str) -> None:
+        with self._conn:  # type: ignore
+            self._conn.executescript(script)  # type: ignore
+
+    async def executescript(self, script: str) -> None:
+        await self._run(self._executescript, script)
+
+    def _fetch(self, sql: str, args: Sequence[Any]) -> List[sqlite3.Row]:
+        return self._conn.execute(sql, args).fetchall()  # type: ignore
+
+    async def fetch(self, sql: str, *args: Any) -> List[sqlite3.Row]:
+        return await self._run(self._fetch, sql, args)
+
+    async def fetchrow(self, sql: str, *args: Any) -> Optional[sqlite3.Row]:
+        rows = await self.fetch(sql, *args)
+        return rows[0] if rows else None
+
+    async def fetchval(self, sql: str, *args: Any) -> Any:
+        row = await self.fetchrow(sql, *args)
+        return row[0] if row else None
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,11 @@
+"""Text helpers for fuzzy matching."""
+from typing import Set
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    The 3-character substrings of `text`, padded so that its start (and, less
+    so, its end) count too: "btc" gives "  b", " bt", "btc" and "tc ".
+    """
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
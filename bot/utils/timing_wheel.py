@@ -0,0 +1,230 @@
+"""
+A hierarchical timing wheel, for scheduling callbacks at a future time.
+
+Each level of the wheel is a ring of `slots` buckets, and every level covers
+`slots` times the span of the one below it. Timers are dropped into the bucket
+matching their deadline in O(1), and are cascaded down a level whenever the
+level below wraps around, until they reach level 0 and fire. The wheel is
+driven by a single asyncio timer per tick, regardless of how many timers it holds.
+"""
+import asyncio
+import inspect
+import time
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Set
+
+from loguru import logger
+
+from bot.utils.background import BackgroundTasks
+
+
+class TimerHandle:
+    """
+    A scheduled callback. Returned by `TimingWheel.schedule`.
+    """
+
+    __slots__ = ("deadline", "callback", "args", "_wheel", "_bucket")
+
+    def __init__(
+        self,
+        wheel: "TimingWheel",
+        deadline: int,
+        callback: Callable[..., Any],
+        args: tuple,
+    ) -> None:
+        self.deadline = deadline  # in ticks
+        self.callback = callback
+        self.args = args
+        self._wheel = wheel
+        self._bucket: Optional[Set["TimerHandle"]] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._bucket is None
+
+    def cancel(self) -> bool:
+        """
+        Removes the timer from the wheel.
+
+        Returns:
+            False if the timer had already fired or been cancelled.
+        """
+        if self._bucket is None:
+            return False
+        self._bucket.discard(self)
+        self._bucket = None
+        self._wheel._count -= 1
+        return True
+
+
+class TimingWheel:
+    """
+    Hierarchical timing wheel with O(1) schedule and cancel.
+
+    With the defaults (1 second ticks, 4 levels of 64 slots) the wheel spans
+    64 ** 4 seconds (~194 days); timers further out than that wait in an overflow
+    bucket which is re-examined every time the top level wraps.
+
+    Callbacks are plain callables, called with `args` when the timer fires. If a
+    callback returns an awaitable, it is run as a task. Pass a coroutine function
+    rather than a coroutine object, so nothing is allocated until the timer fires:
+    ```py
+    wheel.schedule(when, send_reminder, reminder_id)
+    ```
+    """
+
+    def __init__(
+        self,
+        *,
+        resolution: float = 1.0,
+        slots: int = 64,
+        levels: int = 4,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.resolution = resolution
+        self.slots = slots
+        self.levels = levels
+        self.clock = clock  # wall clock in seconds since the epoch, like datetimes
+
+        self._wheels: List[List[Set[TimerHandle]]] = [
+            [set() for _ in range(slots)] for _ in range(levels)
+        ]
+        self._overflow: Set[TimerHandle] = set()
+        # span of a single slot at each level, in ticks
+        self._spans = [slots**level for level in range(levels + 1)]
+
+        self._tick = self._now_tick()
+        self._count = 0  # timers currently in the wheel
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running = False
+        # keep references to running callback tasks, so they aren't garbage collected
+        self._tasks = BackgroundTasks()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _now_tick(self) -> int:
+        return int(self.clock() // self.resolution)
+
+    def _to_tick(self, when: datetime) -> int:
+        # naive datetimes are treated as UTC, matching datetime.utcnow()
+        if when.tzinfo is None:
+            timestamp = (when - datetime(1970, 1, 1)).total_seconds()
+        else:
+            timestamp = when.timestamp()
+        # round up, so timers never fire early
+        return -int(-timestamp // self.resolution)
+
+    def start(self) -> None:
+        """Starts driving the wheel from the running event loop."""
+        self._running = True
+        self._arm()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def schedule(
+        self, when: datetime, callback: Callable[..., Any], *args: Any
+    ) -> TimerHandle:
+        """
+        Schedules `callback(*args)` to be called at `when` (a UTC datetime).
+        Timers in the past fire on the next tick.
+        """
+        handle = TimerHandle(self, self._to_tick(when), callback, args)
+        if self._count == 0:
+            # the wheel was idle, nothing can be skipped by jumping ahead
+            self._tick = max(self._tick, self._now_tick())
+        # the current tick has already been processed, the earliest we can fire is the next one
+        self._insert(handle, earliest=self._tick + 1)
+        self._count += 1
+        self._arm()
+        return handle
+
+    def cancel(self, handle: TimerHandle) -> bool:
+        return handle.cancel()
+
+    def _insert(self, handle: TimerHandle, *, earliest: int) -> None:
+        if handle.deadline < earliest:
+            handle.deadline = earliest
+        delta = handle.deadline - self._tick
+        for level in range(self.levels):
+            if delta < self._spans[level + 1]:
+                index = (handle.deadline // self._spans[level]) % self.slots
+                bucket = self._wheels[level][index]
+                break
+        else:
+            bucket = self._overflow
+        bucket.add(handle)
+        handle._bucket = bucket
+
+    def _arm(self) -> None:
+        if not self._running or self._timer is not None or self._count == 0:
+            return
+        loop = asyncio.get_event_loop()
+        delay = (self._tick + 1) * self.resolution - self.clock()
+        self._timer = loop.call_later(max(delay, 0), self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self.advance(self._now_tick())
+        self._arm()
+
+    def advance(self, to_tick: int) -> int:
+        """
+        Processes every tick up to and including `to_tick`, firing due timers.
+        Normally driven by the event loop, but can be called directly (e.g. in benchmarks).
+
+        Returns:
+            The number of timers fired.
+        """
+        fired = 0
+        while self._tick < to_tick and self._count > 0:
+            self._tick += 1
+            fired += self._process_tick()
+        if self._count == 0:
+            self._tick = max(self._tick, to_tick)
+        return fired
+
+    def _process_tick(self) -> int:
+        tick = self._tick
+        slots = self.slots
+
+        # cascade from the highest level that wrapped this tick, down to level 1,
+        # so a timer can move down several levels within one tick
+        if tick % self._spans[self.levels] == 0 and self._overflow:
+            self._cascade(self._overflow)
+        for level in range(self.levels - 1, 0, -1):
+            if tick % self._spans[level] == 0:
+                index = (tick // self._spans[level]) % slots
+                self._cascade(self._wheels[level][index])
+
+        bucket = self._wheels[0][tick % slots]
+        if not bucket:
+            return 0
+        due = list(bucket)
+        bucket.clear()
+        self._count -= len(due)
+        for handle in due:
+            handle._bucket = None
+            self._run(handle)
+        return len(due)
+
+    def _cascade(self, bucket: Set[TimerHandle]) -> None:
+        if not bucket:
+            return
+        handles = list(bucket)
+        bucket.clear()
+        for handle in handles:
+            # cascades run before the current tick's level 0 bucket, so it can still fire now
+            self._insert(handle, earliest=self._tick)
+
+    def _run(self, handle: TimerHandle) -> None:
+        try:
+            result = handle.callback(*handle.args)
+            if inspect.isawaitable(result):
+                self._tasks.spawn(result)
+        except Exception:
+            logger.exception(f"Scheduled callback {handle.callback!r} raised")